@@ -16,6 +16,18 @@ Public API
     Returns a dict with keys:
       - 'command': a string identifier
       - 'params': a dict with extracted parameters
+- enable_cache(maxsize) / disable_cache() / cache_clear() / cache_info()
+    Optional LRU memoization of parse_command. While enabled, results are
+    read-only mappings shared between calls.
+- parse_commands(texts, workers=None, chunksize=512, stats=None) -> iterator
+    Batch form for transcript replay; yields one result per input, in
+    order, fanning chunks out to a process pool for large inputs.
+- enable_metrics() / disable_metrics() / reset_metrics() / metrics_snapshot()
+    Optional instrumentation: per-pattern attempts and hits, fallbacks
+    taken and a per-intent latency histogram. Off by default.
+- ParseSession
+    Incremental parsing of partial ASR hypotheses: feed()/update() words
+    as they arrive, read .provisional, then finalize() with the final text.
 
 Example intents
 ---------------
@@ -31,6 +43,12 @@ Example intents
 - media_control: "play", "pause", "next song", "previous track"
 - scroll: "scroll down", "scroll up", "scroll to top", "scroll to bottom"
 
+Grammar
+-------
+- The intent patterns (priority order) and the keyword index are data, in
+  grammar.json next to this file. load_grammar() compiles them once into a
+  snapshot that later imports load instead (see the Grammar section).
+
 Wake word
 ---------
 - If text starts with "jarvis", "hey jarvis", or "ok jarvis", that prefix
@@ -41,10 +59,28 @@ Wake word
 
 from __future__ import annotations
 
+import marshal
+import os
 import re
-from typing import Dict, Any, Callable, Match, List, Tuple
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, asdict
+from itertools import islice
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING, Dict, Any, Callable, Deque, FrozenSet, Iterable, Iterator, Mapping, Match, List, Optional,
+    Set, Tuple,
+)
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from common.parse_metrics import ParseMetrics
 
 ParamsFn = Callable[[Match[str]], Dict[str, Any]]
+PatternEntry = Tuple["re.Pattern[str]", str, ParamsFn]
 
 
 # -------------------- Param extractors --------------------
@@ -211,243 +247,476 @@ def normalize_text(text: str) -> str:
     return text.strip("\n\t \"'.,?!")
 
 
-# -------------------- Patterns --------------------
-
-
-PATTERNS: List[Tuple[re.Pattern[str], str, ParamsFn]] = [
-    # Open browser
-    (
-        re.compile(
-            r"\b(?:open|launch|start|run)\s+(?:the\s+)?"
-            r"(?:(?P<browser>chrome|google chrome|firefox|mozilla|safari|edge|msedge|brave|opera|google|microsoft edge)\b"
-            r"|browser|web browser)",
-            re.I,
-        ),
-        "open_browser",
-        _browser_params,
-    ),
-
-    # Search
-    (
-        re.compile(
-            r"\b(?:search for|search|google|look up|lookup|find|find me|look for)\b\s+(?P<query>[^\n\r]+)",
-            re.I,
-        ),
-        "search",
-        _search_params,
-    ),
-
-    # Time / date
-    (
-        re.compile(
-            r"\b(?:(what(?:'s| is)? the time|what time is it|tell me the time|current time|time now|"
-            r"what(?:'s| is)? the date|what date is it|today(?:'s)? date))\b",
-            re.I,
-        ),
-        "get_time",
-        _noop_params,
-    ),
-
-    # System power
-    (
-        re.compile(
-            r"(?:(?P<shutdown>\b(?:shutdown|shut down|power off|turn off)\b)|"
-            r"(?P<restart>\b(?:restart|reboot)\b)|"
-            r"(?P<sleep>\b(?:sleep|suspend)\b)|"
-            r"(?P<lock>\b(?:lock|lock screen|lock the computer|lock my laptop)\b))",
-            re.I,
-        ),
-        "system_power",
-        _system_power_params,
-    ),
-
-    # Volume / audio
-    (
-        re.compile(r"\b(?:volume|sound|audio|mute|unmute)\b.*", re.I),
-        "control_volume",
-        _volume_params,
-    ),
-
-    # App control
-    (
-        re.compile(
-            r"\b(?P<app_action>open|start|launch|run|close|quit|exit|stop)\b\s+"
-            r"(?P<app>[a-z0-9 ._+\-]+)",
-            re.I,
-        ),
-        "control_app",
-        _app_params,
-    ),
-
-    # File / folder
-    (
-        re.compile(
-            r"\b(?:open|show|reveal)\b\s+(?:the\s+)?"
-            r"(?P<target>(?:file|folder|directory|path)?\s*[a-z0-9_./\\:\- ]+)",
-            re.I,
-        ),
-        "open_path",
-        _file_params,
-    ),
-
-    # Help / about
-    (
-        re.compile(
-            r"\b(?:help|what can you do|what are your capabilities|who are you|what is this|what are you)\b",
-            re.I,
-        ),
-        "assistant_help",
-        _help_params,
-    ),
-
-    # Navigation (back, home, notifications, recents)
-    (
-        re.compile(
-            r"\b(?:go back|back|go home|home|show notifications|notifications|show recent apps|recent apps)\b",
-            re.I,
-        ),
-        "navigate",
-        _navigate_params,
-    ),
-
-    # Media control (play, pause, next, previous)
-    (
-        re.compile(
-            r"\b(?:play|pause|resume|stop|next (?:song|track)?|previous (?:song|track)?|prev(?:ious)? track?)\b",
-            re.I,
-        ),
-        "media_control",
-        _media_params,
-    ),
-
-    # Scroll
-    (
-        re.compile(
-            r"\b(?:scroll (?:up|down|to the top|to top|to the bottom|to bottom)|scroll up|scroll down)\b",
-            re.I,
-        ),
-        "scroll",
-        _scroll_params,
-    ),
-]
-
-
-# -------------------- Fast-fail keyword index --------------------
-
-
-KEYWORD_INDEX = {
-    "browser": ("open_browser",),
-    "chrome": ("open_browser",),
-    "firefox": ("open_browser",),
-    "safari": ("open_browser",),
-    "edge": ("open_browser",),
-    "google": ("open_browser", "search"),
-    "search": ("search",),
-    "lookup": ("search",),
-    "find": ("search",),
-    "time": ("get_time",),
-    "date": ("get_time",),
-    "today": ("get_time",),
-    "shutdown": ("system_power",),
-    "shut down": ("system_power",),
-    "power off": ("system_power",),
-    "turn off": ("system_power",),
-    "restart": ("system_power",),
-    "reboot": ("system_power",),
-    "sleep": ("system_power",),
-    "suspend": ("system_power",),
-    "lock": ("system_power",),
-    "volume": ("control_volume",),
-    "sound": ("control_volume",),
-    "audio": ("control_volume",),
-    "mute": ("control_volume",),
-    "unmute": ("control_volume",),
-    "open": ("open_browser", "control_app", "open_path"),
-    "start": ("open_browser", "control_app"),
-    "launch": ("open_browser", "control_app"),
-    "run": ("open_browser", "control_app"),
-    "close": ("control_app",),
-    "quit": ("control_app",),
-    "exit": ("control_app",),
-    "help": ("assistant_help",),
-    "capabilities": ("assistant_help",),
-    "who are you": ("assistant_help",),
-
-    # Navigation
-    "go back": ("navigate",),
-    "back": ("navigate",),
-    "go home": ("navigate",),
-    "home": ("navigate",),
-    "notifications": ("navigate",),
-    "recent apps": ("navigate",),
-    "recent": ("navigate",),
-
-    # Media
-    "play": ("media_control",),
-    "pause": ("media_control",),
-    "resume": ("media_control",),
-    "next": ("media_control",),
-    "previous": ("media_control",),
-    "prev": ("media_control",),
-    "song": ("media_control",),
-    "track": ("media_control",),
-
-    # Scroll
-    "scroll": ("scroll",),
-    "up": ("scroll",),
-    "down": ("scroll",),
-    "top": ("scroll",),
-    "bottom": ("scroll",),
+# -------------------- Keyword automaton --------------------
+
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class _KeywordAutomaton:
+    """
+    Aho-Corasick automaton over word tokens.
+
+    Keywords are split into tokens and inserted into a trie whose edges are
+    whole words, so matches always fall on word boundaries ("up" does not
+    fire inside "update", "top" does not fire inside "stop"). Multi-word
+    keywords like "shut down" or "who are you" are matched as token
+    sequences. A single left-to-right pass over the tokens of the text
+    yields every keyword hit.
+    """
+
+    def __init__(self, index: Dict[str, Tuple[str, ...]]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[FrozenSet[str]] = [frozenset()]
+
+        for kw, cmds in index.items():
+            state = 0
+            for tok in _TOKEN_RE.findall(kw.lower()):
+                nxt = self._goto[state].get(tok)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(frozenset())
+                    self._goto[state][tok] = nxt
+                state = nxt
+            self._out[state] = self._out[state] | frozenset(cmds)
+
+        # Breadth-first failure links; outputs are merged along the
+        # failure chain so a lookup never has to walk it again.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for tok, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and tok not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(tok, 0)
+                self._out[nxt] = self._out[nxt] | self._out[self._fail[nxt]]
+
+    def tables(self) -> Tuple[List[Dict[str, int]], List[int], List[FrozenSet[str]]]:
+        """The goto / failure / output tables (plain data, for a snapshot)."""
+        return self._goto, self._fail, self._out
+
+    @classmethod
+    def from_tables(
+        cls, goto: List[Dict[str, int]], fail: List[int], out: List[FrozenSet[str]],
+    ) -> "_KeywordAutomaton":
+        """Rebuild an automaton from tables(), without recomputing them."""
+        automaton = cls.__new__(cls)
+        automaton._goto, automaton._fail, automaton._out = goto, fail, out
+        return automaton
+
+    def step(self, state: int, token: str) -> int:
+        """Advance from `state` by one token and return the new state."""
+        goto = self._goto
+        while state and token not in goto[state]:
+            state = self._fail[state]
+        return goto[state].get(token, 0)
+
+    def outputs(self, state: int) -> FrozenSet[str]:
+        """Command ids whose keywords end at `state`."""
+        return self._out[state]
+
+    def candidates(self, tokens: Iterable[str]) -> Set[str]:
+        """Return every command id whose keyword occurs in `tokens`."""
+        found: Set[str] = set()
+        state = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        for tok in tokens:
+            while state and tok not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(tok, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+
+# -------------------- Grammar --------------------
+#
+# The intent patterns (in priority order) and the keyword index are data,
+# in grammar.json; each pattern names its params extractor. The compiled
+# grammar (pattern sources, keyword index and automaton tables) is cached in
+# a marshal snapshot under __pycache__ next to grammar.json. Like a .pyc, it
+# is rebuilt when grammar.json's mtime or size changes and is not written
+# when sys.dont_write_bytecode is set. Only the regexes are compiled at load:
+# a compiled re.Pattern can't be serialized.
+
+
+_PARAM_EXTRACTORS: Dict[str, ParamsFn] = {
+    "none": _noop_params,
+    "browser": _browser_params,
+    "search": _search_params,
+    "system_power": _system_power_params,
+    "volume": _volume_params,
+    "app": _app_params,
+    "file": _file_params,
+    "help": _help_params,
+    "navigate": _navigate_params,
+    "media": _media_params,
+    "scroll": _scroll_params,
 }
 
+GRAMMAR_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "grammar.json")
+GRAMMAR_VERSION = 1
+# Bump when the snapshot layout changes.
+SNAPSHOT_VERSION = 1
+
+
+def grammar_snapshot_path(grammar_file: str = GRAMMAR_FILE) -> str:
+    """Where the compiled snapshot of `grammar_file` is cached."""
+    head, name = os.path.split(grammar_file)
+    stem = os.path.splitext(name)[0]
+    tag = sys.implementation.cache_tag or "py"  # marshal's format is per interpreter
+    return os.path.join(head, "__pycache__", f"{stem}.{tag}.v{SNAPSHOT_VERSION}.snapshot")
+
+
+def _compile_grammar(source: bytes) -> Dict[str, Any]:
+    """Validate grammar.json's contents and build the snapshot payload."""
+    import json
+
+    grammar = json.loads(source)
+    if grammar.get("version") != GRAMMAR_VERSION:
+        raise ValueError(f"unsupported grammar version {grammar.get('version')!r}")
+    patterns = []
+    for rule in grammar["patterns"]:
+        regex = "".join(rule["regex"])
+        re.compile(regex, re.I)  # fail here, with the rule at hand, not at import
+        if rule["params"] not in _PARAM_EXTRACTORS:
+            raise ValueError(f"unknown params extractor {rule['params']!r} for {rule['intent']!r}")
+        patterns.append((regex, rule["intent"], rule["params"]))
+    intents = {intent for _, intent, _ in patterns}
+    keywords = {}
+    for kw, cmds in grammar["keywords"].items():
+        unknown = set(cmds) - intents
+        if unknown:
+            raise ValueError(f"keyword {kw!r} names unknown intents {sorted(unknown)}")
+        keywords[kw] = tuple(cmds)
+    return {
+        "patterns": patterns,
+        "keywords": keywords,
+        "automaton": _KeywordAutomaton(keywords).tables(),
+    }
+
+
+def load_grammar(
+    grammar_file: str = GRAMMAR_FILE,
+) -> Tuple[List[PatternEntry], Dict[str, Tuple[str, ...]], _KeywordAutomaton]:
+    """
+    Return (PATTERNS, KEYWORD_INDEX, keyword automaton) for `grammar_file`,
+    from its snapshot when that is current, else compiled from the source
+    (and the snapshot rewritten).
+    """
+    st = os.stat(grammar_file)
+    stamp = (st.st_mtime_ns, st.st_size)
+    snapshot = grammar_snapshot_path(grammar_file)
+    payload = None
+    try:
+        with open(snapshot, "rb") as f:
+            cached = marshal.load(f)
+        if cached.get("version") == SNAPSHOT_VERSION and cached.get("source") == stamp:
+            payload = cached
+    except (OSError, EOFError, ValueError, TypeError, AttributeError):
+        pass  # missing or unreadable: rebuilt below
+
+    if payload is None:
+        with open(grammar_file, "rb") as f:
+            payload = _compile_grammar(f.read())
+        payload.update(version=SNAPSHOT_VERSION, source=stamp)
+        if not sys.dont_write_bytecode:
+            _write_snapshot(snapshot, payload)
+
+    patterns = [
+        (re.compile(regex, re.I), cmd_id, _PARAM_EXTRACTORS[params])
+        for regex, cmd_id, params in payload["patterns"]
+    ]
+    return patterns, dict(payload["keywords"]), _KeywordAutomaton.from_tables(*payload["automaton"])
+
+
+def _write_snapshot(path: str, payload: Dict[str, Any]) -> None:
+    """Write atomically; a read-only install just compiles on every import."""
+    import tempfile
+
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                marshal.dump(payload, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except OSError:
+        pass
+
+
+PATTERNS, KEYWORD_INDEX, _KEYWORD_AUTOMATON = load_grammar()
+
+
+def keyword_candidates(text: str) -> Set[str]:
+    """
+    Return the command ids whose keywords appear as whole words in
+    already-normalized `text`.
+    """
+    return _KEYWORD_AUTOMATON.candidates(_TOKEN_RE.findall(text))
+
+
+# -------------------- Dispatch plans --------------------
+
+
+# PATTERNS entries reachable from each keyword candidate set, in priority
+# order. Built on first use; only a few dozen distinct sets occur in practice.
+_DISPATCH_PLANS: Dict[FrozenSet[str], Tuple[PatternEntry, ...]] = {}
+
+
+def _dispatch_plan(cmd_ids: FrozenSet[str]) -> Tuple[PatternEntry, ...]:
+    """
+    Return the PATTERNS entries whose intent is in `cmd_ids` (all of them
+    when `cmd_ids` is empty), keeping PATTERNS priority order.
+    """
+    plan = _DISPATCH_PLANS.get(cmd_ids)
+    if plan is None:
+        plan = tuple(entry for entry in PATTERNS if not cmd_ids or entry[1] in cmd_ids)
+        _DISPATCH_PLANS[cmd_ids] = plan
+    return plan
+
+
+# -------------------- Result cache --------------------
+
+
+@dataclass
+class ParseCacheInfo:
+    """
+    Snapshot of the parse cache counters.
+
+    - hits / misses: lookups answered from / not found in the cache.
+    - evictions: entries dropped because the cache was full.
+    - size / maxsize: current and maximum number of entries
+      (maxsize is 0 while the cache is disabled).
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+    maxsize: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return counters as a plain dict (useful for tests or logging)."""
+        data = asdict(self)
+        data["hit_rate"] = self.hit_rate
+        return data
+
+
+class _ParseCache:
+    """
+    Size-bounded LRU map from normalized text to a frozen parse result.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive integer")
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Mapping[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Mapping[str, Any]]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Mapping[str, Any]) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> ParseCacheInfo:
+        with self._lock:
+            return ParseCacheInfo(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                size=len(self._data),
+                maxsize=self.maxsize,
+            )
+
+
+_PARSE_CACHE: Optional[_ParseCache] = None
+
+
+def enable_cache(maxsize: int = 256) -> None:
+    """
+    Turn on LRU memoization of parse_command, keeping at most `maxsize`
+    results. Calling it again resizes the cache and resets its counters.
+    """
+    global _PARSE_CACHE
+    _PARSE_CACHE = _ParseCache(maxsize)
+
+
+def disable_cache() -> None:
+    """Turn memoization off and drop every cached result."""
+    global _PARSE_CACHE
+    _PARSE_CACHE = None
+
+
+def cache_clear() -> None:
+    """Drop every cached result and reset the counters."""
+    if _PARSE_CACHE is not None:
+        _PARSE_CACHE.clear()
+
+
+def cache_info() -> ParseCacheInfo:
+    """Return the current cache counters (all zero while disabled)."""
+    if _PARSE_CACHE is None:
+        return ParseCacheInfo()
+    return _PARSE_CACHE.info()
+
+
+def _freeze(result: Dict[str, Any]) -> Mapping[str, Any]:
+    """Read-only view of a parse result, so cached entries can't be mutated."""
+    return MappingProxyType({
+        "command": result["command"],
+        "params": MappingProxyType(dict(result["params"])),
+    })
+
+
+_UNKNOWN_FROZEN = _freeze({"command": "unknown", "params": {}})
+
+
+# -------------------- Instrumentation --------------------
+
+# The counters live in common/parse_metrics.py, shared with
+# Tejas.command_parser, and are imported on first use.
+_METRICS: Optional["ParseMetrics"] = None
+
+
+def enable_metrics() -> None:
+    """
+    Start recording parse metrics. Calling it again starts from zero.
+    While disabled (the default) parse_command only pays for a None check.
+    """
+    from common.parse_metrics import ParseMetrics
+
+    global _METRICS
+    _METRICS = ParseMetrics()
+
+
+def disable_metrics() -> None:
+    """Stop recording and drop the collected metrics."""
+    global _METRICS
+    _METRICS = None
+
+
+def reset_metrics() -> None:
+    """Zero the collected metrics, keeping them enabled if they were."""
+    if _METRICS is not None:
+        enable_metrics()
+
+
+def metrics_snapshot() -> Dict[str, Any]:
+    """
+    Return the collected metrics as a plain dict:
+    {'enabled', 'calls', 'patterns': {intent: {'attempts', 'hits'}},
+     'fallbacks': {intent: count}, 'latency_buckets_us': [...],
+     'latency': {intent: {'count', 'mean_us', 'histogram'}}}.
+
+    Latency is measured around the whole parse_command call (cache hits
+    included); pattern counters only move on actual parses. Chunks parsed
+    by parse_commands worker processes are not recorded.
+    """
+    from common.parse_metrics import snapshot
+
+    return snapshot(_METRICS)
+
 
 # -------------------- Main parse function --------------------
 
 
-def parse_command(text: str) -> Dict[str, Any]:
+def parse_command(text: str) -> Mapping[str, Any]:
     """
     Parse text into {'command': <id>, 'params': {...}}.
 
-    This function is pure and side-effect free.
+    This function has no observable side effects. When the cache is
+    enabled (see enable_cache), repeated inputs are answered from it and
+    every result, cached or not, is a read-only mapping instead of a dict.
     """
-    text = normalize_text(text or "")
+    text = _prepare_text(text)
     if not text:
-        return {"command": "unknown", "params": {}}
+        return _UNKNOWN_FROZEN if _PARSE_CACHE is not None else {"command": "unknown", "params": {}}
 
-    # Strip assistant wake words at the start
+    metrics = _METRICS
+    start = time.perf_counter() if metrics is not None else 0.0
+
+    cache = _PARSE_CACHE
+    if cache is None:
+        result = _parse_normalized(text, metrics)
+    else:
+        result = cache.get(text)
+        if result is None:
+            result = _freeze(_parse_normalized(text, metrics))
+            cache.put(text, result)
+
+    if metrics is not None:
+        metrics.observe(result["command"], time.perf_counter() - start)
+    return result
+
+
+def _prepare_text(text: str) -> str:
+    """Normalize text and strip a leading assistant wake word."""
+    text = normalize_text(text or "")
     for wake in ("jarvis ", "hey jarvis ", "ok jarvis "):
         if text.startswith(wake):
-            text = text[len(wake):].lstrip()
-            break
-
-    # Fast-fail keyword filtering
-    candidate_cmds = set()
-    for kw, cmds in KEYWORD_INDEX.items():
-        if kw in text:
-            candidate_cmds.update(cmds)
-
-    if candidate_cmds:
-        for pattern, cmd_id, params_fn in PATTERNS:
-            if cmd_id not in candidate_cmds:
-                continue
-            m = pattern.search(text)
-            if m:
-                try:
-                    params = params_fn(m)
-                except Exception:
-                    params = {}
-                return {"command": cmd_id, "params": params}
-    else:
-        for pattern, cmd_id, params_fn in PATTERNS:
-            m = pattern.search(text)
-            if m:
-                try:
-                    params = params_fn(m)
-                except Exception:
-                    params = {}
-                return {"command": cmd_id, "params": params}
-
-    # Simple fallbacks
+            return text[len(wake):].lstrip()
+    return text
+
+
+def _parse_normalized(text: str, metrics: Optional["ParseMetrics"] = None) -> Dict[str, Any]:
+    """Match already-normalized, wake-stripped text against the patterns."""
+    # Fast-fail keyword filtering (single pass over the tokens); only the
+    # patterns of the candidate intents are tried, in priority order.
+    for pattern, cmd_id, params_fn in _dispatch_plan(frozenset(keyword_candidates(text))):
+        m = pattern.search(text)
+        if metrics is not None:
+            metrics.pattern(cmd_id, m is not None)
+        if m:
+            try:
+                params = params_fn(m)
+            except Exception:
+                params = {}
+            return {"command": cmd_id, "params": params}
+
+    result = _fallback(text)
+    if metrics is not None:
+        metrics.fallback(result["command"])
+    return result
+
+
+def _fallback(text: str) -> Dict[str, Any]:
+    """Result for text that no pattern matched."""
     if any(kw in text for kw in ("open ", "launch ", "start ", "run ")) and "browser" in text:
         return {"command": "open_browser", "params": {"browser": None}}
 
@@ -458,3 +727,279 @@ def parse_command(text: str) -> Dict[str, Any]:
         return {"command": "search", "params": {"query": text}}
 
     return {"command": "unknown", "params": {}}
+
+
+# -------------------- Batch parsing --------------------
+
+
+@dataclass
+class BatchParseStats:
+    """
+    Throughput of a parse_commands run, updated as results are yielded.
+
+    - utterances: results yielded so far.
+    - chunks: chunks parsed (serially or by the pool).
+    - workers: worker processes used (1 for the serial path).
+    - seconds: wall time from the first read of the input to the last
+      result yielded.
+    """
+
+    utterances: int = 0
+    chunks: int = 0
+    workers: int = 1
+    seconds: float = 0.0
+
+    @property
+    def utterances_per_second(self) -> float:
+        return self.utterances / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return stats as a plain dict (useful for tests or logging)."""
+        data = asdict(self)
+        data["utterances_per_second"] = self.utterances_per_second
+        return data
+
+
+def _parse_chunk(chunk: List[str]) -> List[Dict[str, Any]]:
+    """
+    Parse a chunk of texts in a worker. Bypasses the result cache so the
+    returned dicts are always picklable.
+    """
+    results = []
+    for raw in chunk:
+        text = _prepare_text(raw)
+        if text:
+            results.append(_parse_normalized(text))
+        else:
+            results.append({"command": "unknown", "params": {}})
+    return results
+
+
+def parse_commands(
+    texts: Iterable[str],
+    workers: Optional[int] = None,
+    chunksize: int = 512,
+    stats: Optional[BatchParseStats] = None,
+) -> Iterator[Mapping[str, Any]]:
+    """
+    Parse many texts, yielding one parse_command result per input, in
+    input order.
+
+    `texts` is consumed lazily in chunks of `chunksize`. When the input
+    is longer than one chunk and `workers` > 1 (default: os.cpu_count()),
+    chunks are parsed by a process pool with at most 2 * workers chunks
+    in flight, so memory stays bounded on arbitrarily long streams.
+    Shorter inputs, or workers <= 1, are parsed serially in this process
+    (honouring the result cache, if enabled). Either way the results have
+    parse_command's type: read-only mappings while the cache is enabled,
+    dicts otherwise.
+
+    Pass a BatchParseStats as `stats` to read utterances/second
+    afterwards (or while iterating).
+    """
+    if chunksize <= 0:
+        raise ValueError("chunksize must be a positive integer")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if stats is None:
+        stats = BatchParseStats()
+
+    start = time.perf_counter()
+    it = iter(texts)
+    first = list(islice(it, chunksize))
+    second = list(islice(it, chunksize)) if workers > 1 and len(first) == chunksize else []
+
+    if not second:
+        # Serial fallback: everything fits in one chunk, or no pool wanted.
+        stats.workers = 1
+        chunk = first
+        while chunk:
+            for text in chunk:
+                yield parse_command(text)
+                stats.utterances += 1
+            stats.chunks += 1
+            stats.seconds = time.perf_counter() - start
+            chunk = list(islice(it, chunksize))
+        return
+
+    # Imported here: concurrent.futures pulls in multiprocessing, which
+    # would more than double the import time of this module.
+    from concurrent.futures import ProcessPoolExecutor
+
+    stats.workers = workers
+    # Workers return dicts (a MappingProxyType can't be pickled)
+    freeze = _freeze if _PARSE_CACHE is not None else None
+    pending: Deque["Future[List[Dict[str, Any]]]"] = deque()
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending.append(pool.submit(_parse_chunk, first))
+        pending.append(pool.submit(_parse_chunk, second))
+        exhausted = False
+        while pending:
+            while not exhausted and len(pending) < 2 * workers:
+                chunk = list(islice(it, chunksize))
+                if not chunk:
+                    exhausted = True
+                    break
+                pending.append(pool.submit(_parse_chunk, chunk))
+            for result in pending.popleft().result():
+                yield freeze(result) if freeze is not None else result
+                stats.utterances += 1
+            stats.chunks += 1
+            stats.seconds = time.perf_counter() - start
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=True)
+
+
+# -------------------- Incremental parsing --------------------
+
+
+# Params that say what to do; a provisional result waits until they are set.
+_ACTION_PARAMS = ("action", "mode", "direction")
+# Intents whose params capture the rest of the utterance (query, app name,
+# path): every new word changes them, so they are only settled by finalize()
+_FREE_TEXT_INTENTS = frozenset({"search", "control_app", "open_path"})
+
+
+class ParseSession:
+    """
+    Incremental parser for partial ASR hypotheses.
+
+    Words are consumed as they arrive. The keyword automaton state and the
+    candidate intents are stored per word, so a new word costs one
+    automaton step and an ASR revision rewinds to the first changed word
+    instead of rescanning the whole prefix. Only the patterns of the
+    candidate intents are re-checked against the prefix.
+
+    A provisional result ({'command', 'params'} like parse_command) is
+    exposed once it is unambiguous:
+    - a pattern (not a fallback) matches the prefix,
+    - it is the highest-priority candidate intent, so no candidate ranked
+      above it is still waiting for more words, and
+    - it is actionable: its action/mode/direction param, if the intent
+      has one, is known, and
+    - it doesn't end in free text: search, control_app and open_path
+      capture the rest of the utterance, so they wait for finalize().
+    E.g. "volume" stays pending, "volume up" yields control_volume/up;
+    "search for" and "search for pizza" both stay pending.
+
+    Usage:
+        session = ParseSession()
+        session.update("volume")          # None
+        session.update("volume up")       # {'command': 'control_volume', ...}
+        result = session.finalize("volume up")
+        session.confirmed                 # True: provisional == final
+    """
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all words and results."""
+        self._words: List[str] = []
+        self._states: List[int] = []
+        self._cands: List[FrozenSet[str]] = []
+        self.provisional: Optional[Dict[str, Any]] = None
+        self.final: Optional[Mapping[str, Any]] = None
+
+    @property
+    def text(self) -> str:
+        """The hypothesis consumed so far."""
+        return " ".join(self._words)
+
+    @property
+    def candidates(self) -> FrozenSet[str]:
+        """Candidate intents from the keywords seen so far."""
+        return self._cands[-1] if self._cands else frozenset()
+
+    @property
+    def confirmed(self) -> bool:
+        """True once finalize() produced the same result as the provisional one."""
+        return (
+            self.final is not None
+            and self.provisional is not None
+            and self.final["command"] == self.provisional["command"]
+            and dict(self.final["params"]) == self.provisional["params"]
+        )
+
+    def feed(self, words: str) -> Optional[Dict[str, Any]]:
+        """Append newly recognized words; return the provisional result."""
+        new = words.lower().split()
+        if new:
+            self._push(new)
+            self._refresh()
+        return self.provisional
+
+    def update(self, hypothesis: str) -> Optional[Dict[str, Any]]:
+        """
+        Replace the whole partial hypothesis. Words shared with the
+        previous hypothesis are kept; state is rewound to the first word
+        that differs.
+        """
+        if self._replace(hypothesis):
+            self._refresh()
+        return self.provisional
+
+    def finalize(self, text: Optional[str] = None) -> Mapping[str, Any]:
+        """
+        Parse the final transcript (default: the words consumed so far)
+        with parse_command. The provisional result is left as it was, so
+        `confirmed` tells whether it can be kept.
+        """
+        if text is not None:
+            self._replace(text)
+        self.final = parse_command(self.text)
+        return self.final
+
+    def _replace(self, hypothesis: str) -> bool:
+        """Rewind to the first differing word and push the rest; False if unchanged."""
+        words = hypothesis.lower().split()
+        keep = 0
+        for old, new in zip(self._words, words):
+            if old != new:
+                break
+            keep += 1
+        if keep == len(words) == len(self._words):
+            return False
+        del self._words[keep:], self._states[keep:], self._cands[keep:]
+        self._push(words[keep:])
+        return True
+
+    def _push(self, words: List[str]) -> None:
+        state = self._states[-1] if self._states else 0
+        cands = self._cands[-1] if self._cands else frozenset()
+        automaton = _KEYWORD_AUTOMATON
+        for word in words:
+            for tok in _TOKEN_RE.findall(word):
+                state = automaton.step(state, tok)
+                out = automaton.outputs(state)
+                if out and not out <= cands:
+                    cands = cands | out
+            self._words.append(word)
+            self._states.append(state)
+            self._cands.append(cands)
+
+    def _refresh(self) -> None:
+        self.provisional = None
+        text = _prepare_text(self.text)
+        if not text:
+            return
+        plan = _dispatch_plan(self.candidates)
+        for rank, (pattern, cmd_id, params_fn) in enumerate(plan):
+            m = pattern.search(text)
+            if not m:
+                continue
+            if rank > 0:
+                return  # a higher-priority candidate may still match
+            if cmd_id in _FREE_TEXT_INTENTS:
+                return  # the argument may still grow ("search for" ... "the news")
+            try:
+                params = params_fn(m)
+            except Exception:
+                params = {}
+            if any(params.get(k, "") is None for k in _ACTION_PARAMS):
+                return  # intent known, but not what to do yet
+            self.provisional = {"command": cmd_id, "params": params}
+            return
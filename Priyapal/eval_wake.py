@@ -0,0 +1,78 @@
+"""
+eval_wake.py
+
+ROC sweep of WakeWordDetector over labelled transcript corpora.
+
+Every line of the positive and negative files is scored once
+(WakeWordDetector.evaluate_many, in a process pool for large files).
+TPR/FAR for the whole sensitivity x threshold grid then come from those
+scores. Blank lines and lines starting with '#' are skipped.
+
+Usage
+-----
+    python eval_wake.py
+    python eval_wake.py --positive pos.txt --negative neg.txt --workers 8
+    python eval_wake.py --sensitivities 0.5,0.8 --thresholds 0.7,0.8,0.9
+"""
+
+from __future__ import annotations
+
+import argparse
+import pathlib
+import time
+from typing import List
+
+from wake_word_enhancement import (
+    DEFAULT_ROC_SENSITIVITIES,
+    DEFAULT_ROC_THRESHOLDS,
+    PRIMARY_WAKE_PHRASES,
+    SECONDARY_WAKE_PHRASES,
+    WakeConfig,
+    WakeWordDetector,
+    format_roc_table,
+    roc_table,
+)
+
+
+DATA_DIR = pathlib.Path(__file__).parent / "data"
+
+
+def load_corpus(path: str) -> List[str]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+def _floats(text: str) -> List[float]:
+    return [float(x) for x in text.split(",") if x.strip()]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="TPR/FAR of WakeWordDetector over a grid of settings")
+    ap.add_argument("--positive", default=str(DATA_DIR / "wake_positive.txt"))
+    ap.add_argument("--negative", default=str(DATA_DIR / "wake_negative.txt"))
+    ap.add_argument("--workers", type=int, default=None, help="scoring processes (default: CPU count)")
+    ap.add_argument("--sensitivities", default=",".join(map(str, DEFAULT_ROC_SENSITIVITIES)))
+    ap.add_argument("--thresholds", default=",".join(map(str, DEFAULT_ROC_THRESHOLDS)),
+                    help="fuzzy thresholds tried for both primary and secondary phrases")
+    args = ap.parse_args()
+
+    detector = WakeWordDetector(WakeConfig(
+        primary_phrases=list(PRIMARY_WAKE_PHRASES),
+        secondary_phrases=list(SECONDARY_WAKE_PHRASES),
+        debounce_seconds=0.0,
+    ))
+    start = time.perf_counter()
+    positives = detector.evaluate_many(load_corpus(args.positive), workers=args.workers)
+    negatives = detector.evaluate_many(load_corpus(args.negative), workers=args.workers)
+    scored = time.perf_counter() - start
+    thresholds = _floats(args.thresholds)
+    points = roc_table(positives, negatives, _floats(args.sensitivities), thresholds, thresholds)
+    swept = time.perf_counter() - start - scored
+
+    print(format_roc_table(points))
+    print(f"\n{len(positives)} positive / {len(negatives)} negative texts; "
+          f"scored in {scored:.2f}s, {len(points)} settings in {swept:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
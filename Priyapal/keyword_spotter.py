@@ -0,0 +1,346 @@
+"""
+keyword_spotter.py
+
+Offline, CPU-only wake-phrase spotter for raw 16 kHz audio (numpy only).
+
+Pipeline
+--------
+- Audio: 16-bit little-endian mono PCM at 16 kHz (what sr.Microphone and
+  AudioData.get_raw_data(convert_rate=16000, convert_width=2) produce),
+  fed in chunks of any size.
+- Features: MfccExtractor keeps the samples that don't fill a frame yet
+  and turns each new 25 ms frame (10 ms hop) into 13 MFCCs, so every
+  sample is processed once. Cepstral means are removed with a running
+  average, so the microphone's coloring cancels out.
+- Matching: every enrolled recording of the wake phrase is a template.
+  Each new frame advances one DTW column per template (subsequence DTW:
+  the phrase may start anywhere in the stream; each audio frame consumes
+  up to two template frames, so speech 2x faster or slower still fits).
+  The column update reads only the previous column, so it is a handful of
+  vectorized numpy operations per template per frame. A path's cost is
+  its mean frame distance.
+- Decision: the phrase is heard when a template's cost falls below the
+  threshold for the detector's sensitivity. With two or more templates
+  the threshold scales with how well they match each other (the
+  "reference cost"), so it adapts to the speaker and microphone. Higher
+  sensitivity means a looser threshold.
+
+The frames of the last few seconds live in a fixed-size ring buffer
+(AudioRingBuffer) for debugging and re-scoring. Nothing grows with the
+length of the stream.
+
+Enrollment: 3-5 recordings of the wake phrase, spoken by the user in the
+room the assistant runs in, as WAV files in the template directory
+($VOXMIND_WAKE_TEMPLATES, else ~/.cache/voxmind/wake_templates).
+Silence around the phrase is trimmed.
+"""
+
+from __future__ import annotations
+
+import os
+import wave
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 400  # 25 ms
+HOP_LENGTH = 160  # 10 ms
+N_FFT = 512
+N_MELS = 26
+N_MFCC = 13
+
+# Match threshold at sensitivity 0.0 and 1.0, as multiples of the
+# templates' reference cost (the median cost of matching one enrolled
+# recording against another)
+STRICT_FACTOR = 1.1
+LOOSE_FACTOR = 1.9
+# Thresholds used with a single template (mean frame distance of MFCCs 1-12)
+STRICT_THRESHOLD = 4.0
+LOOSE_THRESHOLD = 6.5
+# Frames quieter than about -70 dBFS (mean log mel energy) break any match:
+# after mean removal, digital silence would look like an average frame
+SILENCE_LOG_ENERGY = -10.5
+
+
+def default_template_dir() -> str:
+    return os.environ.get("VOXMIND_WAKE_TEMPLATES") or os.path.join(
+        os.path.expanduser("~"), ".cache", "voxmind", "wake_templates"
+    )
+
+
+def pcm16_to_float(data: bytes) -> np.ndarray:
+    """16-bit little-endian PCM bytes -> float32 samples in [-1, 1)."""
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def load_wav(path: str) -> np.ndarray:
+    """
+    Mono float32 samples of a 16-bit PCM WAV file, resampled to 16 kHz
+    (linear interpolation) if needed. Stereo files are averaged.
+    """
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2:
+            raise ValueError(f"{path}: expected 16-bit PCM, got {8 * f.getsampwidth()}-bit")
+        rate, channels = f.getframerate(), f.getnchannels()
+        samples = pcm16_to_float(f.readframes(f.getnframes()))
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE and len(samples):
+        n = int(round(len(samples) * SAMPLE_RATE / rate))
+        samples = np.interp(np.arange(n) * (rate / SAMPLE_RATE), np.arange(len(samples)), samples)
+    return samples.astype(np.float32)
+
+
+def _mel_filterbank(n_mels: int = N_MELS, n_fft: int = N_FFT, rate: int = SAMPLE_RATE) -> np.ndarray:
+    """Triangular mel filters, shape (n_mels, n_fft // 2 + 1)."""
+    mel = lambda hz: 2595.0 * np.log10(1.0 + hz / 700.0)
+    hz = lambda m: 700.0 * (10.0 ** (m / 2595.0) - 1.0)
+    points = hz(np.linspace(mel(20.0), mel(rate / 2), n_mels + 2))
+    bins = np.fft.rfftfreq(n_fft, 1.0 / rate)
+    fb = np.zeros((n_mels, len(bins)))
+    for i in range(n_mels):
+        lo, mid, hi = points[i:i + 3]
+        fb[i] = np.clip(np.minimum((bins - lo) / (mid - lo), (hi - bins) / (hi - mid)), 0.0, None)
+    return fb
+
+
+def _dct_matrix(n_out: int = N_MFCC, n_in: int = N_MELS) -> np.ndarray:
+    """Orthonormal DCT-II, shape (n_in, n_out)."""
+    n = np.arange(n_in)
+    m = np.cos(np.pi / n_in * (n[:, None] + 0.5) * np.arange(n_out)[None, :]) * np.sqrt(2.0 / n_in)
+    m[:, 0] /= np.sqrt(2.0)
+    return m
+
+
+class MfccExtractor:
+    """
+    Incremental MFCCs: push() any number of samples, get the frames they
+    complete. Leftover samples wait for the next push.
+    """
+
+    def __init__(self, cmn_frames: int = 300) -> None:
+        self._window = np.hamming(FRAME_LENGTH).astype(np.float32)
+        self._mel = _mel_filterbank().T.astype(np.float32)
+        self._dct = _dct_matrix().astype(np.float32)
+        self._cmn_alpha = 1.0 / cmn_frames
+        self.reset()
+
+    def reset(self) -> None:
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._last_sample = 0.0
+        self._mean: Optional[np.ndarray] = None
+
+    def push(self, samples: np.ndarray) -> np.ndarray:
+        """MFCCs of the frames completed by `samples`, shape (n, N_MFCC)."""
+        samples = np.asarray(samples, dtype=np.float32)
+        if not len(samples):
+            return np.zeros((0, N_MFCC), dtype=np.float32)
+        # Pre-emphasis, carried across chunk boundaries
+        emph = np.empty_like(samples)
+        emph[0] = samples[0] - 0.97 * self._last_sample
+        emph[1:] = samples[1:] - 0.97 * samples[:-1]
+        self._last_sample = float(samples[-1])
+
+        buf = np.concatenate([self._pending, emph])
+        n = 0 if len(buf) < FRAME_LENGTH else 1 + (len(buf) - FRAME_LENGTH) // HOP_LENGTH
+        self._pending = buf[n * HOP_LENGTH:]
+        if n == 0:
+            return np.zeros((0, N_MFCC), dtype=np.float32)
+
+        frames = np.lib.stride_tricks.sliding_window_view(buf, FRAME_LENGTH)[::HOP_LENGTH][:n]
+        power = np.abs(np.fft.rfft(frames * self._window, N_FFT)) ** 2
+        mfcc = np.log(power @ self._mel + 1e-10) @ self._dct
+        return self._normalize(mfcc.astype(np.float32))
+
+    def _normalize(self, mfcc: np.ndarray) -> np.ndarray:
+        """Subtract the running cepstral mean (c0, the log energy, is kept as is)."""
+        out = mfcc.copy()
+        for i, frame in enumerate(mfcc):
+            if self._mean is None:
+                self._mean = frame.copy()
+            else:
+                self._mean += self._cmn_alpha * (frame - self._mean)
+            out[i, 1:] -= self._mean[1:]
+        return out
+
+    def extract(self, samples: np.ndarray) -> np.ndarray:
+        """MFCCs of a whole recording (resets the stream state)."""
+        self.reset()
+        out = self.push(samples)
+        self.reset()
+        return out
+
+
+class AudioRingBuffer:
+    """Fixed-capacity ring of feature frames; view() returns them oldest first."""
+
+    def __init__(self, capacity: int, width: int = N_MFCC) -> None:
+        self._data = np.zeros((capacity, width), dtype=np.float32)
+        self._next = 0
+        self._size = 0
+
+    def extend(self, frames: np.ndarray) -> None:
+        cap = len(self._data)
+        frames = frames[-cap:]
+        idx = (self._next + np.arange(len(frames))) % cap
+        self._data[idx] = frames
+        self._next = (self._next + len(frames)) % cap
+        self._size = min(cap, self._size + len(frames))
+
+    def view(self) -> np.ndarray:
+        start = (self._next - self._size) % len(self._data)
+        return np.roll(self._data, -start, axis=0)[:self._size]
+
+    def clear(self) -> None:
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+
+def trim_silence(mfcc: np.ndarray, floor_db: float = 30.0) -> np.ndarray:
+    """Frames from the first to the last one within `floor_db` of the loudest."""
+    if not len(mfcc):
+        return mfcc
+    # c0 of the orthonormal DCT is sqrt(N_MELS) x the mean log mel energy
+    energy_db = mfcc[:, 0] / np.sqrt(N_MELS) * (10.0 / np.log(10.0))
+    loud = np.flatnonzero(energy_db >= energy_db.max() - floor_db)
+    return mfcc[loud[0]:loud[-1] + 1]
+
+
+class _TemplateMatcher:
+    """Streaming subsequence DTW of one template (features without c0)."""
+
+    def __init__(self, template: np.ndarray) -> None:
+        self.template = template
+        self.reset()
+
+    def reset(self) -> None:
+        n = len(self.template)
+        self._cost = np.full(n, np.inf)
+        self._length = np.zeros(n)
+
+    def step(self, frame: np.ndarray) -> float:
+        """Advance by one audio frame; mean frame distance of the best full match ending here."""
+        dist = np.sqrt(((self.template - frame) ** 2).sum(axis=1))
+        prev_cost, prev_len = self._cost, self._length
+        # Predecessors: stay on the template frame, advance one, or skip one
+        stay, one, two = prev_cost, np.empty_like(prev_cost), np.empty_like(prev_cost)
+        one[0], one[1:] = 0.0, prev_cost[:-1]  # template frame 0 may start at any time
+        two[:2], two[2:] = np.inf, prev_cost[:-2]
+        choices = np.stack([stay, one, two])
+        best = choices.argmin(axis=0)
+        lengths = np.stack([prev_len, np.r_[0.0, prev_len[:-1]], np.r_[0.0, 0.0, prev_len[:-2]]])
+        self._cost = choices[best, np.arange(len(best))] + dist
+        self._length = lengths[best, np.arange(len(best))] + 1.0
+        # No more than 2x the template's duration
+        self._cost[self._length > 2 * len(self.template)] = np.inf
+        return float(self._cost[-1] / self._length[-1])
+
+
+class KeywordSpotter:
+    """
+    Template-matching wake-phrase spotter over a 16 kHz stream (see the
+    module docstring).
+
+    - enroll(samples) / load_templates(directory): add templates.
+    - feed(samples) -> lowest match cost of the frames just processed.
+    - detect(samples, sensitivity) -> bool.
+    """
+
+    def __init__(self, history_seconds: float = 3.0) -> None:
+        self.extractor = MfccExtractor()
+        self.history = AudioRingBuffer(int(history_seconds * SAMPLE_RATE / HOP_LENGTH))
+        self._matchers: List[_TemplateMatcher] = []
+        self.reference_cost: Optional[float] = None
+        self.last_score = float("inf")
+
+    @property
+    def templates(self) -> List[np.ndarray]:
+        return [m.template for m in self._matchers]
+
+    def enroll(self, recording: Union[str, np.ndarray]) -> int:
+        """Add a recording (WAV path or 16 kHz samples) as a template; returns its frame count."""
+        samples = load_wav(recording) if isinstance(recording, str) else np.asarray(recording, np.float32)
+        template = trim_silence(self.extractor.extract(samples))[:, 1:]
+        if len(template) < 10:
+            raise ValueError("wake phrase recording is too short or silent")
+        self._matchers.append(_TemplateMatcher(template))
+        self._calibrate()
+        return len(template)
+
+    def _calibrate(self) -> None:
+        """Median cost of matching each template against the others."""
+        if len(self._matchers) < 2:
+            self.reference_cost = None
+            return
+        costs = []
+        for m in self._matchers:
+            for other in self._matchers:
+                if other is not m:
+                    m.reset()
+                    costs.append(min(m.step(frame) for frame in other.template))
+            m.reset()
+        self.reference_cost = float(np.median(costs))
+
+    def threshold(self, sensitivity: float) -> float:
+        """Match threshold for a sensitivity in [0, 1] (higher accepts more)."""
+        s = max(0.0, min(1.0, sensitivity))
+        if self.reference_cost is None:
+            return STRICT_THRESHOLD + (LOOSE_THRESHOLD - STRICT_THRESHOLD) * s
+        return self.reference_cost * (STRICT_FACTOR + (LOOSE_FACTOR - STRICT_FACTOR) * s)
+
+    def load_templates(self, directory: Optional[str] = None) -> int:
+        """Enroll every .wav file in `directory` (sorted); returns how many."""
+        directory = directory or default_template_dir()
+        if not os.path.isdir(directory):
+            return 0
+        names = sorted(n for n in os.listdir(directory) if n.lower().endswith(".wav"))
+        for name in names:
+            self.enroll(os.path.join(directory, name))
+        return len(names)
+
+    def reset(self) -> None:
+        """Forget the stream so far (templates stay)."""
+        self.extractor.reset()
+        self.history.clear()
+        for m in self._matchers:
+            m.reset()
+        self.last_score = float("inf")
+
+    def feed(self, samples: Union[bytes, np.ndarray]) -> float:
+        """Process a chunk (PCM16 bytes or float samples); lowest match cost it produced."""
+        if isinstance(samples, (bytes, bytearray, memoryview)):
+            samples = pcm16_to_float(bytes(samples))
+        frames = self.extractor.push(samples)
+        self.history.extend(frames)
+        best = float("inf")
+        for frame in frames:
+            if frame[0] / np.sqrt(N_MELS) < SILENCE_LOG_ENERGY:
+                for m in self._matchers:
+                    m.reset()
+                continue
+            for m in self._matchers:
+                best = min(best, m.step(frame[1:]))
+        self.last_score = best
+        return best
+
+    def detect(self, samples: Union[bytes, np.ndarray], sensitivity: float = 0.5) -> bool:
+        """Feed a chunk; True (and the match state is reset) if the phrase was heard."""
+        if not self._matchers:
+            return False
+        if self.feed(samples) <= self.threshold(sensitivity):
+            for m in self._matchers:
+                m.reset()
+            return True
+        return False
+
+
+def score_recording(spotter: KeywordSpotter, samples: Sequence[float]) -> float:
+    """Lowest match cost over a whole recording (the stream state is reset first)."""
+    spotter.reset()
+    best = spotter.feed(np.asarray(samples, dtype=np.float32))
+    spotter.reset()
+    return best
@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from wake_word_enhancement import FuzzyPhraseMatcher, WakeConfig, WakeWordDetector
+
+
+def _edit_distances(phrase, text, anchored):
+    """Reference DP: distance of phrase to the best substring ending at each text position."""
+    prev = list(range(len(phrase) + 1))
+    out = [prev[-1]]
+    for j, ch in enumerate(text, 1):
+        cur = [j if anchored else 0]
+        for i in range(1, len(phrase) + 1):
+            cur.append(min(prev[i] + 1, cur[i - 1] + 1, prev[i - 1] + (phrase[i - 1] != ch)))
+        prev = cur
+        out.append(cur[-1])
+    return out
+
+
+def test_matches_reference_edit_distance():
+    rng = random.Random(7)
+    for _ in range(3000):
+        phrase = "".join(rng.choice("hey vox") for _ in range(rng.randint(1, 10)))
+        text = "".join(rng.choice("hey vox") for _ in range(rng.randint(0, 20)))
+        k = rng.randint(0, 3)
+        matcher = FuzzyPhraseMatcher(phrase)
+        assert matcher.search(text, k) == (min(_edit_distances(phrase, text, False)) <= k)
+        prefix = _edit_distances(phrase, text, True)
+        end = matcher.match_prefix(text, k)
+        if end is None:
+            assert min(prefix) > k
+        else:
+            assert prefix[end] <= k
+
+
+@pytest.mark.parametrize("phrase,threshold,errors", [
+    ("hey vox", 0.8, 1), ("hey voxmind", 0.8, 2), ("vox", 0.9, 0), ("vox", 0.6, 1),
+])
+def test_threshold_calibration(phrase, threshold, errors):
+    assert FuzzyPhraseMatcher(phrase).max_errors(threshold) == errors
+
+
+def test_prefix_prefers_word_end():
+    matcher = FuzzyPhraseMatcher("hey vox")
+    assert matcher.match_prefix("hey voxx open chrome", 1) == len("hey voxx")
+    assert matcher.match_prefix("hey box open chrome", 1) == len("hey box")
+    assert matcher.match_prefix("open chrome", 1) is None
+
+
+def test_detector_uses_fuzzy_only_at_high_sensitivity():
+    config = WakeConfig(primary_phrases=["hey vox"], secondary_phrases=["vox"],
+                        sensitivity=0.5, debounce_seconds=0.0)
+    detector = WakeWordDetector(config)
+    assert detector.detect_and_strip_wake("hey box open chrome") == (False, "hey box open chrome")
+    detector.set_sensitivity(0.9)
+    assert detector.detect_and_strip_wake("hey box open chrome") == (True, "open chrome")
+    assert detector.metrics.fuzzy_matches == 1
+    assert detector.detect_in_text("so I said " * 200 + "hay vox lights on")
+    assert not detector.detect_in_text("box is on the table " * 200)
@@ -0,0 +1,68 @@
+import json
+import os
+import shutil
+import sys
+
+import pytest
+
+import command_parser
+from command_parser import GRAMMAR_FILE, KEYWORD_INDEX, PATTERNS, grammar_snapshot_path, load_grammar
+
+
+@pytest.fixture
+def grammar(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, "dont_write_bytecode", False)
+    path = tmp_path / "grammar.json"
+    shutil.copy(GRAMMAR_FILE, path)
+    return str(path)
+
+
+def _edit(path, change):
+    with open(path) as f:
+        data = json.load(f)
+    change(data)
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def test_snapshot_is_written_then_reused(grammar, monkeypatch):
+    patterns, keywords, _ = load_grammar(grammar)
+    assert [(p.pattern, p.flags, cmd, fn) for p, cmd, fn in patterns] == \
+        [(p.pattern, p.flags, cmd, fn) for p, cmd, fn in PATTERNS]
+    assert keywords == KEYWORD_INDEX
+    assert os.path.exists(grammar_snapshot_path(grammar))
+
+    def recompile(source):
+        raise AssertionError("the snapshot should have been used")
+
+    monkeypatch.setattr(command_parser, "_compile_grammar", recompile)
+    _, again, automaton = load_grammar(grammar)
+    assert again == keywords
+    assert automaton.candidates(["stop", "spotify"]) == {"control_app", "media_control"}
+
+
+def test_snapshot_is_rebuilt_when_the_source_changes(grammar):
+    load_grammar(grammar)
+    _edit(grammar, lambda data: data["keywords"].update(silence=["control_volume"]))
+    _, keywords, automaton = load_grammar(grammar)
+    assert keywords["silence"] == ("control_volume",)
+    assert automaton.candidates(["silence"]) == {"control_volume"}
+
+
+def test_unreadable_snapshot_is_replaced(grammar):
+    snapshot = grammar_snapshot_path(grammar)
+    os.makedirs(os.path.dirname(snapshot))
+    with open(snapshot, "wb") as f:
+        f.write(b"\x00not a snapshot")
+    assert load_grammar(grammar)[1] == KEYWORD_INDEX
+    assert load_grammar(grammar)[1] == KEYWORD_INDEX
+
+
+def test_invalid_grammar_is_rejected(grammar):
+    _edit(grammar, lambda data: data["keywords"].update(silence=["no_such_intent"]))
+    with pytest.raises(ValueError, match="no_such_intent"):
+        load_grammar(grammar)
+    shutil.copy(GRAMMAR_FILE, grammar)
+    _edit(grammar, lambda data: data["patterns"][0].update(params="no_such_extractor"))
+    with pytest.raises(ValueError, match="no_such_extractor"):
+        load_grammar(grammar)
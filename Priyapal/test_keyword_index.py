@@ -0,0 +1,48 @@
+from command_parser import KEYWORD_INDEX, PATTERNS, _dispatch_plan, keyword_candidates, parse_command
+
+
+def test_short_keywords_respect_word_boundaries():
+    assert "scroll" not in keyword_candidates("please update my calendar")
+    assert "scroll" not in keyword_candidates("stop the music")
+    assert "open_browser" not in keyword_candidates("truncate the table")
+    assert "scroll" in keyword_candidates("scroll up")
+
+
+def test_multi_word_keywords():
+    assert "system_power" in keyword_candidates("please shut down now")
+    assert keyword_candidates("shutdown now") == {"system_power"}
+    assert keyword_candidates("shut the door") == set()
+    assert "assistant_help" in keyword_candidates("hey who are you")
+    assert "search" in keyword_candidates("look up the weather")
+
+
+def test_overlapping_keywords_are_all_reported():
+    # "go back" and "back" share a suffix; "recent apps" contains "recent".
+    assert keyword_candidates("go back") == {"navigate"}
+    assert keyword_candidates("open recent apps") == {
+        "open_browser", "control_app", "open_path", "navigate",
+    }
+
+
+def test_every_keyword_matches_itself():
+    for kw, cmds in KEYWORD_INDEX.items():
+        assert set(cmds) <= keyword_candidates(kw), kw
+
+
+def test_parse_uses_word_level_candidates():
+    assert parse_command("stop the music") == {"command": "media_control", "params": {"action": "stop"}}
+    assert parse_command("look up cheap flights") == {"command": "search", "params": {"query": "cheap flights"}}
+    assert parse_command("jarvis scroll down") == {"command": "scroll", "params": {"direction": "down"}}
+
+
+def test_stop_with_an_app_name_closes_the_app():
+    assert parse_command("stop spotify") == {"command": "control_app", "params": {"app": "spotify", "action": "close"}}
+    assert parse_command("stop chrome") == {"command": "control_app", "params": {"app": "chrome", "action": "close"}}
+    assert parse_command("stop") == {"command": "media_control", "params": {"action": "stop"}}
+    assert parse_command("stop playing") == {"command": "media_control", "params": {"action": "stop"}}
+
+
+def test_dispatch_plan_keeps_priority_order():
+    plan = _dispatch_plan(frozenset({"scroll", "open_browser", "control_app"}))
+    assert [cmd_id for _, cmd_id, _ in plan] == ["open_browser", "control_app", "scroll"]
+    assert _dispatch_plan(frozenset()) == tuple(PATTERNS)
@@ -0,0 +1,147 @@
+import wave
+
+import numpy as np
+import pytest
+
+from keyword_spotter import (
+    SAMPLE_RATE, AudioRingBuffer, KeywordSpotter, MfccExtractor, load_wav, score_recording,
+)
+from wake_word_enhancement import WakeConfig, WakeWordDetector
+
+
+# Formant-synthesized stand-ins for speech: vowels are harmonics of f0 shaped
+# by formant peaks, consonants are band-limited noise bursts.
+_VOWELS = {"a": (750, 1200, 2500), "e": (500, 1900, 2500), "i": (300, 2300, 3000),
+           "o": (500, 900, 2400), "u": (320, 800, 2300), "n": (250, 1000, 2500), "r": (450, 1300, 1700)}
+_NOISES = {"s": (4000, 7500), "h": (500, 3000), "f": (1500, 7000), "k": (1500, 3500)}
+_PHRASES = {
+    "hey vox": "h8 e12 i10 f6 o18 k5 s12",
+    "open chrome": "o15 _5 e10 n10 k6 r8 o15 n10",
+    "play music": "_5 e15 i8 n8 u15 s10 i10 k6",
+    "hey siri": "h8 e12 i10 s10 i15 r8 i15",
+}
+
+
+def _segment(kind, n, f0, rng):
+    if kind == "_":
+        return np.zeros(n)
+    if kind in _NOISES:
+        lo, hi = _NOISES[kind]
+        spec = np.fft.rfft(rng.standard_normal(n))
+        freqs = np.fft.rfftfreq(n, 1 / SAMPLE_RATE)
+        spec[(freqs < lo) | (freqs > hi)] = 0
+        return np.fft.irfft(spec, n) * 0.5
+    t = np.arange(n) / SAMPLE_RATE
+    out = np.zeros(n)
+    for k in range(1, int(4000 / f0)):
+        amp = sum(np.exp(-((k * f0 - f) / (80 + f * 0.06)) ** 2) for f in _VOWELS[kind]) + 0.01
+        out += amp * np.sin(2 * np.pi * k * f0 * t + rng.uniform(0, 2 * np.pi))
+    return out
+
+
+def utter(phrase, seed, stretch=1.0, f0=130.0, gain=0.3, snr_db=25.0):
+    rng = np.random.default_rng(seed)
+    parts = [np.zeros(int(0.3 * SAMPLE_RATE))]
+    for seg in _PHRASES[phrase].split():
+        n = int(int(seg[1:]) / 100 * stretch * rng.uniform(0.9, 1.1) * SAMPLE_RATE)
+        parts.append(_segment(seg[0], n, f0 * rng.uniform(0.97, 1.03), rng))
+    parts.append(np.zeros(int(0.3 * SAMPLE_RATE)))
+    sig = np.concatenate(parts)
+    sig = sig / np.abs(sig).max() * gain
+    noise = rng.standard_normal(len(sig)) * np.sqrt((sig ** 2).mean() / 10 ** (snr_db / 10))
+    return (sig + noise).astype(np.float32)
+
+
+def write_wav(path, samples, rate=SAMPLE_RATE, channels=1):
+    pcm = (np.clip(samples, -1, 1) * 32767).astype("<i2")
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(pcm.tobytes())
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def templates(tmp_path_factory):
+    """Three enrollment recordings of "hey vox" at different speeds and pitches."""
+    directory = tmp_path_factory.mktemp("wake_templates")
+    for i, (stretch, f0) in enumerate([(0.9, 120), (1.0, 130), (1.1, 140)]):
+        write_wav(directory / f"hey_vox_{i}.wav", utter("hey vox", seed=i, stretch=stretch, f0=f0))
+    return str(directory)
+
+
+@pytest.fixture(scope="module")
+def stream_wavs(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("streams")
+    positive = np.concatenate([utter("open chrome", 10), utter("hey vox", 11, stretch=0.85, f0=125, snr_db=15),
+                               utter("play music", 12)])
+    negative = np.concatenate([utter("open chrome", 20), utter("hey siri", 21), utter("play music", 22)])
+    return write_wav(directory / "positive.wav", positive), write_wav(directory / "negative.wav", negative)
+
+
+def _pcm_chunks(path, size=1024):
+    with wave.open(path, "rb") as f:
+        data = f.readframes(f.getnframes())
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_incremental_mfcc_matches_whole_recording():
+    samples = utter("hey vox", 1)
+    whole = MfccExtractor().extract(samples)
+    extractor = MfccExtractor()
+    pieces = [extractor.push(samples[i:i + 333]) for i in range(0, len(samples), 333)]
+    np.testing.assert_allclose(np.concatenate(pieces), whole, atol=1e-3)
+
+
+def test_detector_spots_enrolled_phrase_in_wav_stream(templates, stream_wavs):
+    detector = WakeWordDetector(WakeConfig(primary_phrases=["hey vox"], debounce_seconds=0.0))
+    assert detector.load_wake_templates(templates) == 3
+
+    positive, negative = stream_wavs
+    hits = [i for i, chunk in enumerate(_pcm_chunks(positive)) if detector.detect_in_audio_chunk(chunk)]
+    assert len(hits) == 1
+    # Fires at the end of the wake phrase, not during the other commands
+    seconds = hits[0] * 1024 / 2 / SAMPLE_RATE
+    assert 2.3 < seconds < 3.5
+
+    detector.spotter.reset()
+    assert not any(detector.detect_in_audio_chunk(chunk) for chunk in _pcm_chunks(negative))
+    assert detector.metrics.triggers == 1
+    assert detector.metrics.total_audio_chunks == len(_pcm_chunks(positive)) + len(_pcm_chunks(negative))
+
+
+def test_sensitivity_loosens_threshold(templates):
+    spotter = KeywordSpotter()
+    spotter.load_templates(templates)
+    assert spotter.reference_cost is not None
+    assert spotter.threshold(0.0) < spotter.threshold(0.5) < spotter.threshold(1.0)
+    match = score_recording(spotter, utter("hey vox", 5, stretch=1.05))
+    other = score_recording(spotter, utter("hey siri", 5))
+    assert match <= spotter.threshold(0.5) < other
+    # Silence never matches, however sensitive
+    assert score_recording(spotter, np.zeros(SAMPLE_RATE, dtype=np.float32)) == float("inf")
+
+
+def test_without_templates_audio_never_triggers():
+    detector = WakeWordDetector()
+    assert detector.detect_in_audio_chunk(b"\x00\x01" * 800) is False
+    assert detector.metrics.total_audio_chunks == 0
+
+
+def test_load_wav_downmixes_and_resamples(tmp_path):
+    tone = np.sin(2 * np.pi * 440 * np.arange(8000) / 8000).astype(np.float32) * 0.5
+    stereo = np.repeat(tone, 2)
+    samples = load_wav(write_wav(tmp_path / "tone.wav", stereo, rate=8000, channels=2))
+    assert len(samples) == 16000
+    spectrum = np.abs(np.fft.rfft(samples))
+    assert abs(np.fft.rfftfreq(len(samples), 1 / SAMPLE_RATE)[spectrum.argmax()] - 440) < 2
+
+
+def test_ring_buffer_keeps_latest_frames():
+    ring = AudioRingBuffer(4, width=1)
+    ring.extend(np.arange(3, dtype=np.float32)[:, None])
+    ring.extend(np.arange(3, 6, dtype=np.float32)[:, None])
+    assert ring.view()[:, 0].tolist() == [2, 3, 4, 5]
+    ring.extend(np.arange(10, 20, dtype=np.float32)[:, None])
+    assert ring.view()[:, 0].tolist() == [16, 17, 18, 19]
@@ -0,0 +1,72 @@
+from types import MappingProxyType
+
+import pytest
+
+import command_parser
+from command_parser import cache_clear, cache_info, disable_cache, enable_cache, parse_command, parse_commands
+
+
+@pytest.fixture
+def cache():
+    enable_cache(maxsize=2)
+    yield
+    disable_cache()
+
+
+def test_disabled_by_default_returns_plain_dicts():
+    assert cache_info().maxsize == 0
+    result = parse_command("volume up")
+    assert isinstance(result, dict)
+    result["params"]["action"] = "down"
+    assert parse_command("volume up")["params"]["action"] == "up"
+
+
+def test_hits_share_normalized_key(cache):
+    first = parse_command("Volume up")
+    second = parse_command("  jarvis volume UP! ")
+    assert second is first
+    assert first == {"command": "control_volume", "params": {"action": "up", "level": None}}
+    info = cache_info()
+    assert (info.hits, info.misses, info.size) == (1, 1, 1)
+    assert info.to_dict()["hit_rate"] == 0.5
+
+
+def test_results_are_read_only(cache):
+    result = parse_command("set volume to 40")
+    with pytest.raises(TypeError):
+        result["command"] = "search"
+    with pytest.raises(TypeError):
+        result["params"]["level"] = 100
+    assert parse_command("set volume to 40")["params"]["level"] == 40
+
+
+def test_every_result_has_one_type(cache):
+    texts = ["set volume to 40", "", "open spotify", "set volume to 40"]
+    for result in [parse_command(t) for t in texts] + list(parse_commands(texts * 20, workers=2, chunksize=16)):
+        assert isinstance(result, MappingProxyType)
+        assert isinstance(result["params"], MappingProxyType)
+    disable_cache()
+    for result in [parse_command(t) for t in texts] + list(parse_commands(texts * 20, workers=2, chunksize=16)):
+        assert type(result) is dict
+
+
+def test_lru_eviction_and_clear(cache):
+    parse_command("pause")
+    parse_command("play")
+    parse_command("pause")          # refresh "pause"
+    parse_command("scroll down")    # evicts "play"
+    assert cache_info().evictions == 1
+    parse_command("pause")
+    assert cache_info().hits == 2
+    parse_command("play")
+    assert cache_info().misses == 4
+
+    cache_clear()
+    info = cache_info()
+    assert (info.hits, info.misses, info.evictions, info.size) == (0, 0, 0, 0)
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        enable_cache(0)
+    assert command_parser._PARSE_CACHE is None
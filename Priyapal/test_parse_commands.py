@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from command_parser import BatchParseStats, parse_command, parse_commands
+
+_UTTERANCES = [
+    "open the browser", "launch firefox", "search for python tutorials",
+    "what time is it", "lock screen", "mute the volume", "set volume to 40 percent",
+    "open spotify", "close slack", "next song", "scroll down", "tell me a joke",
+]
+
+
+def build_corpus(size, seed):
+    rng = random.Random(seed)
+    return [rng.choice(["", "jarvis ", "hey jarvis "]) + rng.choice(_UTTERANCES) for _ in range(size)]
+
+
+def test_serial_fallback_for_small_input():
+    texts = ["volume up", "", "jarvis what time is it", "open spotify"]
+    stats = BatchParseStats()
+    results = list(parse_commands(texts, workers=4, chunksize=16, stats=stats))
+    assert results == [parse_command(t) for t in texts]
+    assert (stats.utterances, stats.chunks, stats.workers) == (4, 1, 1)
+
+
+def test_process_pool_keeps_input_order():
+    texts = build_corpus(500, seed=7)
+    stats = BatchParseStats()
+    results = list(parse_commands(iter(texts), workers=2, chunksize=37, stats=stats))
+    assert results == [parse_command(t) for t in texts]
+    assert stats.workers == 2
+    assert stats.utterances == 500
+    assert stats.chunks == 14
+    assert stats.utterances_per_second > 0
+
+
+def test_empty_input_and_bad_chunksize():
+    assert list(parse_commands([], workers=2)) == []
+    with pytest.raises(ValueError):
+        list(parse_commands(["pause"], chunksize=0))
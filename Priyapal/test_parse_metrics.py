@@ -0,0 +1,75 @@
+import os
+import sys
+
+import pytest
+
+# Project root, for the shared common.parse_metrics
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from command_parser import (
+    disable_metrics, enable_cache, disable_cache, enable_metrics, metrics_snapshot,
+    parse_command, reset_metrics,
+)
+
+
+@pytest.fixture
+def metrics():
+    enable_metrics()
+    yield
+    disable_metrics()
+
+
+def test_disabled_by_default():
+    parse_command("volume up")
+    snap = metrics_snapshot()
+    assert snap["enabled"] is False
+    assert snap["calls"] == 0 and snap["patterns"] == {} and snap["latency"] == {}
+
+
+def test_pattern_attempts_and_hits(metrics):
+    parse_command("volume up")
+    parse_command("open chrome")
+    snap = metrics_snapshot()
+    assert snap["calls"] == 2
+    assert snap["patterns"]["control_volume"] == {"attempts": 1, "hits": 1}
+    # "open chrome" tries open_browser first and matches it.
+    assert snap["patterns"]["open_browser"] == {"attempts": 1, "hits": 1}
+    assert snap["fallbacks"] == {}
+
+
+def test_fallbacks_are_counted(metrics):
+    parse_command("tell me a joke")
+    parse_command("how is the weather")
+    parse_command("the time in tokyo")
+    snap = metrics_snapshot()
+    assert snap["fallbacks"] == {"search": 2, "get_time": 1}
+
+
+def test_latency_histogram_per_intent(metrics):
+    for _ in range(3):
+        parse_command("scroll down")
+    snap = metrics_snapshot()
+    lat = snap["latency"]["scroll"]
+    assert lat["count"] == 3
+    assert sum(lat["histogram"]) == 3
+    assert len(lat["histogram"]) == len(snap["latency_buckets_us"]) + 1
+    assert lat["mean_us"] > 0
+
+
+def test_cache_hits_record_latency_but_not_patterns(metrics):
+    enable_cache(8)
+    try:
+        parse_command("volume up")
+        parse_command("volume up")
+    finally:
+        disable_cache()
+    snap = metrics_snapshot()
+    assert snap["calls"] == 2
+    assert snap["patterns"]["control_volume"]["attempts"] == 1
+
+
+def test_reset_keeps_metrics_enabled(metrics):
+    parse_command("pause")
+    reset_metrics()
+    snap = metrics_snapshot()
+    assert snap["enabled"] is True and snap["calls"] == 0
@@ -0,0 +1,62 @@
+from command_parser import ParseSession, parse_command
+
+
+def test_provisional_once_unambiguous():
+    s = ParseSession()
+    assert s.feed("volume") is None
+    assert s.feed("up") == {"command": "control_volume", "params": {"action": "up", "level": None}}
+    s.finalize()
+    assert s.confirmed
+
+
+def test_waits_for_higher_priority_candidates():
+    s = ParseSession()
+    assert s.feed("open") is None
+    # control_app matches "open the", but open_browser ranks higher.
+    assert s.feed("the") is None
+    assert s.feed("browser") == {"command": "open_browser", "params": {"browser": None}}
+
+
+def test_noop_intents_and_wake_words():
+    s = ParseSession()
+    for word in ("hey", "jarvis", "what", "time", "is"):
+        assert s.feed(word) is None
+    assert s.feed("it") == {"command": "get_time", "params": {}}
+
+
+def test_update_rewinds_on_revision():
+    s = ParseSession()
+    s.update("scroll")
+    assert s.update("scroll down") == {"command": "scroll", "params": {"direction": "down"}}
+    # ASR revises the last word: only that word is replayed.
+    assert s.update("scroll up") == {"command": "scroll", "params": {"direction": "up"}}
+    assert s.update("scroll up")["params"] == {"direction": "up"}
+    assert s.update("school") is None
+    assert s.candidates == frozenset()
+
+
+def test_candidates_match_full_scan():
+    s = ParseSession()
+    s.update("please shut down the computer")
+    assert "system_power" in s.candidates
+    assert s.update("please shut the computer") is None
+    assert "system_power" not in s.candidates
+
+
+def test_finalize_reports_mismatch():
+    s = ParseSession()
+    s.update("pause")
+    assert s.provisional == {"command": "media_control", "params": {"action": "pause"}}
+    final = s.finalize("pause and open chrome")
+    assert final == parse_command("pause and open chrome")
+    assert not s.confirmed
+
+
+def test_free_text_intents_wait_for_finalize():
+    s = ParseSession()
+    for word in ("search", "for", "the", "news"):
+        assert s.feed(word) is None
+    assert s.finalize() == parse_command("search for the news")
+    assert s.final["command"] == "search"
+    for hypothesis in ("look up the", "open vs", "open vscode", "open downloads folder"):
+        assert ParseSession().update(hypothesis) is None
@@ -0,0 +1,51 @@
+import pytest
+
+from wake_word_enhancement import PhoneticIndex, WakeConfig, WakeWordDetector, phonetic_key
+
+
+@pytest.mark.parametrize("words,key", [
+    (["vox", "box", "fox", "vocks", "Vox!"], "12"),
+    (["hey", "a", "hay"], "A"),
+    (["ok", "okay"], "A2"),
+])
+def test_sound_alike_words_share_a_key(words, key):
+    assert {phonetic_key(w) for w in words} == {key}
+
+
+def test_index_search_and_prefix():
+    index = PhoneticIndex(["hey vox", "hey voxmind"])
+    assert index.search("so a fox said open chrome") == "hey vox"
+    assert index.search("box is on the table") is None
+    assert index.match_prefix("hey vocks, what time") == ("hey vox", len("hey vocks"))
+    assert index.match_prefix("hey voxmind start") == ("hey voxmind", len("hey voxmind"))
+    assert index.match_prefix("open chrome hey vox") is None
+    index.add("ok vox")
+    assert index.search("okay fox play") == "ok vox"
+
+
+def test_detector_phonetic_tier_respects_thresholds():
+    detector = WakeWordDetector(WakeConfig(primary_phrases=["hey vox"], secondary_phrases=["vox"],
+                                           sensitivity=0.9, debounce_seconds=0.0))
+    assert detector.detect_and_strip_wake("hay vox open chrome") == (True, "open chrome")
+    assert detector.detect_in_text("so hey box open chrome")
+    # "vox" at 0.9 allows no edits, so a lone "box" is not a wake word
+    assert not detector.detect_in_text("box is on the table")
+    detector.set_fuzzy_thresholds(primary=1.0, secondary=0.9)
+    assert not detector.detect_in_text("so hey box open chrome")
+
+
+# Same phonetic keys as a wake phrase ("a"/"hey"/"i" -> "A", "bus"/"fix" -> "12"),
+# but several edits away from it
+NOT_WAKE = [
+    "it is a big deal", "take a bus home", "i need a bike", "what a face", "open a book",
+    "a piece of cake please", "hey pass me the salt", "I fix cars", "a fox jumped",
+]
+
+
+@pytest.mark.parametrize("text", NOT_WAKE)
+def test_key_collisions_are_not_wake_words(text):
+    detector = WakeWordDetector(WakeConfig(primary_phrases=["hey vox", "ok vox", "hey voxmind"],
+                                           secondary_phrases=["vox"], sensitivity=0.8,
+                                           debounce_seconds=0.0))
+    assert not detector.detect_in_text(text)
+    assert detector.detect_and_strip_wake(text) == (False, text)
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+import wake_word_enhancement
+from wake_word_enhancement import FuzzyPhraseMatcher, PhraseTrie, WakeConfig, WakeWordDetector
+
+
+def _random_phrases(rng, count):
+    phrases = []
+    while len(phrases) < count:
+        name = "".join(rng.choice("bcdfgklmnprstvx") + rng.choice("aeiou") for _ in range(rng.randint(1, 2)))
+        phrase = f"{rng.choice(['hey', 'ok', 'hello', 'hi'])} {name}"
+        if phrase not in phrases:
+            phrases.append(phrase)
+    return phrases
+
+
+def test_fuzzy_prefix_matches_per_phrase_distances():
+    rng = random.Random(9)
+    for _ in range(2000):
+        phrases = list(dict.fromkeys("".join(rng.choice("hey vox") for _ in range(rng.randint(1, 9)))
+                                     for _ in range(rng.randint(1, 8))))
+        text = "".join(rng.choice("hey vox") for _ in range(rng.randint(0, 16)))
+        threshold = rng.choice([0.5, 0.7, 0.8, 0.9, 1.0])
+        expected = []
+        for order, phrase in enumerate(phrases):
+            matcher = FuzzyPhraseMatcher(phrase)
+            edits = matcher.prefix_distance(text)
+            if edits <= matcher.max_errors(threshold):
+                expected.append((order, edits, phrase))
+        assert PhraseTrie(phrases).fuzzy_prefix(text, threshold) == expected
+
+
+def test_exact_matches_are_word_bounded():
+    trie = PhraseTrie(["hey vox", "vox", "hey voxmind"])
+    found = sorted((start, phrase) for _, start, phrase in trie.exact_matches("hey voxmind, vox! voxx"))
+    assert found == [(0, "hey voxmind"), (13, "vox")]
+    assert trie.exact_matches("so hey vox", max_start=2) == []
+    assert not trie.add("vox") and len(trie) == 3
+
+
+def _trie_and_loop_inputs(seed):
+    rng = random.Random(seed)
+    phrases = ["hey vox", "ok vox", "hey voxmind"] + _random_phrases(rng, 60)
+    words = "hey vox box fox a ok okay hay vocks voxmind open the chrome".split() + \
+        [p.split()[1] for p in phrases[3:40]]
+    texts = [" ".join(rng.choice(words) for _ in range(rng.randint(0, 5))) for _ in range(500)]
+    # Phrases inside longer words ("theyvox") and after punctuation
+    texts += ["theyvox lights on", "so they box it", "okey,vox play", "xhey vox", "ahey voxmind start"]
+    return phrases, texts
+
+
+@pytest.mark.parametrize("method", ["detect_and_strip_wake", "detect_in_text"])
+@pytest.mark.parametrize("sensitivity", [0.2, 0.5, 0.9])
+def test_trie_and_loops_agree(monkeypatch, method, sensitivity):
+    phrases, texts = _trie_and_loop_inputs(4)
+    config = dict(secondary_phrases=["vox"], sensitivity=sensitivity, debounce_seconds=0.0)
+    trie = WakeWordDetector(WakeConfig(primary_phrases=list(phrases), **config))
+    loops = WakeWordDetector(WakeConfig(primary_phrases=list(phrases), **config))
+    for text in texts:
+        with_trie = getattr(trie, method)(text)
+        monkeypatch.setattr(wake_word_enhancement, "TRIE_MIN_PHRASES", 1 << 30)
+        assert getattr(loops, method)(text) == with_trie, text
+        monkeypatch.undo()
+
+
+def test_add_phrase_at_runtime():
+    others = [p for p in _random_phrases(random.Random(1), 120) if p.startswith(("ok", "hello"))][:40]
+    detector = WakeWordDetector(WakeConfig(primary_phrases=others,
+                                           sensitivity=0.5, debounce_seconds=0.0))
+    assert not detector.detect_in_text("hey jarvis lights on")
+    assert detector.add_phrase("Hey Jarvis")
+    assert detector.detect_in_text("hey jarvis lights on")
+    detector.set_sensitivity(0.9)
+    assert not detector.add_phrase("hey jarvis")
+    assert detector.detect_and_strip_wake("hey jarvis lights on") == (True, "lights on")
+    assert detector.detect_and_strip_wake("hey jarvi lights on") == (True, "lights on")
+    assert detector.detect_in_text("so um hey jervis play music")
+    assert detector.config.primary_phrases[-1] == "hey jarvis"
+    assert len(detector._tries[True]) == 41
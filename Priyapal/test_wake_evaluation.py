@@ -0,0 +1,63 @@
+import itertools
+
+import pytest
+
+from wake_word_enhancement import WakeConfig, WakeWordDetector, format_roc_table, roc_table
+
+
+TEXTS = [
+    "hey vox open chrome", "ok vox play music", "hey voxmind what time is it", "vox, volume up",
+    "hey box open chrome", "a fox play music", "hay vocks lights on", "okay fox stop",
+    "hey voxx pause", "box is on the table", "the fox jumped", "open chrome", "", "hey",
+    "so hey vox later", "vex, next song", "hey vexmind",
+]
+
+
+# Several contain words that sound like a wake phrase ("a bus", "i fix") but are far from it
+NEGATIVES = [
+    "box is on the table", "fox news", "open chrome", "take a bus home", "it is a big deal",
+    "i need a bike", "a piece of cake please", "hey pass me the salt", "I fix cars",
+]
+
+
+def make_config(sensitivity=0.5, primary=0.8, secondary=0.9):
+    return WakeConfig(primary_phrases=["hey vox", "ok vox", "hey voxmind"], secondary_phrases=["vox"],
+                      sensitivity=sensitivity, debounce_seconds=0.0,
+                      primary_fuzzy_threshold=primary, secondary_fuzzy_threshold=secondary)
+
+
+@pytest.fixture(scope="module")
+def evaluation():
+    return WakeWordDetector(make_config()).evaluate_many(TEXTS)
+
+
+@pytest.mark.parametrize("sensitivity,primary,secondary", list(itertools.product(
+    [0.2, 0.5, 0.8, 1.0], [0.6, 0.8, 0.85, 1.0], [0.6, 0.67, 0.9])))
+def test_scores_reproduce_detect_and_strip_wake(evaluation, sensitivity, primary, secondary):
+    detector = WakeWordDetector(make_config(sensitivity, primary, secondary))
+    expected = [detector.detect_and_strip_wake(t)[0] for t in TEXTS]
+    assert evaluation.detections(sensitivity, primary, secondary) == expected
+
+
+def test_roc_table_matches_detection_rates(evaluation):
+    negatives = WakeWordDetector(make_config()).evaluate_many(NEGATIVES)
+    points = roc_table(evaluation, negatives, sensitivities=[0.2, 0.8], primary_thresholds=[0.7, 0.9],
+                       secondary_thresholds=[0.6, 1.0])
+    assert [(p.sensitivity, p.primary_threshold, p.secondary_threshold) for p in points] == [
+        (0.2, None, None), (0.8, 0.7, 0.6), (0.8, 0.7, 1.0), (0.8, 0.9, 0.6), (0.8, 0.9, 1.0)]
+    for p in points[1:]:
+        assert p.tpr == evaluation.detection_rate(0.8, p.primary_threshold, p.secondary_threshold)
+        assert p.far == negatives.detection_rate(0.8, p.primary_threshold, p.secondary_threshold)
+    assert points[1].far > points[-1].far
+    # One edit at most (threshold 0.8 and up): none of the negatives is close enough
+    assert all(p.far == 0.0 for p in roc_table(evaluation, negatives, sensitivities=[0.8, 1.0],
+                                               primary_thresholds=[0.8, 0.9], secondary_thresholds=[0.9]))
+    assert len(format_roc_table(points).splitlines()) == len(points) + 1
+
+
+def test_process_pool_matches_serial(evaluation):
+    detector = WakeWordDetector(make_config())
+    assert detector.evaluate_many(TEXTS * 3, workers=2, chunksize=5).primary_similarity == \
+        evaluation.primary_similarity * 3
+    with pytest.raises(ValueError):
+        detector.evaluate_many(TEXTS, chunksize=0)
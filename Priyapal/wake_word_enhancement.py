@@ -24,17 +24,62 @@ Goals
   - debounce
   - configurable fuzzy thresholds
   - simple metrics and logging for QA.
-- Keep implementation side-effect free and ready for future audio
-  integration via detect_in_audio_chunk().
+  - evaluate_many() + roc_table(): TPR/FAR over a grid of settings from
+    one scoring pass (see eval_wake.py).
+- Keep implementation side-effect free. Audio goes through
+  detect_in_audio_chunk(), which runs the offline keyword spotter
+  (keyword_spotter.py, numpy) once wake-phrase recordings are enrolled.
+
+Fuzzy matching
+--------------
+Fuzzy matches use bounded edit distance. Each wake phrase is compiled once
+into a FuzzyPhraseMatcher: Myers' bit-parallel algorithm in Hyyro's
+formulation, with one machine word per phrase. From each word start, a
+text is checked in one left-to-right pass over at most len(phrase) + k
+characters, a few integer operations per character.
+
+A similarity threshold t maps to at most floor((1 - t) * len(phrase))
+edits. That is the SequenceMatcher ratio 1 - d / n of a phrase with d
+substituted characters, so the thresholds keep their meaning.
+
+Before the full edit-distance pass, a PhoneticIndex finds the words that
+sound like a phrase ("hey box", "hay vox"). It keys every word with
+phonetic_key and looks up runs of transcript keys in a dict of
+phrase-key tuples: O(tokens). The key is coarse ("a bus", "i fix" and
+"hey vox" share one), so a hit is only a candidate. It is accepted when
+the phrase is within the threshold's edits of the text at the first
+matched word, like any other fuzzy match. The phonetic tier applies only
+to phrases whose threshold allows at least one edit, so "vox" at 0.9
+never matches "box".
+
+Many phrases
+------------
+A tier with TRIE_MIN_PHRASES or more phrases (e.g. per-user custom wake
+words) is matched through one PhraseTrie instead of phrase by phrase.
+Exact matches come from one trie walk per word start. Fuzzy matches
+come from a banded Levenshtein walk that prunes subtrees by prefix and
+length. Per-call cost then stays about flat from a handful of phrases
+to a thousand (benchmarks/wake_word_benchmark.py --phrase-counts).
+add_phrase() inserts a phrase at runtime without rebuilding the others.
+
+Either way, a fuzzy match found anywhere in a text (detect_in_text) must
+start at a word, so detection doesn't change when a tier crosses
+TRIE_MIN_PHRASES.
 """
 
 from __future__ import annotations
 
+import os
 import re
 import time
+from collections import deque
 from dataclasses import dataclass, field, asdict
-from typing import List, Tuple, Optional, Dict, Any
-from difflib import SequenceMatcher
+from functools import lru_cache
+from itertools import islice
+from typing import List, Tuple, Optional, Dict, Any, Iterable, Iterator, Sequence, Deque, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
 
 
 # Primary and secondary wake phrases.
@@ -49,12 +94,411 @@ SECONDARY_WAKE_PHRASES: List[str] = [
 ]
 
 
+def _max_errors(length: int, threshold: float) -> int:
+    return int((1.0 - threshold) * length + 1e-9)
+
+
+class FuzzyPhraseMatcher:
+    """
+    Bounded edit-distance matcher for one phrase (Myers 1999, Hyyro 2001).
+
+    Bit i of the vertical delta vectors (pv/mv) is row i of the edit-distance
+    column for the current text position, so one text character updates all
+    rows at once.
+
+    - search(text, k): phrase occurs in text with at most k edits.
+    - match_prefix(text, k, start=0): end of the best prefix of
+      text[start:] within k edits of the phrase, or None.
+    - prefix_distance(text): fewest edits between the phrase and any prefix
+      of text (match_prefix(text, k) succeeds exactly when this is <= k).
+    """
+
+    __slots__ = ("phrase", "_peq", "_mask", "_high")
+
+    def __init__(self, phrase: str) -> None:
+        self.phrase = phrase
+        peq: Dict[str, int] = {}
+        for i, ch in enumerate(phrase):
+            peq[ch] = peq.get(ch, 0) | (1 << i)
+        self._peq = peq
+        self._mask = (1 << len(phrase)) - 1
+        self._high = 1 << (len(phrase) - 1) if phrase else 0
+
+    def max_errors(self, threshold: float) -> int:
+        """Edits allowed at similarity `threshold` (see module docstring)."""
+        return _max_errors(len(self.phrase), threshold)
+
+    def search(self, text: str, k: int) -> bool:
+        m = len(self.phrase)
+        if k <= 0 or not m:
+            return self.phrase in text
+        if k >= m:
+            return True
+        peq, mask, high = self._peq, self._mask, self._high
+        pv, mv, score = mask, 0, m
+        for ch in text:
+            eq = peq.get(ch, 0)
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | (~(xh | pv) & mask)
+            mh = pv & xh
+            if ph & high:
+                score += 1
+            elif mh & high:
+                score -= 1
+                if score <= k:
+                    return True
+            # Top row stays 0: a match may start anywhere
+            ph = (ph << 1) & mask
+            mh = (mh << 1) & mask
+            pv = mh | (~(xv | ph) & mask)
+            mv = ph & xv
+        return False
+
+    def match_prefix(self, text: str, k: int, start: int = 0) -> Optional[int]:
+        """
+        Among slices text[start:j] within k edits of the phrase, the j that
+        ends a word (then fewest edits, then longest); None if there is none.
+        """
+        m, n = len(self.phrase), len(text)
+        peq, mask, high = self._peq, self._mask, self._high
+        pv, mv, score = mask, 0, m
+        best: Optional[Tuple[bool, int, int]] = (
+            (text[start:start + 1].isalnum(), m, -start) if m <= k else None
+        )
+        # Slices longer than m + k are more than k edits away
+        for j, ch in enumerate(text[start:start + m + k], start + 1):
+            eq = peq.get(ch, 0)
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | (~(xh | pv) & mask)
+            mh = pv & xh
+            if ph & high:
+                score += 1
+            elif mh & high:
+                score -= 1
+            if score <= k:
+                key = (j < n and text[j].isalnum(), score, -j)
+                if best is None or key < best:
+                    best = key
+            # Top row grows by one per character: the match starts at 0
+            ph = ((ph << 1) | 1) & mask
+            mh = (mh << 1) & mask
+            pv = mh | (~(xv | ph) & mask)
+            mv = ph & xv
+        return -best[2] if best is not None else None
+
+    def prefix_distance(self, text: str) -> int:
+        m = len(self.phrase)
+        peq, mask, high = self._peq, self._mask, self._high
+        pv, mv, score = mask, 0, m
+        best = m
+        # Prefixes longer than 2m are more than m edits away
+        for ch in text[: 2 * m]:
+            eq = peq.get(ch, 0)
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | (~(xh | pv) & mask)
+            mh = pv & xh
+            if ph & high:
+                score += 1
+            elif mh & high:
+                score -= 1
+                if score < best:
+                    best = score
+                    if not best:
+                        break
+            ph = ((ph << 1) | 1) & mask
+            mh = (mh << 1) & mask
+            pv = mh | (~(xv | ph) & mask)
+            mv = ph & xv
+        return best
+
+
+# Consonant classes of the phonetic key. Unlike Metaphone, b/f/p/v share a
+# class: "vox" heard as "box" or "fox" is the most common ASR slip here.
+_PHONETIC_CLASSES: Dict[str, str] = {
+    ch: code
+    for letters, code in (("bfpv", "1"), ("cgjkqsxz", "2"), ("dt", "3"), ("l", "4"), ("mn", "5"), ("r", "6"))
+    for ch in letters
+}
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+@lru_cache(maxsize=4096)
+def phonetic_key(word: str) -> str:
+    """
+    Soundex-style key of one word: "A" when it starts with a vowel sound,
+    then its consonant classes with repeats merged ("vox", "box", "fox",
+    "vocks" -> "12"; "hey", "a" -> "A"; "ok", "okay" -> "A2").
+    """
+    w = re.sub(r"[^a-z]", "", word.lower())
+    if not w:
+        return ""
+    w = w.replace("ck", "k").replace("ph", "f").replace("x", "ks")
+    key = "A" if w[0] in "aeiouhwy" else ""
+    last = ""
+    for ch in w:
+        code = _PHONETIC_CLASSES.get(ch)
+        if code is None:
+            if ch in "aeiou":
+                last = ""  # a vowel separates repeated classes; h, w, y don't
+            continue
+        if code != last:
+            key += code
+        last = code
+    return key
+
+
+class PhoneticIndex:
+    """
+    Phrases looked up by the phonetic keys of their words.
+
+    - search(text): a phrase whose keys occur as consecutive words of text.
+    - matches(text): (phrase, start offset) of every such run of words.
+    - match_prefix(text): (phrase, end offset) for a phrase keyed by the first
+      words of text.
+
+    Each transcript word is keyed once (keys are memoized). Then every
+    position costs one dict lookup per distinct phrase length.
+
+    The keys are coarse ("a big" keys like "hey vox"), so a hit only names
+    a candidate: WakeWordDetector accepts it after an edit-distance check.
+    """
+
+    def __init__(self, phrases: Iterable[str] = ()) -> None:
+        self._phrases: Dict[Tuple[str, ...], str] = {}
+        self._lengths: List[int] = []
+        for phrase in phrases:
+            self.add(phrase)
+
+    def add(self, phrase: str) -> None:
+        keys = tuple(phonetic_key(w) for w in _TOKEN_RE.findall(phrase.lower()))
+        if not keys or not all(keys):
+            return
+        self._phrases.setdefault(keys, phrase)
+        if len(keys) not in self._lengths:
+            self._lengths = sorted(self._lengths + [len(keys)], reverse=True)
+
+    def __len__(self) -> int:
+        return len(self._phrases)
+
+    def search(self, text: str) -> Optional[str]:
+        for phrase, _ in self.matches(text):
+            return phrase
+        return None
+
+    def matches(self, text: str) -> Iterator[Tuple[str, int]]:
+        """(phrase, start offset) of every run of words keyed like a phrase, in text order."""
+        if not self._phrases:
+            return
+        tokens = list(_TOKEN_RE.finditer(text))
+        keys = [phonetic_key(m.group()) for m in tokens]
+        for i in range(len(keys)):
+            for n in self._lengths:
+                phrase = self._phrases.get(tuple(keys[i:i + n]))
+                if phrase is not None:
+                    yield phrase, tokens[i].start()
+
+    def match_prefix(self, text: str) -> Optional[Tuple[str, int]]:
+        matches = self.prefix_matches(text)
+        return matches[0] if matches else None
+
+    def prefix_matches(self, text: str) -> List[Tuple[str, int]]:
+        """Every (phrase, end offset) keyed by the first words of text, longest first."""
+        if not self._phrases:
+            return []
+        tokens = []
+        for m in _TOKEN_RE.finditer(text):
+            tokens.append(m)
+            if len(tokens) == self._lengths[0]:
+                break
+        keys = tuple(phonetic_key(m.group()) for m in tokens)
+        # Longest phrase first: "hey voxmind" before "hey vox"
+        matches = []
+        for n in self._lengths:
+            phrase = self._phrases.get(keys[:n]) if n <= len(keys) else None
+            if phrase is not None:
+                matches.append((phrase, tokens[n - 1].end()))
+        return matches
+
+
+# Tiers with at least this many phrases are matched through a PhraseTrie;
+# smaller ones phrase by phrase (regex and one bit-parallel pass each),
+# which is faster for a handful of phrases.
+TRIE_MIN_PHRASES = 16
+
+_WORD_START_RE = re.compile(r"\b\w")
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class _TrieNode:
+    __slots__ = ("children", "phrase", "order", "min_len", "max_len")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.phrase: Optional[str] = None
+        self.order = -1
+        # Shortest and longest phrase in this subtree
+        self.min_len = 1 << 30
+        self.max_len = 0
+
+
+class PhraseTrie:
+    """
+    Character trie of wake phrases, for matching hundreds of them at once.
+
+    - add(phrase): O(len(phrase)); nothing is rebuilt.
+    - exact_matches(text): every phrase occurring word-bounded (like
+      r"\bphrase\b"), found by one walk from each word start. The cost
+      depends on the text and the longest phrase, not the phrase count.
+    - fuzzy_prefix(text, threshold, start): phrases within max_errors of a
+      prefix of text[start:]. This is a Levenshtein walk down the trie:
+      shared phrase prefixes share their DP rows, only the diagonal band of
+      width 2k + 1 is computed, and a subtree is dropped as soon as its row
+      minimum exceeds the edits its longest phrase allows (prefix pruning)
+      or the text is too short for its shortest phrase (length pruning).
+    - fuzzy_search(text, threshold): a phrase within max_errors of the text
+      at some word start.
+
+    Results are ordered by insertion order, so the first configured phrase
+    wins, as with the per-phrase loops.
+    """
+
+    def __init__(self, phrases: Iterable[str] = ()) -> None:
+        self._root = _TrieNode()
+        self._count = 0
+        for phrase in phrases:
+            self.add(phrase)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, phrase: str) -> bool:
+        """Insert phrase; False if it is empty or already present."""
+        if not phrase:
+            return False
+        node, path = self._root, [self._root]
+        for ch in phrase:
+            child = node.children.get(ch)
+            if child is None:
+                child = node.children[ch] = _TrieNode()
+            node = child
+            path.append(node)
+        if node.phrase is not None:
+            return False
+        node.phrase, node.order = phrase, self._count
+        self._count += 1
+        m = len(phrase)
+        for n in path:
+            n.min_len = min(n.min_len, m)
+            n.max_len = max(n.max_len, m)
+        return True
+
+    def exact_matches(self, text: str, max_start: Optional[int] = None) -> List[Tuple[int, int, str]]:
+        """(order, start, phrase) of every word-bounded occurrence starting at or before max_start."""
+        matches = []
+        n = len(text)
+        for word in _WORD_START_RE.finditer(text):
+            start = word.start()
+            if max_start is not None and start > max_start:
+                break
+            node = self._root
+            for i in range(start, n):
+                node = node.children.get(text[i])
+                if node is None:
+                    break
+                if node.phrase is not None and (i + 1 == n or not _is_word_char(text[i + 1])):
+                    matches.append((node.order, start, node.phrase))
+        return matches
+
+    def fuzzy_prefix(self, text: str, threshold: float, start: int = 0,
+                     first: bool = False) -> List[Tuple[int, int, str]]:
+        """
+        (order, edits, phrase) of every phrase within max_errors(threshold)
+        edits of some prefix of text[start:], sorted by order. With `first`,
+        stop at the first one found.
+        """
+        root = self._root
+        if not root.children:
+            return []
+        k_of = [_max_errors(m, threshold) for m in range(root.max_len + 1)]
+        window = text[start:start + root.max_len + k_of[root.max_len]]
+        width = len(window)
+        big = root.max_len + width + 1
+        matches = []
+        # Row j: edits between the node's phrase prefix and window[:j]
+        stack = [(root, list(range(width + 1)))]
+        while stack:
+            node, row = stack.pop()
+            depth = row[0] + 1
+            for ch, child in node.children.items():
+                k = k_of[child.max_len]
+                if child.min_len - k_of[child.min_len] > width:
+                    continue
+                new = [big] * (width + 1)
+                new[0] = left = depth
+                lo, hi = max(1, depth - k), min(width, depth + k)
+                if lo > 1:
+                    left = big
+                for j in range(lo, hi + 1):
+                    v = row[j - 1] + (window[j - 1] != ch)
+                    if row[j] + 1 < v:
+                        v = row[j] + 1
+                    if left + 1 < v:
+                        v = left + 1
+                    new[j] = left = v
+                best = min(new[lo:hi + 1]) if lo <= hi else big
+                if depth <= k:
+                    best = min(best, depth)
+                if best > k:
+                    continue
+                if child.phrase is not None and best <= k_of[len(child.phrase)]:
+                    matches.append((child.order, best, child.phrase))
+                    if first:
+                        return matches
+                if child.children:
+                    stack.append((child, new))
+        matches.sort()
+        return matches
+
+    def fuzzy_search(self, text: str, threshold: float) -> Optional[str]:
+        for word in _WORD_START_RE.finditer(text):
+            found = self.fuzzy_prefix(text, threshold, word.start(), first=True)
+            if found:
+                return found[0][2]
+        return None
+
+
+class _DummyMatch:
+    """Start offset of a match found without a regex."""
+
+    def __init__(self, start: int) -> None:
+        self._start = start
+
+    def start(self) -> int:
+        return self._start
+
+
+def _keyword_spotter():
+    """A new KeywordSpotter (imported lazily: it needs numpy, text detection doesn't)."""
+    try:
+        from .keyword_spotter import KeywordSpotter
+    except ImportError:  # imported as a top-level module
+        from keyword_spotter import KeywordSpotter
+    return KeywordSpotter()
+
+
 @dataclass
 class WakeMetrics:
     """
     Metrics to support QA:
 
     - total_text_checks: number of detect_in_text / detect_and_strip_wake calls.
+    - total_audio_chunks: number of detect_in_audio_chunk calls.
     - triggers: number of successful detections.
     - suppressed_by_debounce: detections that were ignored because
       debounce interval had not passed.
@@ -63,6 +507,7 @@ class WakeMetrics:
     """
 
     total_text_checks: int = 0
+    total_audio_chunks: int = 0
     triggers: int = 0
     suppressed_by_debounce: int = 0
     fuzzy_matches: int = 0
@@ -106,6 +551,176 @@ class WakeConfig:
     secondary_fuzzy_threshold: float = 0.9
 
 
+@dataclass
+class WakeEvaluation:
+    """
+    Best wake-phrase scores of a corpus, one entry per text (see
+    WakeWordDetector.evaluate_many). Whether detect_and_strip_wake fires
+    at any sensitivity and fuzzy thresholds follows from them, so a whole
+    grid of settings is evaluated without re-matching any text.
+
+    - *_exact: a phrase of the tier occurs, word-bounded, near the start.
+    - *_similarity: best fuzzy similarity of the tier at the start,
+      1 - edits / len(phrase), with the real edit distance also for
+      sounds-alike words (PhoneticIndex). -inf for empty text.
+    """
+
+    primary_exact: List[bool] = field(default_factory=list)
+    primary_similarity: List[float] = field(default_factory=list)
+    secondary_exact: List[bool] = field(default_factory=list)
+    secondary_similarity: List[float] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.primary_exact)
+
+    def append(self, scores: Tuple[bool, float, bool, float]) -> None:
+        self.primary_exact.append(scores[0])
+        self.primary_similarity.append(scores[1])
+        self.secondary_exact.append(scores[2])
+        self.secondary_similarity.append(scores[3])
+
+    def extend(self, other: "WakeEvaluation") -> None:
+        self.primary_exact.extend(other.primary_exact)
+        self.primary_similarity.extend(other.primary_similarity)
+        self.secondary_exact.extend(other.secondary_exact)
+        self.secondary_similarity.extend(other.secondary_similarity)
+
+    def detections(self, sensitivity: float, primary_threshold: float,
+                   secondary_threshold: float) -> List[bool]:
+        """Per text, whether detect_and_strip_wake would fire with these settings."""
+        return [
+            _detected(pe, ps, se, ss, sensitivity, primary_threshold, secondary_threshold)
+            for pe, ps, se, ss in zip(self.primary_exact, self.primary_similarity,
+                                      self.secondary_exact, self.secondary_similarity)
+        ]
+
+    def detection_rate(self, sensitivity: float, primary_threshold: float,
+                       secondary_threshold: float) -> float:
+        if not len(self):
+            return 0.0
+        return _detection_count(self._summary(), sensitivity, primary_threshold,
+                                secondary_threshold) / len(self)
+
+    def _summary(self) -> Tuple[int, int, Dict[Tuple[float, float], int]]:
+        """(primary exact, any exact, counts of similarity pairs of the rest)."""
+        primary = either = 0
+        rest: Dict[Tuple[float, float], int] = {}
+        for pe, ps, se, ss in zip(self.primary_exact, self.primary_similarity,
+                                  self.secondary_exact, self.secondary_similarity):
+            if pe or se:
+                primary += pe
+                either += 1
+            else:
+                rest[(ps, ss)] = rest.get((ps, ss), 0) + 1
+        return primary, either, rest
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _accepts(similarity: float, threshold: float) -> bool:
+    # Same rounding as FuzzyPhraseMatcher.max_errors
+    return threshold <= similarity + 1e-9
+
+
+def _detected(primary_exact: bool, primary_similarity: float, secondary_exact: bool,
+              secondary_similarity: float, sensitivity: float, primary_threshold: float,
+              secondary_threshold: float) -> bool:
+    """Mirror of detect_and_strip_wake's decision (without debounce)."""
+    if primary_exact:
+        return True
+    if sensitivity < 0.4:
+        return False
+    if secondary_exact:
+        return True
+    return sensitivity >= 0.8 and (
+        _accepts(primary_similarity, primary_threshold)
+        or _accepts(secondary_similarity, secondary_threshold)
+    )
+
+
+def _detection_count(summary: Tuple[int, int, Dict[Tuple[float, float], int]], sensitivity: float,
+                     primary_threshold: float, secondary_threshold: float) -> int:
+    primary, either, rest = summary
+    if sensitivity < 0.4:
+        return primary
+    if sensitivity < 0.8:
+        return either
+    return either + sum(
+        count for (ps, ss), count in rest.items()
+        if _accepts(ps, primary_threshold) or _accepts(ss, secondary_threshold)
+    )
+
+
+@dataclass
+class RocPoint:
+    """TPR/FAR of one setting. Thresholds are None where fuzzy matching is off (sensitivity < 0.8)."""
+
+    sensitivity: float
+    primary_threshold: Optional[float]
+    secondary_threshold: Optional[float]
+    tpr: float
+    far: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+DEFAULT_ROC_SENSITIVITIES: Tuple[float, ...] = (0.2, 0.5, 0.8, 1.0)
+DEFAULT_ROC_THRESHOLDS: Tuple[float, ...] = (0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95, 1.0)
+
+
+def roc_table(
+    positives: WakeEvaluation,
+    negatives: WakeEvaluation,
+    sensitivities: Sequence[float] = DEFAULT_ROC_SENSITIVITIES,
+    primary_thresholds: Sequence[float] = DEFAULT_ROC_THRESHOLDS,
+    secondary_thresholds: Sequence[float] = DEFAULT_ROC_THRESHOLDS,
+) -> List[RocPoint]:
+    """
+    TPR on `positives` and FAR on `negatives` for every setting in the
+    grid. Each corpus is summarized once (exact hits plus counts of
+    distinct similarity pairs), so a grid point costs O(distinct pairs),
+    not O(texts).
+    """
+    pos, neg = positives._summary(), negatives._summary()
+    n_pos, n_neg = max(1, len(positives)), max(1, len(negatives))
+    points = []
+    for sensitivity in sensitivities:
+        grid: List[Tuple[Optional[float], Optional[float]]] = [(None, None)]
+        if sensitivity >= 0.8:
+            grid = [(p, q) for p in primary_thresholds for q in secondary_thresholds]
+        for p, q in grid:
+            pt, st = (p, q) if p is not None else (1.0, 1.0)
+            points.append(RocPoint(
+                sensitivity, p, q,
+                tpr=_detection_count(pos, sensitivity, pt, st) / n_pos,
+                far=_detection_count(neg, sensitivity, pt, st) / n_neg,
+            ))
+    return points
+
+
+def format_roc_table(points: Sequence[RocPoint]) -> str:
+    """Plain-text table of roc_table output, one row per setting."""
+    def fmt(threshold: Optional[float]) -> str:
+        return "-" if threshold is None else f"{threshold:.2f}"
+
+    lines = [f"{'sens':>5} {'primary':>8} {'secondary':>9} {'TPR':>6} {'FAR':>6}"]
+    for pt in points:
+        lines.append(f"{pt.sensitivity:>5.2f} {fmt(pt.primary_threshold):>8} "
+                     f"{fmt(pt.secondary_threshold):>9} {pt.tpr:>6.3f} {pt.far:>6.3f}")
+    return "\n".join(lines)
+
+
+def _evaluate_chunk(config: WakeConfig, chunk: List[str]) -> WakeEvaluation:
+    """Score a chunk of texts in a worker process."""
+    detector = WakeWordDetector(config)
+    evaluation = WakeEvaluation()
+    for text in chunk:
+        evaluation.append(detector._best_scores(text))
+    return evaluation
+
+
 class WakeWordDetector:
     """
     Wake-word detector for text transcripts.
@@ -121,7 +736,10 @@ class WakeWordDetector:
     ---
     - detect_in_text(text) -> bool
     - detect_and_strip_wake(text) -> (bool, stripped_text)
-    - detect_in_audio_chunk(audio_chunk) -> bool  (stub for future engines)
+    - add_phrase(phrase, primary=True) -> bool  (runtime custom wake words)
+    - enroll_audio(recording), load_wake_templates(directory) -> int
+    - detect_in_audio_chunk(audio_chunk) -> bool  (16 kHz PCM16 stream)
+    - evaluate_many(texts) -> WakeEvaluation  (offline QA; see roc_table)
     - metrics, metrics.to_dict()
     - log_metrics(prefix: str = "") -> None
     """
@@ -145,14 +763,25 @@ class WakeWordDetector:
         self._secondary_patterns: List[Tuple[str, re.Pattern[str]]] = []
 
         for phrase in self.config.primary_phrases:
-            escaped = re.escape(phrase)
-            pattern = re.compile(r"\b" + escaped + r"\b", re.I)
-            self._primary_patterns.append((phrase, pattern))
+            self._primary_patterns.append((phrase, self._compile_phrase(phrase)))
 
         for phrase in self.config.secondary_phrases:
-            escaped = re.escape(phrase)
-            pattern = re.compile(r"\b" + escaped + r"\b", re.I)
-            self._secondary_patterns.append((phrase, pattern))
+            self._secondary_patterns.append((phrase, self._compile_phrase(phrase)))
+
+        # Fuzzy matchers, compiled once per phrase
+        self._matchers: Dict[str, FuzzyPhraseMatcher] = {
+            phrase: FuzzyPhraseMatcher(phrase)
+            for phrase in self.config.primary_phrases + self.config.secondary_phrases
+        }
+        # All phrases of a tier in one trie, used once the tier is large
+        self._tries: Dict[bool, PhraseTrie] = {
+            True: PhraseTrie(self.config.primary_phrases),
+            False: PhraseTrie(self.config.secondary_phrases),
+        }
+        self._build_phonetic_indexes()
+
+        # Keyword spotter for raw audio; created by the first enrollment
+        self.spotter = None
 
     # --------------------------------------------------------
     # Public API
@@ -180,6 +809,26 @@ class WakeWordDetector:
         """
         self.config.primary_fuzzy_threshold = max(0.0, min(1.0, primary))
         self.config.secondary_fuzzy_threshold = max(0.0, min(1.0, secondary))
+        self._build_phonetic_indexes()
+
+    def add_phrase(self, phrase: str, primary: bool = True) -> bool:
+        """
+        Add a wake phrase at runtime (e.g. a user's custom wake word).
+        Only this phrase is compiled and inserted; the other phrases'
+        structures are left as they are. Returns False if it was already
+        configured.
+        """
+        phrase = phrase.strip().lower()
+        phrases = self.config.primary_phrases if primary else self.config.secondary_phrases
+        if not phrase or phrase in phrases:
+            return False
+        phrases.append(phrase)
+        patterns = self._primary_patterns if primary else self._secondary_patterns
+        patterns.append((phrase, self._compile_phrase(phrase)))
+        self._tries[primary].add(phrase)
+        if self._matcher(phrase).max_errors(self._threshold(primary)) >= 1:
+            self._phonetic[primary].add(phrase)
+        return True
 
     def reset_debounce(self) -> None:
         """Reset debounce timer (useful for tests)."""
@@ -201,6 +850,7 @@ class WakeWordDetector:
             print(prefix, end="")
         print(
             f"WakeMetrics(total_text_checks={data['total_text_checks']}, "
+            f"total_audio_chunks={data['total_audio_chunks']}, "
             f"triggers={data['triggers']}, "
             f"suppressed_by_debounce={data['suppressed_by_debounce']}, "
             f"fuzzy_matches={data['fuzzy_matches']})"
@@ -255,7 +905,7 @@ class WakeWordDetector:
         # Primary phrases near the start
         m, phrase_len, fuzzy_used = self._find_phrase_near_start(
             low,
-            self._primary_patterns,
+            True,
             self.config.primary_fuzzy_threshold,
         )
         if m:
@@ -268,7 +918,7 @@ class WakeWordDetector:
         if self.config.sensitivity >= 0.4:
             m2, phrase_len2, fuzzy_used2 = self._find_phrase_near_start(
                 low,
-                self._secondary_patterns,
+                False,
                 self.config.secondary_fuzzy_threshold,
             )
             if m2:
@@ -279,17 +929,104 @@ class WakeWordDetector:
 
         return False, raw
 
+    def evaluate_many(
+        self,
+        texts: Iterable[str],
+        workers: Optional[int] = None,
+        chunksize: int = 2048,
+    ) -> WakeEvaluation:
+        """
+        Score every text once for offline evaluation (see WakeEvaluation).
+        Sensitivity, thresholds, debounce and metrics are not involved. Feed
+        the result to roc_table for TPR/FAR over a grid of settings.
+
+        Inputs longer than one chunk are scored by a process pool when
+        `workers` > 1 (default: os.cpu_count()), with at most 2 * workers
+        chunks in flight, like command_parser.parse_commands.
+        """
+        if chunksize <= 0:
+            raise ValueError("chunksize must be a positive integer")
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        evaluation = WakeEvaluation()
+        it = iter(texts)
+        first = list(islice(it, chunksize))
+        second = list(islice(it, chunksize)) if workers > 1 and len(first) == chunksize else []
+
+        if not second:
+            chunk = first
+            while chunk:
+                for text in chunk:
+                    evaluation.append(self._best_scores(text))
+                chunk = list(islice(it, chunksize))
+            return evaluation
+
+        # Imported here, as in command_parser: multiprocessing is slow to import
+        from concurrent.futures import ProcessPoolExecutor
+
+        pending: Deque["Future[WakeEvaluation]"] = deque()
+        pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            pending.append(pool.submit(_evaluate_chunk, self.config, first))
+            pending.append(pool.submit(_evaluate_chunk, self.config, second))
+            exhausted = False
+            while pending:
+                while not exhausted and len(pending) < 2 * workers:
+                    chunk = list(islice(it, chunksize))
+                    if not chunk:
+                        exhausted = True
+                        break
+                    pending.append(pool.submit(_evaluate_chunk, self.config, chunk))
+                evaluation.extend(pending.popleft().result())
+        finally:
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=True)
+        return evaluation
+
+    def enroll_audio(self, recording: Any) -> int:
+        """
+        Add a recording of the wake phrase (WAV path or 16 kHz float
+        samples) as a keyword-spotter template. Returns its length in frames.
+        """
+        if self.spotter is None:
+            self.spotter = _keyword_spotter()
+        return self.spotter.enroll(recording)
+
+    def load_wake_templates(self, directory: Optional[str] = None) -> int:
+        """
+        Enroll every .wav file in `directory` (default: $VOXMIND_WAKE_TEMPLATES
+        or ~/.cache/voxmind/wake_templates). Returns how many were loaded.
+        """
+        spotter = self.spotter or _keyword_spotter()
+        count = spotter.load_templates(directory)
+        if count:
+            self.spotter = spotter
+        return count
+
     def detect_in_audio_chunk(self, audio_chunk: bytes) -> bool:
         """
-        Stub for audio-based wake detection.
+        Feed the next chunk of a 16 kHz, 16-bit mono PCM stream; True if
+        the wake phrase ended in it AND debounce interval has passed.
 
-        Future integration:
-        - Attach an engine like Porcupine, feed it audio frames, and map
-          its sensitivity parameter to config.sensitivity and fuzzy
-          thresholds.[web:249][web:251][web:261]
+        Chunks may have any length; the spotter carries partial frames and
+        match state across calls. Without enrolled templates this always
+        returns False. Higher sensitivity loosens the match threshold.
         """
-        _ = audio_chunk
-        return False
+        if self.spotter is None or not audio_chunk:
+            return False
+
+        self.metrics.total_audio_chunks += 1
+        # Always feed the spotter so its stream state stays continuous
+        heard = self.spotter.detect(audio_chunk, self.config.sensitivity)
+        if not heard:
+            return False
+        if not self._passed_debounce():
+            self.metrics.suppressed_by_debounce += 1
+            return False
+        self._mark_trigger()
+        return True
 
     # --------------------------------------------------------
     # Internal helpers
@@ -310,85 +1047,164 @@ class WakeWordDetector:
         if fuzzy_used:
             self.metrics.fuzzy_matches += 1
 
+    def _build_phonetic_indexes(self) -> None:
+        """Phonetic indexes of the phrases whose threshold allows at least one edit."""
+        self._phonetic: Dict[bool, PhoneticIndex] = {}
+        for primary, phrases, threshold in (
+            (True, self.config.primary_phrases, self.config.primary_fuzzy_threshold),
+            (False, self.config.secondary_phrases, self.config.secondary_fuzzy_threshold),
+        ):
+            self._phonetic[primary] = PhoneticIndex(
+                p for p in phrases if self._matcher(p).max_errors(threshold) >= 1
+            )
+
+    def _compile_phrase(self, phrase: str) -> "re.Pattern[str]":
+        return re.compile(r"\b" + re.escape(phrase) + r"\b", re.I)
+
+    def _threshold(self, primary: bool) -> float:
+        return self.config.primary_fuzzy_threshold if primary else self.config.secondary_fuzzy_threshold
+
+    def _use_trie(self, primary: bool) -> bool:
+        return len(self._tries[primary]) >= TRIE_MIN_PHRASES
+
     def _match_any_phrase(self, norm: str, primary: bool) -> bool:
         """
         Check if any primary/secondary phrase matches in the text.
         Uses exact boundary match first, then fuzzy at high sensitivity.
         """
         patterns = self._primary_patterns if primary else self._secondary_patterns
+        use_trie = self._use_trie(primary)
 
         # Exact match
-        for _, pattern in patterns:
-            if pattern.search(norm):
+        if use_trie:
+            if self._tries[primary].exact_matches(norm):
                 return True
+        else:
+            for _, pattern in patterns:
+                if pattern.search(norm):
+                    return True
 
         # Fuzzy at high sensitivity only
         if self.config.sensitivity >= 0.8:
-            threshold = (
-                self.config.primary_fuzzy_threshold
-                if primary
-                else self.config.secondary_fuzzy_threshold
-            )
+            threshold = self._threshold(primary)
+            # Sounds-alike words first (one dict lookup per word), then edit distance
+            if self._phonetic_match(norm, primary, threshold):
+                return True
+            if use_trie:
+                return self._tries[primary].fuzzy_search(norm, threshold) is not None
             for phrase, _ in patterns:
                 if self._fuzzy_contains(norm, phrase, threshold=threshold):
                     return True
 
         return False
 
+    def _exact_near_start(self, low_text: str, primary: bool) -> Optional[Tuple[int, str]]:
+        """(start, phrase) of the first configured phrase occurring at index <= 5."""
+        if self._use_trie(primary):
+            matches = self._tries[primary].exact_matches(low_text, max_start=5)
+            if matches:
+                _, start, phrase = min(matches)
+                return start, phrase
+            return None
+        for phrase, pattern in self._primary_patterns if primary else self._secondary_patterns:
+            m = pattern.search(low_text)
+            if m and m.start() <= 5:
+                return m.start(), phrase
+        return None
+
     def _find_phrase_near_start(
         self,
         low_text: str,
-        patterns: List[Tuple[str, re.Pattern[str]]],
+        primary: bool,
         threshold: float,
-    ) -> Tuple[Optional[re.Match[str]], int, bool]:
+    ) -> Tuple[Optional["_DummyMatch"], int, bool]:
         """
         Find a phrase near the start (index <= 5) via exact or fuzzy detection.
 
         Returns (match_obj, phrase_length, fuzzy_used).
         """
         # Exact match
-        for phrase, pattern in patterns:
-            m = pattern.search(low_text)
-            if m and m.start() <= 5:
-                return m, len(phrase), False
+        exact = self._exact_near_start(low_text, primary)
+        if exact is not None:
+            return _DummyMatch(exact[0]), len(exact[1]), False
 
         # Fuzzy at high sensitivity
         if self.config.sensitivity >= 0.8:
-            for phrase, _ in patterns:
-                if self._fuzzy_startswith(low_text, phrase, threshold=threshold):
-                    class _DummyMatch:
-                        def __init__(self, start: int) -> None:
-                            self._start = start
-
-                        def start(self) -> int:
-                            return self._start
-
-                    return _DummyMatch(0), len(phrase), True
+            # Sounds-alike words first ("hey box", "hay vox"), then edit distance
+            for phrase, _ in self._phonetic[primary].prefix_matches(low_text):
+                end = self._fuzzy_prefix_end(low_text, phrase, threshold=threshold)
+                if end is not None:
+                    return _DummyMatch(0), end, True
+            if self._use_trie(primary):
+                found = self._tries[primary].fuzzy_prefix(low_text, threshold)
+                candidates = [found[0][2]] if found else []
+            else:
+                candidates = self.config.primary_phrases if primary else self.config.secondary_phrases
+            for phrase in candidates:
+                end = self._fuzzy_prefix_end(low_text, phrase, threshold=threshold)
+                if end is not None:
+                    # Strip what was actually matched ("hey voxx" -> 8 chars)
+                    return _DummyMatch(0), end, True
 
         return None, 0, False
 
-    def _fuzzy_contains(self, text: str, phrase: str, threshold: float) -> bool:
+    def _best_scores(self, text: str) -> Tuple[bool, float, bool, float]:
         """
-        Check whether phrase is approximately contained in text.
-        Uses a sliding window and SequenceMatcher.[web:249]
+        (primary exact, primary similarity, secondary exact, secondary
+        similarity) of text, as matched by detect_and_strip_wake.
         """
-        if phrase in text:
-            return True
+        if not text:
+            return False, float("-inf"), False, float("-inf")
+        low = text.strip().lower()
+        scores: List[Any] = []
+        for primary in (True, False):
+            exact = self._exact_near_start(low, primary) is not None
+            best = 1.0 if exact else float("-inf")
+            if not exact:
+                # A sounds-alike hit is accepted on its edit distance, so
+                # that distance alone decides
+                for phrase in self.config.primary_phrases if primary else self.config.secondary_phrases:
+                    best = max(best, 1.0 - self._matcher(phrase).prefix_distance(low) / len(phrase))
+            scores += [exact, best]
+        return scores[0], scores[1], scores[2], scores[3]
+
+    def _matcher(self, phrase: str) -> FuzzyPhraseMatcher:
+        matcher = self._matchers.get(phrase)
+        if matcher is None:
+            matcher = self._matchers[phrase] = FuzzyPhraseMatcher(phrase)
+        return matcher
 
-        n = len(phrase)
-        for i in range(max(1, len(text) - n + 1)):
-            window = text[i:i + n + 2]
-            ratio = SequenceMatcher(None, window, phrase).ratio()
-            if ratio >= threshold:
-                return True
-        return False
+    def _fuzzy_contains(self, text: str, phrase: str, threshold: float) -> bool:
+        """
+        Check whether phrase is approximately contained in text, starting
+        at a word, with at most max_errors(threshold) edits.[web:249] Same
+        rule as PhraseTrie.fuzzy_search, so results don't depend on the
+        number of phrases.
+        """
+        matcher = self._matcher(phrase)
+        k = matcher.max_errors(threshold)
+        return any(matcher.match_prefix(text, k, word.start()) is not None
+                   for word in _WORD_START_RE.finditer(text))
 
     def _fuzzy_startswith(self, text: str, phrase: str, threshold: float) -> bool:
         """
         Fuzzy "starts with" check for phrase at the beginning of text,
         useful for ASR variations like "hey box" vs "hey vox".[web:249]
         """
-        n = len(phrase)
-        window = text[: n + 2]
-        ratio = SequenceMatcher(None, window, phrase).ratio()
-        return ratio >= threshold
+        return self._fuzzy_prefix_end(text, phrase, threshold) is not None
+
+    def _fuzzy_prefix_end(self, text: str, phrase: str, threshold: float, start: int = 0) -> Optional[int]:
+        """End offset of the fuzzy match of phrase at text[start:], or None."""
+        matcher = self._matcher(phrase)
+        return matcher.match_prefix(text, matcher.max_errors(threshold), start)
+
+    def _phonetic_match(self, text: str, primary: bool, threshold: float) -> bool:
+        """
+        A run of words keyed like a phrase that is also within the phrase's
+        edit budget from its first word. The key alone is too coarse: "a
+        bus" keys like "hey vox".
+        """
+        for phrase, start in self._phonetic[primary].matches(text):
+            if self._fuzzy_prefix_end(text, phrase, threshold, start) is not None:
+                return True
+        return False
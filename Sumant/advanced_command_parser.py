@@ -5,22 +5,51 @@ Week 2: Advanced NLP Integration & Parser Enhancement
 - Compound command support
 - Parameter validation
 - NLP Intent Classification with cache
+- Model loaded on a background thread (regex answers meanwhile)
 """
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from typing import Dict, Any, List, Optional, Tuple, Union
+import os
 import re
+import sys
 import logging
 import threading
+import time
 
 logger = logging.getLogger(__name__)
 
-# NLP Imports
+# Project root on sys.path so shared modules import as `Sumant.*` however this file is loaded
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from Sumant.parser_cascade import CascadeStage, ParserCascade
+from Sumant.model_registry import acquire_model, release_model
+from Sumant.onnx_encoder import encoder_name, runtime_available, selected_embedding_runtime
+
+# numpy-only pieces: the fallback for when the transformer is missing or still
+# loading, and the store that logs examples taught at runtime
 try:
-    from sentence_transformers import SentenceTransformer
-    import numpy as np
-    NLP_AVAILABLE = True
+    from Sumant.tfidf_classifier import TfidfIntentClassifier, selected_nlp_backend
+    from Sumant.embedding_store import EmbeddingStore, ExampleUpdate
+    TFIDF_AVAILABLE = True
 except ImportError:
-    NLP_AVAILABLE = False
-    logger.warning("sentence-transformers or numpy not installed. Running in pattern-only mode.")
+    TFIDF_AVAILABLE = False
+
+# NLP dependencies are only located here; importing them (torch takes seconds)
+# happens on the parser's background loader thread
+NLP_AVAILABLE = runtime_available()
+if not NLP_AVAILABLE:
+    logger.warning(f"{selected_embedding_runtime()} encoder dependencies not installed. "
+                   "Running in pattern-only mode.")
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+TFIDF_THRESHOLD = 0.2  # same cut-off as VoxMIndCpp TextClassifier
+# The NLP stage accepts an intent when the utterance's cosine similarity to
+# that intent's mean example is above this. The top-k vote picks the intent;
+# the confidence stays a centroid score (ExemplarIndex confidence="centroid"),
+# the statistic this value was tuned for.
+NLP_THRESHOLD = 0.65
 
 class AdvancedCommandParser:
     _instance = None
@@ -40,19 +69,94 @@ class AdvancedCommandParser:
         self.context = {"last_intent": None, "last_entities": {}}
         self.model = None
         self.intent_embeddings = {}
+        self.example_embeddings = None
+        self.scorer = None
+        self.embedding_cache = None
+        # MODEL_NAME, tagged with the runtime serving it ($VOXMIND_EMBEDDING_RUNTIME)
+        self.model_name = encoder_name(MODEL_NAME)
+        # Built-in examples key the embedding cache; examples taught with
+        # add_examples / remove_examples are kept by the store (see
+        # Sumant.embedding_store). Without numpy they only live in memory.
+        self.base_examples = self._get_intent_examples()
+        self.example_store = EmbeddingStore(namespace="sumant") if TFIDF_AVAILABLE else None
+        self._examples_lock = threading.Lock()
         self.intent_examples = self._get_intent_examples()
-        
-        if NLP_AVAILABLE:
-            try:
-                # Load model once
-                self.model = SentenceTransformer('all-MiniLM-L6-v2')
-                self._compute_embeddings()
-                logger.info("NLP Engine Initialized Successfully")
-            except Exception as e:
-                logger.error(f"Failed to initialize NLP model: {e}")
-                
+        if self.example_store is not None:
+            self.intent_examples = self.example_store.current_examples(self.model_name, self.base_examples)
+        self.nlp_backend = selected_nlp_backend() if TFIDF_AVAILABLE else "transformer"
+        use_transformer = NLP_AVAILABLE and self.nlp_backend != "tfidf"
+        self.tfidf = TfidfIntentClassifier(self.intent_examples) if TFIDF_AVAILABLE else None
+        # Resolves to True once the NLP stage can run, False if it never will
+        self.ready = Future()
+        self.load_metrics: Dict[str, Any] = {"state": "loading" if use_transformer else "unavailable"}
+
+        # Regex first (cheap, deterministic); the model only sees what regex can't parse
+        self.cascade = ParserCascade(
+            [
+                CascadeStage("regex", self._match_patterns, cost=1.0),
+                CascadeStage("tfidf", self._tfidf_stage, cost=10.0, threshold=TFIDF_THRESHOLD),
+                CascadeStage("nlp", self._nlp_stage, cost=1000.0, threshold=NLP_THRESHOLD,
+                             batch_fn=self._nlp_stage_batch),
+            ],
+            default=lambda text: {'type': 'unknown', 'original_text': text},
+        )
         self._initialized = True
 
+        # Regex answers right away; the NLP stage joins in once the model is loaded
+        if use_transformer:
+            threading.Thread(target=self._load_nlp, name="nlp-loader", daemon=True).start()
+        else:
+            self.ready.set_result(False)
+
+    def _load_model(self):
+        # Shared with every other parser using the same model (see Sumant.model_registry)
+        return acquire_model(self.model_name)
+
+    def close(self):
+        """Stop using the NLP model (regex keeps working) and release it."""
+        if self.model is not None:
+            self.model = None
+            release_model(self.model_name)
+
+    def _load_nlp(self):
+        """Load the model and intent centroids (runs on the loader thread)."""
+        metrics: Dict[str, Any] = {}
+        start = time.perf_counter()
+        try:
+            model = self._load_model()
+            metrics["model_load_s"] = time.perf_counter() - start
+            t = time.perf_counter()
+            # Held until the model is published, so no add_examples call falls in between
+            with self._examples_lock:
+                self._compute_embeddings(model)
+                metrics["embeddings_s"] = time.perf_counter() - t
+                metrics["embeddings_from_cache"] = self.example_embeddings.from_cache
+                # Published last: the NLP stage runs as soon as this is set
+                self.model = model
+            metrics["state"] = "ready"
+            logger.info("NLP Engine Initialized Successfully")
+        except Exception as e:
+            logger.error(f"Failed to initialize NLP model: {e}")
+            metrics["state"] = "failed"
+            metrics["error"] = str(e)
+        metrics["total_s"] = time.perf_counter() - start
+        self.load_metrics = metrics
+        self.ready.set_result(metrics["state"] == "ready")
+
+    @property
+    def nlp_ready(self) -> bool:
+        return self.model is not None
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until background loading is done (or `timeout` seconds pass).
+        Returns True if the NLP stage is available.
+        """
+        try:
+            return self.ready.result(timeout)
+        except FutureTimeoutError:
+            return False
+
     def _get_intent_examples(self) -> Dict[str, List[str]]:
         """
         Define 60+ patterns across various categories for NLP training
@@ -99,12 +203,69 @@ class AdvancedCommandParser:
             ]
         }
 
-    def _compute_embeddings(self):
-        """Compute and cache embeddings for intents"""
-        for intent, examples in self.intent_examples.items():
-            embeddings = self.model.encode(examples)
-            # Store mean embedding for the intent
-            self.intent_embeddings[intent] = np.mean(embeddings, axis=0)
+    def _compute_embeddings(self, model):
+        """Compute and cache embeddings for intents (reused from disk across runs)"""
+        # numpy-backed helpers, imported on the loader thread like the model
+        from Sumant.embedding_cache import shared_embedding_cache
+        from Sumant.embedding_store import EmbeddingStore
+        from Sumant.intent_scoring import ExemplarIndex
+
+        store = self.example_store or EmbeddingStore(namespace="sumant")
+        # Includes examples taught in earlier runs; only ones taught without
+        # a model get encoded
+        self.example_embeddings = store.get_or_build(self.model_name, self.base_examples, model.encode)
+        self.intent_examples = self.example_embeddings.example_lists()
+        # Mean embedding per intent
+        self.intent_embeddings = self.example_embeddings.centroid_dict()
+        # Top-k vote over every example rather than the means: keeps multi-modal
+        # intents apart ("browser" covers both "open browser" and "close tab").
+        # Rows are keyed (intent, phrase) so remove_examples can find them.
+        keys = [(intent, phrase) for intent, phrases in self.intent_examples.items() for phrase in phrases]
+        self.scorer = ExemplarIndex.from_intent_embeddings(self.example_embeddings, k=3, keys=keys,
+                                                          confidence="centroid")
+        # Repeated utterances skip the forward pass
+        self.embedding_cache = shared_embedding_cache()
+
+    def add_examples(self, intent: str, phrases: List[str]) -> int:
+        """
+        Teach `intent` new example phrases at runtime. Only these phrases are
+        encoded; they join the exemplar index and are logged to the
+        embedding store so later runs start with them. Returns how many were new.
+        """
+        with self._examples_lock:
+            known = self.intent_examples.setdefault(intent, [])
+            new = [p for p in dict.fromkeys(p.strip() for p in phrases) if p and p not in known]
+            if not new:
+                return 0
+            known.extend(new)
+            embeddings = None
+            if self.model is not None:
+                embeddings = self.embedding_cache.encode(self.model, new, self.model_name)
+                self.scorer.add(intent, embeddings, keys=[(intent, p) for p in new])
+            self._log_update("add", intent, new, embeddings)
+        return len(new)
+
+    def remove_examples(self, intent: str, phrases: List[str]) -> int:
+        """Forget example phrases of `intent` (built-in or taught). Returns how many were known."""
+        with self._examples_lock:
+            known = self.intent_examples.get(intent, [])
+            gone = [p for p in dict.fromkeys(p.strip() for p in phrases) if p in known]
+            if not gone:
+                return 0
+            self.intent_examples[intent] = [p for p in known if p not in gone]
+            if self.model is not None:
+                self.scorer.remove([(intent, p) for p in gone])
+            self._log_update("remove", intent, gone)
+        return len(gone)
+
+    def _log_update(self, op, intent, phrases, embeddings=None):
+        # Store and TF-IDF both need numpy (TFIDF_AVAILABLE); without it they are None
+        if self.example_store is not None:
+            self.example_store.append_update(self.model_name, self.base_examples,
+                                             ExampleUpdate(op, intent, phrases, embeddings))
+        if self.tfidf is not None:
+            # IDF is corpus-wide, so TF-IDF is rebuilt (about 2 ms for these example sets)
+            self.tfidf = TfidfIntentClassifier(self.intent_examples)
 
     def parse(self, text: str) -> List[Dict[str, Any]]:
         """
@@ -114,16 +275,16 @@ class AdvancedCommandParser:
         text = text.lower().strip()
         
         # 1. Handle Compound Commands (split by 'and', 'then')
-        sub_commands = re.split(r'\s+(?:and|then)\s+', text)
+        sub_commands = [c.strip() for c in re.split(r'\s+(?:and|then)\s+', text)]
+        sub_commands = [c for c in sub_commands if c]
+
+        # 2. Regex on every piece, then ONE batched NLP pass (single encode)
+        # for the pieces regex missed. Stages are stateless, so this gives the
+        # same per-piece results as parsing them one by one.
+        parsed = self.cascade.parse_many(sub_commands)
         results = []
         
-        for cmd_text in sub_commands:
-            cmd_text = cmd_text.strip()
-            if not cmd_text:
-                continue
-                
-            cmd_result = self._parse_single_command(cmd_text)
-            
+        for cmd_text, cmd_result in zip(sub_commands, parsed):
             # Context Injection (if command is incomplete, try to use context)
             if cmd_result['type'] == 'unknown' and self.context['last_intent']:
                 # Example logic: if user just said "python" after "search for java"
@@ -148,24 +309,42 @@ class AdvancedCommandParser:
     def _parse_single_command(self, text: str) -> Dict[str, Any]:
         """
         Parse a single atomic command using Regex logic + NLP fallback
+        (see self.cascade; its stats count how many commands each stage resolved)
+        """
+        return self.cascade.parse(text)
+
+    def _nlp_stage(self, text: str) -> Optional[Dict[str, Any]]:
+        """NLP (probabilistic) stage of the cascade; None until the model is loaded."""
+        if self.model is None:
+            return None
+        nlp_result = self._predict_intent(text)
+        # Attempt to extract entities even if intent came from NLP
+        entities = self._extract_entities(text, nlp_result['type'])
+        nlp_result.update(entities)
+        return nlp_result
+
+    def _tfidf_stage(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Model-free stage: answers while the transformer is unavailable
+        (or always, with VOXMIND_NLP_BACKEND=tfidf).
         """
-        # A. Try Regex Patterns (Deterministic & Fast)
-        regex_result = self._match_patterns(text)
-        if regex_result:
-            regex_result['source'] = 'regex'
-            return regex_result
-
-        # B. Try NLP (Probabilistic)
-        if NLP_AVAILABLE and self.model:
-            nlp_result = self._predict_intent(text)
-            if nlp_result['confidence'] > 0.65: # Threshold
-                nlp_result['source'] = 'nlp'
-                # Attempt to extract entities even if intent came from NLP
-                entities = self._extract_entities(text, nlp_result['type'])
-                nlp_result.update(entities)
-                return nlp_result
-
-        return {'type': 'unknown', 'original_text': text}
+        if self.tfidf is None or self.nlp_backend == "transformer":
+            return None
+        if self.nlp_backend == "auto" and self.model is not None:
+            return None
+        result = self.tfidf.predict(text)
+        result.update(self._extract_entities(text, result['type']))
+        return result
+
+    def _nlp_stage_batch(self, texts: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Batch form of _nlp_stage: one encode call for all texts."""
+        if self.model is None:
+            return [None] * len(texts)
+        results = []
+        for text, nlp_result in zip(texts, self._predict_intents(texts)):
+            nlp_result.update(self._extract_entities(text, nlp_result['type']))
+            results.append(nlp_result)
+        return results
 
     def _match_patterns(self, text: str) -> Optional[Dict[str, Any]]:
         """
@@ -207,25 +386,21 @@ class AdvancedCommandParser:
         """
         Use Sentence-BERT to classify intent
         """
-        text_embedding = self.model.encode([text])[0]
-        
-        names = []
-        scores = []
-        
-        for intent, intent_embedding in self.intent_embeddings.items():
-            # Cosine similarity
-            similarity = np.dot(text_embedding, intent_embedding) / (
-                np.linalg.norm(text_embedding) * np.linalg.norm(intent_embedding)
-            )
-            names.append(intent)
-            scores.append(similarity)
-            
-        max_idx = np.argmax(scores)
+        text_embedding = self.embedding_cache.encode(self.model, [text], self.model_name)[0]
+        intent, score = self.scorer.best(text_embedding)
         return {
-            'type': names[max_idx],
-            'confidence': float(scores[max_idx])
+            'type': intent,
+            'confidence': score
         }
 
+    def _predict_intents(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        _predict_intent for many texts: one encode call, one matrix product
+        """
+        embeddings = self.embedding_cache.encode(self.model, texts, self.model_name)
+        return [{'type': intent, 'confidence': score}
+                for intent, score in self.scorer.best_batch(embeddings)]
+
     def _extract_entities(self, text: str, intent: str) -> Dict[str, Any]:
         """
         Post-NLP entity extraction
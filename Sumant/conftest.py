@@ -0,0 +1,84 @@
+"""
+Shared fixtures for the Sumant tests.
+
+- encoder: deterministic stand-in for the sentence-transformer. It records
+  every batch it encodes; set `encoder.gate` to a threading.Event to hold
+  encode() until the event is set.
+- make_parser: builds a fresh AdvancedCommandParser with its embedding
+  cache under tmp_path and `encoder` (or nothing) as its model.
+"""
+import os
+import sys
+import zlib
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Sumant.advanced_command_parser as acp
+from Sumant.embedding_cache import shared_embedding_cache
+
+
+class FakeEncoder:
+    """Deterministic encoder: the same text always gets the same vector."""
+
+    def __init__(self, dim=16):
+        self.dim = dim
+        self.calls = []
+        self.gate = None
+
+    @property
+    def texts(self):
+        """Every text encoded so far, in order."""
+        return [t for call in self.calls for t in call]
+
+    def vector(self, text):
+        return np.random.default_rng(zlib.crc32(text.encode())).standard_normal(self.dim).astype(np.float32)
+
+    def encode(self, texts):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.calls.append(list(texts))
+        return np.stack([self.vector(t) for t in texts]).reshape(len(texts), self.dim)
+
+
+@pytest.fixture
+def encoder():
+    return FakeEncoder()
+
+
+@pytest.fixture
+def make_parser(monkeypatch, tmp_path):
+    """
+    make_parser(model=None, backend="transformer", wait=True): a new
+    AdvancedCommandParser (the singleton is reset on every call).
+
+    - model: loaded as the transformer; None means no NLP dependencies,
+      an exception instance makes the load fail with it.
+    - backend: $VOXMIND_NLP_BACKEND.
+    - wait: wait for the model to load before returning.
+    """
+    monkeypatch.setenv("VOXMIND_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(acp.AdvancedCommandParser, "_instance", None)
+    shared_embedding_cache().clear()
+
+    def make(model=None, backend="transformer", wait=True):
+        monkeypatch.setenv("VOXMIND_NLP_BACKEND", backend)
+        monkeypatch.setattr(acp, "NLP_AVAILABLE", model is not None)
+
+        def load(self):
+            if isinstance(model, BaseException):
+                raise model
+            return model
+
+        monkeypatch.setattr(acp.AdvancedCommandParser, "_load_model", load)
+        acp.AdvancedCommandParser._instance = None
+        parser = acp.AdvancedCommandParser()
+        if wait and model is not None and not isinstance(model, BaseException):
+            assert parser.wait_ready(timeout=5)
+        return parser
+
+    yield make
+    shared_embedding_cache().clear()
+    acp.AdvancedCommandParser._instance = None
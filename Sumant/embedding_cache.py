@@ -0,0 +1,134 @@
+"""
+Bounded LRU cache of utterance embeddings in front of model.encode.
+
+Voice commands repeat a lot ("volume up", "next song"), and every one
+that falls through to NLP costs a transformer forward pass. EmbeddingCache
+keys vectors on (model name, normalized text), stores them as float16 to
+halve their size, and evicts least-recently-used entries once the stored
+vectors exceed `max_bytes`.
+
+A float16 round trip changes cosine scores by about 1e-3 at most, well
+below the parsers' confidence thresholds.
+
+Use the process-wide instance from shared_embedding_cache() so that every
+parser benefits from phrases seen by the others.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import threading
+
+import numpy as np
+
+
+@dataclass
+class EmbeddingCacheInfo:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    bytes: int = 0
+    max_bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["hit_rate"] = self.hit_rate
+        return data
+
+
+def normalize_key(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class EmbeddingCache:
+    """LRU map (model name, normalized text) -> float16 embedding, bounded in bytes."""
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be a positive integer")
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, model_name: str, text: str) -> Optional[np.ndarray]:
+        """Cached embedding (as float32) or None."""
+        key = (model_name, normalize_key(text))
+        with self._lock:
+            vec = self._data.get(key)
+            if vec is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+        return vec.astype(np.float32)
+
+    def put(self, model_name: str, text: str, embedding: np.ndarray):
+        vec = np.asarray(embedding, dtype=np.float16)
+        if vec.nbytes > self.max_bytes:
+            return
+        key = (model_name, normalize_key(text))
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._data[key] = vec
+            self._bytes += vec.nbytes
+            while self._bytes > self.max_bytes:
+                _, dropped = self._data.popitem(last=False)
+                self._bytes -= dropped.nbytes
+                self.evictions += 1
+
+    def encode(self, model, texts: Sequence[str], model_name: str) -> np.ndarray:
+        """
+        Embeddings of `texts` as an (n, dim) float32 array. Only the texts
+        not in the cache are passed to model.encode, in one call.
+        """
+        found: List[Optional[np.ndarray]] = [self.get(model_name, t) for t in texts]
+        missing = [i for i, vec in enumerate(found) if vec is None]
+        if missing:
+            # Each distinct phrase is encoded once
+            first: Dict[str, int] = {}
+            for i in missing:
+                first.setdefault(normalize_key(texts[i]), i)
+            encoded = np.asarray(model.encode([texts[i] for i in first.values()]), dtype=np.float32)
+            by_key = dict(zip(first, encoded))
+            for key, vec in by_key.items():
+                self.put(model_name, key, vec)
+            for i in missing:
+                found[i] = by_key[normalize_key(texts[i])]
+        return np.stack(found) if found else np.zeros((0, 0), dtype=np.float32)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> EmbeddingCacheInfo:
+        with self._lock:
+            return EmbeddingCacheInfo(
+                hits=self.hits, misses=self.misses, evictions=self.evictions,
+                entries=len(self._data), bytes=self._bytes, max_bytes=self.max_bytes,
+            )
+
+
+_SHARED: Optional[EmbeddingCache] = None
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_embedding_cache() -> EmbeddingCache:
+    """The process-wide EmbeddingCache used by the NLP parsers."""
+    global _SHARED
+    with _SHARED_LOCK:
+        if _SHARED is None:
+            _SHARED = EmbeddingCache()
+        return _SHARED
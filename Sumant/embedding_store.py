@@ -0,0 +1,407 @@
+"""
+Persistent, memory-mapped cache of intent example embeddings.
+
+Encoding every intent example through the sentence-transformer takes
+seconds at startup. EmbeddingStore saves the example embeddings and the
+per-intent centroids to one .npy file, plus a small <key>.json sidecar
+that names the .npy file and lists the example phrases. The key is a hash
+of the model name and the built-in example lists. Later runs map the file
+read-only (np.load(mmap_mode='r')) instead of re-encoding.
+
+Changing the model or any built-in example changes the key, so a stale
+file is never read. A file that is corrupt or does not match its sidecar
+is rebuilt. Every save writes a new .npy file and then swaps the sidecar
+atomically, so a reader sees either the old pair or the new one.
+
+Examples taught at runtime (the parsers' add_examples / remove_examples)
+don't change the key. They are appended to a per-key log, <key>.updates.jsonl,
+as ExampleUpdate records that carry their embeddings. get_or_build() folds
+the log into the snapshot and truncates it, so the log only holds what was
+taught since the last start and nothing is re-encoded.
+
+A store created with a namespace (one per parser) deletes, on save, the
+files of its earlier keys for the same model, and files left by other
+format versions.
+
+Cache directory: $VOXMIND_CACHE_DIR/embeddings, else ~/.cache/voxmind/embeddings.
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+
+
+def default_cache_dir() -> str:
+    base = os.environ.get("VOXMIND_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "voxmind")
+    return os.path.join(base, "embeddings")
+
+
+@dataclass
+class IntentEmbeddings:
+    """
+    Example embeddings of every intent, plus their centroids.
+
+    `examples` rows offsets[i]:offsets[i + 1] belong to labels[i] and
+    encode the same slice of `phrases`; `centroids[i]` is their mean. Both
+    arrays are read-only memory maps when loaded from disk (`from_cache`).
+    """
+
+    labels: List[str]
+    offsets: List[int]
+    examples: np.ndarray
+    centroids: np.ndarray
+    phrases: List[str]
+    from_cache: bool = False
+
+    def centroid_dict(self) -> Dict[str, np.ndarray]:
+        return {label: self.centroids[i] for i, label in enumerate(self.labels)}
+
+    def examples_of(self, label: str) -> np.ndarray:
+        i = self.labels.index(label)
+        return self.examples[self.offsets[i]:self.offsets[i + 1]]
+
+    def phrases_of(self, label: str) -> List[str]:
+        i = self.labels.index(label)
+        return self.phrases[self.offsets[i]:self.offsets[i + 1]]
+
+    def example_lists(self) -> Dict[str, List[str]]:
+        """label -> example phrases, in `labels` order."""
+        return {label: self.phrases_of(label) for label in self.labels}
+
+
+@dataclass
+class ExampleUpdate:
+    """
+    One runtime change to the intent examples: op 'add' or 'remove'
+    `phrases` of `intent`. `embeddings` holds the phrases' rows (None if the
+    model wasn't loaded when the change was made).
+    """
+
+    op: str
+    intent: str
+    phrases: List[str]
+    embeddings: Optional[np.ndarray] = None
+
+    def to_json(self) -> str:
+        record = {"op": self.op, "intent": self.intent, "phrases": self.phrases}
+        if self.embeddings is not None:
+            vecs = np.ascontiguousarray(self.embeddings, dtype=np.float32)
+            record["dim"] = vecs.shape[1]
+            record["embeddings"] = base64.b64encode(vecs.tobytes()).decode("ascii")
+        return json.dumps(record, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, line: str) -> "ExampleUpdate":
+        record = json.loads(line)
+        if record["op"] not in ("add", "remove"):
+            raise ValueError(f"unknown op {record['op']!r}")
+        embeddings = None
+        if "embeddings" in record:
+            embeddings = np.frombuffer(base64.b64decode(record["embeddings"]), dtype=np.float32)
+            embeddings = embeddings.reshape(len(record["phrases"]), record["dim"])
+        return cls(record["op"], record["intent"], list(record["phrases"]), embeddings)
+
+
+def apply_updates(intent_examples: Mapping[str, Sequence[str]],
+                  updates: Sequence[ExampleUpdate]) -> Dict[str, List[str]]:
+    """The example lists after `updates` (a new dict; the input is left alone)."""
+    examples = {label: list(phrases) for label, phrases in intent_examples.items()}
+    for update in updates:
+        phrases = examples.setdefault(update.intent, [])
+        if update.op == "add":
+            phrases.extend(p for p in update.phrases if p not in phrases)
+        else:
+            examples[update.intent] = [p for p in phrases if p not in update.phrases]
+    return examples
+
+
+def fill_embeddings(updates: Sequence[ExampleUpdate], encode: Callable[[List[str]], np.ndarray],
+                    ops: Sequence[str] = ("add", "remove")) -> bool:
+    """
+    Encode, in one call, the phrases of the `ops` updates that have no
+    embeddings yet. Returns True if any update changed.
+    """
+    missing = [u for u in updates if u.embeddings is None and u.op in ops and u.phrases]
+    if not missing:
+        return False
+    vecs = np.asarray(encode([p for u in missing for p in u.phrases]), dtype=np.float32)
+    start = 0
+    for update in missing:
+        update.embeddings = vecs[start:start + len(update.phrases)]
+        start += len(update.phrases)
+    return True
+
+
+def fold_updates(embeddings: IntentEmbeddings, updates: Sequence[ExampleUpdate]) -> IntentEmbeddings:
+    """
+    `embeddings` with `updates` applied (same rules as apply_updates). Every
+    'add' update needs its embeddings (see fill_embeddings); intents left
+    without examples are dropped.
+    """
+    rows = {label: dict(zip(embeddings.phrases_of(label), embeddings.examples_of(label)))
+            for label in embeddings.labels}
+    for update in updates:
+        phrases = rows.setdefault(update.intent, {})
+        if update.op == "add" and update.phrases:
+            for phrase, row in zip(update.phrases, update.embeddings):
+                phrases.setdefault(phrase, row)
+        else:
+            for phrase in update.phrases:
+                phrases.pop(phrase, None)
+    lists = {label: list(phrases) for label, phrases in rows.items() if phrases}
+    vectors = [rows[label][p] for label, phrases in lists.items() for p in phrases]
+    return _assemble(lists, np.asarray(vectors, dtype=np.float32).reshape(len(vectors), embeddings.examples.shape[1]))
+
+
+def cache_key(model_name: str, intent_examples: Mapping[str, Sequence[str]]) -> str:
+    """Hash of the model name and the (ordered) example lists."""
+    payload = json.dumps(
+        {"v": FORMAT_VERSION, "model": model_name,
+         "examples": [[label, list(examples)] for label, examples in intent_examples.items()]},
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def build_embeddings(encode: Callable[[List[str]], np.ndarray],
+                     intent_examples: Mapping[str, Sequence[str]]) -> IntentEmbeddings:
+    """Encode all examples in one call and compute the centroids."""
+    texts = [p for phrases in intent_examples.values() for p in phrases]
+    return _assemble(intent_examples, np.asarray(encode(texts), dtype=np.float32))
+
+
+def _assemble(intent_examples: Mapping[str, Sequence[str]], examples: np.ndarray) -> IntentEmbeddings:
+    # `examples` holds one row per phrase, in intent_examples order
+    labels = list(intent_examples)
+    offsets = [0]
+    phrases: List[str] = []
+    for label in labels:
+        phrases.extend(intent_examples[label])
+        offsets.append(len(phrases))
+    centroids = np.zeros((len(labels), examples.shape[1]), dtype=np.float32)
+    for i in range(len(labels)):
+        centroids[i] = examples[offsets[i]:offsets[i + 1]].mean(axis=0)
+    return IntentEmbeddings(labels, offsets, examples, centroids, phrases)
+
+
+class EmbeddingStore:
+    """On-disk IntentEmbeddings cache (see module docstring)."""
+
+    def __init__(self, cache_dir: Optional[str] = None, namespace: Optional[str] = None):
+        self.cache_dir = cache_dir or default_cache_dir()
+        # Who owns the keys written here (e.g. one parser); None never prunes
+        self.namespace = namespace
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def _updates_path(self, model_name: str, intent_examples: Mapping[str, Sequence[str]]) -> str:
+        return os.path.join(self.cache_dir, cache_key(model_name, intent_examples) + ".updates.jsonl")
+
+    def _read_meta(self, key: str) -> Optional[dict]:
+        """The sidecar of `key` if it is one of ours, else None."""
+        try:
+            with open(self._meta_path(key), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unusable embedding cache {self._meta_path(key)}: {e}")
+            return None
+        if not isinstance(meta, dict) or meta.get("key") != key or meta.get("version") != FORMAT_VERSION:
+            return None
+        return meta
+
+    def load(self, model_name: str, intent_examples: Mapping[str, Sequence[str]]) -> Optional[IntentEmbeddings]:
+        """Map the cached embeddings, or None if missing, stale or corrupt."""
+        key = cache_key(model_name, intent_examples)
+        meta = self._read_meta(key)
+        if meta is None:
+            return None
+        npy_path = os.path.join(self.cache_dir, os.path.basename(meta.get("data", "")))
+        try:
+            data = np.load(npy_path, mmap_mode="r", allow_pickle=False)
+            labels, offsets, phrases = meta["labels"], meta["offsets"], meta["phrases"]
+            n_examples = offsets[-1]
+            if (len(phrases) != n_examples or len(offsets) != len(labels) + 1
+                    or data.dtype != np.float32 or data.ndim != 2
+                    or data.shape[0] != n_examples + len(labels)):
+                raise ValueError("metadata does not match data")
+        except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+            logger.warning(f"Ignoring unusable embedding cache {npy_path}: {e}")
+            return None
+        return IntentEmbeddings(labels, offsets, data[:n_examples], data[n_examples:], phrases, from_cache=True)
+
+    def save(self, model_name: str, intent_examples: Mapping[str, Sequence[str]],
+             embeddings: IntentEmbeddings) -> bool:
+        """Write embeddings to the cache (atomically); False if that failed."""
+        key = cache_key(model_name, intent_examples)
+        previous = self._read_meta(key)
+        data = np.concatenate([embeddings.examples, embeddings.centroids]).astype(np.float32)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # A new data file each time, then the sidecar that names it: a
+            # reader sees the old pair or the new one, never a mix
+            fd, npy_path = tempfile.mkstemp(dir=self.cache_dir, prefix=key + ".", suffix=".npy")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.save(f, data, allow_pickle=False)
+                meta = {"key": key, "version": FORMAT_VERSION, "model": model_name,
+                        "namespace": self.namespace, "data": os.path.basename(npy_path),
+                        "labels": embeddings.labels, "offsets": embeddings.offsets,
+                        "phrases": embeddings.phrases}
+                fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+                    os.replace(tmp, self._meta_path(key))
+                except BaseException:
+                    os.unlink(tmp)
+                    raise
+            except BaseException:
+                os.unlink(npy_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Could not write embedding cache for {key}: {e}")
+            return False
+        if previous is not None and previous.get("data") != meta["data"]:
+            self._remove(os.path.join(self.cache_dir, os.path.basename(previous.get("data", ""))))
+        self._prune(key, model_name)
+        return True
+
+    def _prune(self, key: str, model_name: str):
+        """Delete this namespace's other keys for `model_name`, and other format versions."""
+        if self.namespace is None:
+            return
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        for name in names:
+            other, ext = os.path.splitext(name)
+            if ext != ".json" or other == key:
+                continue
+            try:
+                with open(os.path.join(self.cache_dir, name), "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if not isinstance(meta, dict) or meta.get("key") != other or meta.get("model") != model_name:
+                continue
+            if meta.get("version") == FORMAT_VERSION and meta.get("namespace") != self.namespace:
+                continue
+            for stale in names:
+                if stale.startswith(other + "."):
+                    self._remove(os.path.join(self.cache_dir, stale))
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass  # already gone, or still mapped on a platform that refuses
+
+    def get_or_build(self, model_name: str, intent_examples: Mapping[str, Sequence[str]],
+                     encode: Callable[[List[str]], np.ndarray]) -> IntentEmbeddings:
+        """
+        The cached embeddings with the update log folded in. A missing cache
+        is built by encoding the examples; logged additions without
+        embeddings are encoded. Whenever the result differs from what is on
+        disk it is saved and the folded part of the log removed.
+        """
+        updates, end = self._read_updates(self._updates_path(model_name, intent_examples))
+        embeddings = self.load(model_name, intent_examples)
+        if embeddings is not None and not updates:
+            return embeddings
+        if embeddings is None:
+            embeddings = build_embeddings(encode, intent_examples)
+        fill_embeddings(updates, encode, ops=("add",))
+        embeddings = fold_updates(embeddings, updates)
+        if self.save(model_name, intent_examples, embeddings) and updates:
+            self._drop_updates(self._updates_path(model_name, intent_examples), end)
+        return embeddings
+
+    def current_examples(self, model_name: str,
+                         intent_examples: Mapping[str, Sequence[str]]) -> Dict[str, List[str]]:
+        """
+        The example lists get_or_build() would return embeddings for, read
+        from the sidecar and the log without loading or encoding anything.
+        """
+        meta = self._read_meta(cache_key(model_name, intent_examples))
+        try:
+            stored = {label: meta["phrases"][meta["offsets"][i]:meta["offsets"][i + 1]]
+                      for i, label in enumerate(meta["labels"])} if meta else None
+        except (KeyError, TypeError, IndexError):
+            stored = None
+        return apply_updates(stored or intent_examples, self.load_updates(model_name, intent_examples))
+
+    def load_updates(self, model_name: str,
+                     intent_examples: Mapping[str, Sequence[str]]) -> List[ExampleUpdate]:
+        """Runtime example updates logged (and not yet folded) for these base examples, oldest first."""
+        return self._read_updates(self._updates_path(model_name, intent_examples))[0]
+
+    @staticmethod
+    def _read_updates(path: str) -> Tuple[List[ExampleUpdate], int]:
+        # Also returns the offset the log was read up to
+        updates: List[ExampleUpdate] = []
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return updates, 0
+        except OSError as e:
+            logger.warning(f"Could not read example updates {path}: {e}")
+            return updates, 0
+        for line in data.decode("utf-8", errors="replace").splitlines():
+            if not line.strip():
+                continue
+            try:
+                updates.append(ExampleUpdate.from_json(line))
+            except (ValueError, KeyError, TypeError) as e:
+                # e.g. a line cut short by a crash mid-append
+                logger.warning(f"Skipping bad line in {path}: {e}")
+        return updates, len(data)
+
+    def _drop_updates(self, path: str, end: int):
+        """Remove the first `end` bytes of the log (keeping anything appended since)."""
+        try:
+            with open(path, "rb") as f:
+                f.seek(end)
+                rest = f.read()
+            if not rest:
+                os.unlink(path)
+                return
+            fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(rest)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        except OSError as e:
+            # Harmless: replaying folded updates again gives the same examples
+            logger.warning(f"Could not truncate example updates {path}: {e}")
+
+    def append_update(self, model_name: str, intent_examples: Mapping[str, Sequence[str]],
+                      update: ExampleUpdate) -> bool:
+        """Append one update to the log (cost independent of its length); False on failure."""
+        path = self._updates_path(model_name, intent_examples)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(update.to_json() + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write example update {path}: {e}")
+            return False
+        return True
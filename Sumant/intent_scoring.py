@@ -0,0 +1,361 @@
+"""
+Vectorized intent scoring for the embedding classifiers.
+
+CentroidScorer keeps one centroid per intent as a row of a contiguous,
+L2-normalized float32 matrix. Cosine similarity of an utterance embedding
+against every intent is then one matrix-vector product (scores / best),
+and many utterances are scored with one matrix-matrix product
+(scores_batch / best_batch).
+
+ExemplarIndex has the same best / best_batch interface but keeps every
+example embedding and votes among the top-k nearest examples.
+
+Both can learn new examples at runtime without rebuilding: CentroidScorer
+keeps a running sum and count per intent, ExemplarIndex appends rows to
+amortized-growth buffers and removes them by key (swap with the last row).
+Each add / remove costs O(embedding dim) per example.
+
+Used by Sumant.advanced_command_parser and Tejas.nlp_command_parser.
+"""
+from typing import Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0  # zero vectors stay zero (score 0 against anything)
+    return matrix / norms
+
+
+class CentroidScorer:
+    """
+    Cosine similarity of utterance embeddings against per-intent centroids.
+
+    `counts` (examples per intent, default 1) lets add() / remove() keep
+    the centroids exact means as examples come and go.
+    """
+
+    def __init__(self, centroids: Mapping[str, np.ndarray], counts: Optional[Mapping[str, int]] = None):
+        self.labels: List[str] = list(centroids)
+        if self.labels:
+            matrix = np.stack([np.asarray(centroids[k], dtype=np.float32) for k in self.labels])
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        self.matrix = np.ascontiguousarray(_normalize_rows(matrix), dtype=np.float32)
+        # Running sums (float64: many add/remove rounds don't drift) and counts
+        self.counts = np.array([(counts or {}).get(k, 1) for k in self.labels], dtype=np.int64)
+        self.sums = matrix.astype(np.float64) * self.counts[:, None]
+        self._index: Dict[str, int] = {k: i for i, k in enumerate(self.labels)}
+
+    @classmethod
+    def from_examples(cls, model, intent_examples: Mapping[str, Sequence[str]]) -> "CentroidScorer":
+        """Encode every intent's examples with `model` and use their mean as centroid."""
+        return cls({intent: np.mean(model.encode(list(examples)), axis=0)
+                    for intent, examples in intent_examples.items()},
+                   {intent: len(examples) for intent, examples in intent_examples.items()})
+
+    @classmethod
+    def from_intent_embeddings(cls, embeddings) -> "CentroidScorer":
+        """Build from Sumant.embedding_store.IntentEmbeddings."""
+        offsets = embeddings.offsets
+        return cls(embeddings.centroid_dict(),
+                   {label: offsets[i + 1] - offsets[i] for i, label in enumerate(embeddings.labels)})
+
+    def __len__(self):
+        return len(self.labels)
+
+    def add(self, label: str, embeddings: np.ndarray):
+        """Add example embeddings to `label`'s mean (a new label gets a new row)."""
+        vecs = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        if not len(vecs):
+            return
+        i = self._index.get(label)
+        if i is None:
+            if not self.labels:
+                self.sums = np.zeros((0, vecs.shape[1]), dtype=np.float64)
+                self.matrix = np.zeros((0, vecs.shape[1]), dtype=np.float32)
+            i = self._index[label] = len(self.labels)
+            self.labels.append(label)
+            self.sums = np.vstack([self.sums, np.zeros((1, self.sums.shape[1]))])
+            self.counts = np.append(self.counts, 0)
+            self.matrix = np.ascontiguousarray(np.vstack([self.matrix, np.zeros((1, self.matrix.shape[1]),
+                                                                                dtype=np.float32)]))
+        self.sums[i] += vecs.sum(axis=0)
+        self.counts[i] += len(vecs)
+        self._refresh(i)
+
+    def remove(self, label: str, embeddings: np.ndarray):
+        """Take example embeddings out of `label`'s mean; the label goes when none are left."""
+        i = self._index.get(label)
+        vecs = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        if i is None or not len(vecs):
+            return
+        self.counts[i] -= len(vecs)
+        if self.counts[i] > 0:
+            self.sums[i] -= vecs.sum(axis=0)
+            self._refresh(i)
+            return
+        del self.labels[i]
+        self.sums = np.delete(self.sums, i, axis=0)
+        self.counts = np.delete(self.counts, i)
+        self.matrix = np.ascontiguousarray(np.delete(self.matrix, i, axis=0))
+        self._index = {k: j for j, k in enumerate(self.labels)}
+
+    def _refresh(self, i: int):
+        row = self.sums[i]
+        norm = float(np.linalg.norm(row))
+        self.matrix[i] = row / norm if norm else row
+
+    def scores(self, embedding: np.ndarray) -> np.ndarray:
+        """Cosine similarity of one embedding with every centroid (in `labels` order)."""
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        return self.matrix @ (vec / norm if norm else vec)
+
+    def scores_batch(self, embeddings: np.ndarray) -> np.ndarray:
+        """(n_utterances, n_intents) cosine similarities."""
+        return _normalize_rows(np.asarray(embeddings, dtype=np.float32)) @ self.matrix.T
+
+    def best(self, embedding: np.ndarray) -> Tuple[str, float]:
+        """Best intent and its cosine similarity."""
+        scores = self.scores(embedding)
+        i = int(np.argmax(scores))
+        return self.labels[i], float(scores[i])
+
+    def best_batch(self, embeddings: np.ndarray) -> List[Tuple[str, float]]:
+        """best() for every row of `embeddings`."""
+        scores = self.scores_batch(embeddings)
+        if not len(scores):
+            return []
+        idx = np.argmax(scores, axis=1)
+        best = scores[np.arange(len(idx)), idx]
+        return [(self.labels[i], float(s)) for i, s in zip(idx.tolist(), best.tolist())]
+
+
+class ExemplarIndex:
+    """
+    k-nearest-neighbour intent classifier over every example embedding.
+
+    Unlike a centroid, it keeps multi-modal intents apart ("open browser"
+    and "close tab" both stay "browser" without averaging into neither).
+    Rows are L2-normalized and stored contiguously, as float32 or, with
+    quantize=True, as int8 with one scale per row (4x smaller).
+
+    best() takes the top-k most similar examples and votes among the intents
+    they belong to:
+    - "score": sum of similarities per intent,
+    - "majority": number of neighbours per intent (similarity breaks ties).
+    The returned score depends on `confidence`:
+    - "nearest": cosine similarity of the winning intent's nearest example,
+    - "centroid": cosine similarity of the winning intent's mean example,
+      the same statistic as CentroidScorer, so thresholds tuned on centroid
+      scores keep their meaning.
+    """
+
+    # Rows per block when scoring an int8 matrix (bounds the float32 temporary)
+    BLOCK_ROWS = 4096
+
+    def __init__(self, embeddings: np.ndarray, example_labels: Sequence[str], k: int = 5,
+                 voting: str = "score", quantize: bool = False, keys: Optional[Sequence[Hashable]] = None,
+                 confidence: str = "nearest"):
+        if voting not in ("score", "majority"):
+            raise ValueError("voting must be 'score' or 'majority'")
+        if confidence not in ("nearest", "centroid"):
+            raise ValueError("confidence must be 'nearest' or 'centroid'")
+        if len(embeddings) != len(example_labels):
+            raise ValueError("one label per embedding row is required")
+        if keys is not None and len(keys) != len(example_labels):
+            raise ValueError("one key per embedding row is required")
+        self.labels: List[str] = list(dict.fromkeys(example_labels))
+        self._label_index = {label: i for i, label in enumerate(self.labels)}
+        self.k = k
+        self.voting = voting
+        self.confidence = confidence
+        self.quantized = quantize
+        # Row buffers with spare capacity; rows [0, _size) are live
+        self._data, scale = self._encode_rows(embeddings)
+        self._scale = scale if quantize else None
+        self._label_ids = np.array([self._label_index[label] for label in example_labels], dtype=np.intp)
+        self._size = len(self._data)
+        # Running sum and count of the (stored) rows per label, for centroids
+        self._counts = np.bincount(self._label_ids, minlength=len(self.labels)).astype(np.int64)
+        self._sums = np.zeros((len(self.labels), self._data.shape[1]), dtype=np.float64)
+        np.add.at(self._sums, self._label_ids, self._stored(self._data, self._scale))
+        # Optional key per row (e.g. (intent, phrase)) so rows can be removed
+        self._keys: List[Optional[Hashable]] = list(keys) if keys is not None else [None] * self._size
+        self._rows: Dict[Hashable, int] = {key: i for i, key in enumerate(self._keys) if key is not None}
+        self._publish()
+
+    def _encode_rows(self, embeddings: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        rows = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        if not self.quantized:
+            return np.ascontiguousarray(rows, dtype=np.float32), None
+        scale = np.abs(rows).max(axis=1, keepdims=True) / 127.0
+        scale[scale == 0] = 1.0
+        return np.ascontiguousarray(np.round(rows / scale), dtype=np.int8), scale.ravel().astype(np.float32)
+
+    @staticmethod
+    def _stored(data: np.ndarray, scale: Optional[np.ndarray]) -> np.ndarray:
+        """Rows as stored (dequantized), float64."""
+        rows = data.astype(np.float64)
+        return rows * scale[:, None] if scale is not None else rows
+
+    def _publish(self):
+        # One tuple swap, so a concurrent best_batch sees matching shapes
+        n = self._size
+        centroids = _normalize_rows(self._sums).astype(np.float32)
+        self._view = (self._data[:n], self._scale[:n] if self._scale is not None else None,
+                      self._label_ids[:n], centroids)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._view[0]
+
+    @property
+    def scale(self) -> Optional[np.ndarray]:
+        return self._view[1]
+
+    @property
+    def label_ids(self) -> np.ndarray:
+        return self._view[2]
+
+    @classmethod
+    def from_intent_embeddings(cls, embeddings, **kwargs) -> "ExemplarIndex":
+        """Build from Sumant.embedding_store.IntentEmbeddings."""
+        labels = [label for i, label in enumerate(embeddings.labels)
+                  for _ in range(embeddings.offsets[i], embeddings.offsets[i + 1])]
+        return cls(embeddings.examples, labels, **kwargs)
+
+    def __len__(self):
+        """Number of intents that still have at least one example."""
+        return int(np.count_nonzero(self._counts))
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes + (self.scale.nbytes if self.scale is not None else 0)
+
+    def add(self, label: str, embeddings: np.ndarray, keys: Optional[Sequence[Hashable]] = None):
+        """
+        Append example rows for `label`. A key that is already present
+        replaces its old row.
+        """
+        data, scale = self._encode_rows(np.atleast_2d(embeddings))
+        keys = list(keys) if keys is not None else [None] * len(data)
+        if len(keys) != len(data):
+            raise ValueError("one key per embedding row is required")
+        self.remove([key for key in keys if key is not None and key in self._rows])
+        if label not in self._label_index:
+            self._label_index[label] = len(self.labels)
+            self.labels.append(label)
+            self._counts = np.append(self._counts, 0)
+            self._sums = np.vstack([self._sums, np.zeros((1, data.shape[1]))])
+        label_id = self._label_index[label]
+        start, end = self._size, self._size + len(data)
+        if end > len(self._data):
+            capacity = max(end, 2 * len(self._data))
+            self._data = self._grow(self._data, capacity)
+            self._label_ids = self._grow(self._label_ids, capacity)
+            if self._scale is not None:
+                self._scale = self._grow(self._scale, capacity)
+        self._data[start:end] = data
+        self._label_ids[start:end] = label_id
+        if self._scale is not None:
+            self._scale[start:end] = scale
+        self._counts[label_id] += len(data)
+        self._sums[label_id] += self._stored(data, scale).sum(axis=0)
+        for i, key in enumerate(keys, start):
+            if key is not None:
+                self._rows[key] = i
+        self._keys.extend(keys)
+        self._size = end
+        self._publish()
+
+    def remove(self, keys: Sequence[Hashable]) -> int:
+        """Drop the rows with these keys (unknown keys are ignored); returns how many."""
+        removed = 0
+        for key in keys:
+            row = self._rows.pop(key, None)
+            if row is None:
+                continue
+            label_id = self._label_ids[row]
+            self._counts[label_id] -= 1
+            if self._counts[label_id]:
+                scale = self._scale[row:row + 1] if self._scale is not None else None
+                self._sums[label_id] -= self._stored(self._data[row:row + 1], scale)[0]
+            else:
+                self._sums[label_id] = 0.0  # no rounding residue on an emptied label
+            last = self._size - 1
+            if row != last:
+                # Move the last row into the gap
+                self._data[row] = self._data[last]
+                self._label_ids[row] = self._label_ids[last]
+                if self._scale is not None:
+                    self._scale[row] = self._scale[last]
+                moved = self._keys[row] = self._keys[last]
+                if moved is not None:
+                    self._rows[moved] = row
+            self._keys.pop()
+            self._size = last
+            removed += 1
+        if removed:
+            self._publish()
+        return removed
+
+    @staticmethod
+    def _grow(buffer: np.ndarray, capacity: int) -> np.ndarray:
+        grown = np.empty((capacity,) + buffer.shape[1:], dtype=buffer.dtype)
+        grown[:len(buffer)] = buffer
+        return grown
+
+    def similarities(self, embeddings: np.ndarray) -> np.ndarray:
+        """(n_utterances, n_examples) cosine similarities."""
+        return self._similarities(embeddings, self._view)
+
+    def _similarities(self, embeddings: np.ndarray, view) -> np.ndarray:
+        matrix, scale = view[0], view[1]
+        queries = _normalize_rows(np.atleast_2d(np.asarray(embeddings, dtype=np.float32)))
+        if scale is None:
+            return queries @ matrix.T
+        out = np.empty((len(queries), len(matrix)), dtype=np.float32)
+        for start in range(0, len(matrix), self.BLOCK_ROWS):
+            block = matrix[start:start + self.BLOCK_ROWS]
+            out[:, start:start + len(block)] = (queries @ block.T.astype(np.float32)) * scale[start:start + len(block)]
+        return out
+
+    def best(self, embedding: np.ndarray) -> Tuple[str, float]:
+        return self.best_batch(np.atleast_2d(embedding))[0]
+
+    def best_batch(self, embeddings: np.ndarray) -> List[Tuple[str, float]]:
+        """best() for every row of `embeddings`; ("unknown", 0.0) each once no rows are left."""
+        if not len(embeddings):
+            return []
+        view = self._view
+        sims = self._similarities(embeddings, view)
+        n = len(sims)
+        k = min(self.k, sims.shape[1])
+        if not k:
+            return [("unknown", 0.0)] * n
+        top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+        top_sims = np.take_along_axis(sims, top, axis=1)
+        top_labels = view[2][top]
+
+        rows = np.repeat(np.arange(n), k)
+        votes = np.zeros((n, len(self.labels)), dtype=np.float64)
+        if self.voting == "score":
+            np.add.at(votes, (rows, top_labels.ravel()), top_sims.ravel())
+        else:
+            # Counts decide; summed similarity (|sum| <= k) only breaks ties
+            np.add.at(votes, (rows, top_labels.ravel()), 1.0 + top_sims.ravel() / (2.0 * (k + 1)))
+        # Only intents with a neighbour in the top k can win (with negative
+        # similarities a zero vote would otherwise beat them)
+        present = np.zeros_like(votes, dtype=bool)
+        present[rows, top_labels.ravel()] = True
+        votes[~present] = -np.inf
+        winners = np.argmax(votes, axis=1)
+        if self.confidence == "centroid":
+            queries = _normalize_rows(np.atleast_2d(np.asarray(embeddings, dtype=np.float32)))
+            score = np.einsum("ij,ij->i", queries, view[3][winners])
+        else:
+            score = np.where(top_labels == winners[:, None], top_sims, -np.inf).max(axis=1)
+        return [(self.labels[w], float(s)) for w, s in zip(winners.tolist(), score.tolist())]
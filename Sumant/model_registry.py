@@ -0,0 +1,118 @@
+"""
+Process-wide registry of loaded sentence-transformer models.
+
+Every NLP parser asks the registry for its model by name instead of
+constructing one, so a process holds one copy of each model however many
+parsers (Tejas, Sumant) use it.
+
+- acquire_model(name): return the loaded model, loading it on first use.
+  Concurrent callers of the same name wait for a single load.
+- release_model(name): drop one reference. The model stays loaded.
+- unload_model(name, force=False): free the model once nobody holds it.
+- registry_status(): loaded models and their reference counts.
+
+A name may carry a runtime suffix (see Sumant.onnx_encoder.encoder_name):
+"all-MiniLM-L6-v2@onnx" loads the ONNX Runtime encoder instead of the
+PyTorch one.
+"""
+from typing import Any, Callable, Dict
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _load_encoder(name: str):
+    model_name, _, runtime = name.partition("@")
+    if runtime == "onnx":
+        from Sumant.onnx_encoder import load_onnx_encoder
+        return load_onnx_encoder(model_name)
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+class _Entry:
+    def __init__(self):
+        self.lock = threading.Lock()  # held while loading
+        self.model = None
+        self.refs = 0
+        self.load_s = 0.0
+
+
+class ModelRegistry:
+    """Thread-safe, reference-counted name -> model map."""
+
+    def __init__(self, loader: Callable[[str], Any] = _load_encoder):
+        self.loader = loader
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+
+    def acquire(self, name: str):
+        """Return the model `name`, loading it if needed, and count a reference."""
+        with self._lock:
+            entry = self._entries.setdefault(name, _Entry())
+            entry.refs += 1
+        try:
+            # Per-model lock: loading one model doesn't block users of another
+            with entry.lock:
+                if entry.model is None:
+                    start = time.perf_counter()
+                    entry.model = self.loader(name)
+                    entry.load_s = time.perf_counter() - start
+                    logger.info(f"Loaded model {name} in {entry.load_s:.2f}s")
+                return entry.model
+        except BaseException:
+            self.release(name)
+            raise
+
+    def release(self, name: str):
+        """Drop one reference to `name`; the model itself stays loaded."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.refs == 0:
+                raise ValueError(f"model {name!r} is not acquired")
+            entry.refs -= 1
+
+    def unload(self, name: str, force: bool = False) -> bool:
+        """
+        Forget the loaded model `name` so it can be freed. Refuses (returns
+        False) while references are held, unless `force` is set.
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or (entry.refs and not force):
+                return False
+            del self._entries[name]
+        return True
+
+    def refcount(self, name: str) -> int:
+        with self._lock:
+            entry = self._entries.get(name)
+            return entry.refs if entry else 0
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                name: {"loaded": e.model is not None, "refs": e.refs, "load_s": e.load_s}
+                for name, e in self._entries.items()
+            }
+
+
+REGISTRY = ModelRegistry()
+
+
+def acquire_model(name: str):
+    return REGISTRY.acquire(name)
+
+
+def release_model(name: str):
+    REGISTRY.release(name)
+
+
+def unload_model(name: str, force: bool = False) -> bool:
+    return REGISTRY.unload(name, force)
+
+
+def registry_status() -> Dict[str, Dict[str, Any]]:
+    return REGISTRY.status()
@@ -0,0 +1,205 @@
+"""
+ONNX Runtime backend for the sentence encoder (CPU only, optional).
+
+The same all-MiniLM-L6-v2 encoder the NLP parsers run through PyTorch,
+exported once to ONNX and served by onnxruntime. Answers need no torch
+import and use less memory, and with dynamic int8 quantization they are
+also faster.
+
+Selection goes through $VOXMIND_EMBEDDING_RUNTIME:
+- torch (default): sentence-transformers / PyTorch,
+- onnx: OnnxSentenceEncoder. Needs onnxruntime and tokenizers; the first
+  load also needs torch and transformers to export the model (see
+  export_onnx). After that the exported files are reused from
+  $VOXMIND_ONNX_DIR (default ~/.cache/voxmind/onnx).
+
+Tuning knobs for the onnx runtime:
+- $VOXMIND_ONNX_THREADS: intra-op threads (default: onnxruntime's choice).
+- $VOXMIND_ONNX_QUANTIZE=0: run the float32 graph instead of the int8 one.
+
+Parsers ask the model registry for encoder_name(MODEL_NAME). The ONNX
+model gets its own name ("all-MiniLM-L6-v2@onnx"), so its embeddings never
+mix with the PyTorch ones in the embedding caches.
+"""
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple, Union
+import importlib.util
+import logging
+import os
+import time
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_RUNTIMES = ("torch", "onnx")
+
+# Modules each runtime needs at inference time
+_RUNTIME_MODULES = {
+    "torch": ("sentence_transformers", "numpy"),
+    "onnx": ("onnxruntime", "tokenizers", "numpy"),
+}
+
+ONNX_FILE = "model.onnx"
+ONNX_INT8_FILE = "model.int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+def selected_embedding_runtime() -> str:
+    """Encoder runtime chosen with $VOXMIND_EMBEDDING_RUNTIME (torch or onnx)."""
+    runtime = os.environ.get("VOXMIND_EMBEDDING_RUNTIME", "torch").strip().lower()
+    return runtime if runtime in EMBEDDING_RUNTIMES else "torch"
+
+
+def runtime_available(runtime: Optional[str] = None) -> bool:
+    """Whether the modules of `runtime` (default: the selected one) are installed."""
+    modules = _RUNTIME_MODULES[runtime or selected_embedding_runtime()]
+    return all(importlib.util.find_spec(m) is not None for m in modules)
+
+
+def encoder_name(model_name: str, runtime: Optional[str] = None) -> str:
+    """Registry/cache name of `model_name` served by `runtime`."""
+    runtime = runtime or selected_embedding_runtime()
+    return model_name if runtime == "torch" else f"{model_name}@{runtime}"
+
+
+def split_encoder_name(name: str) -> Tuple[str, str]:
+    """Inverse of encoder_name: (model name, runtime)."""
+    model_name, _, runtime = name.partition("@")
+    return model_name, runtime or "torch"
+
+
+def default_onnx_dir(model_name: str) -> str:
+    base = os.environ.get("VOXMIND_ONNX_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "voxmind", "onnx")
+    return os.path.join(base, model_name.replace("/", "__"))
+
+
+def _hub_id(model_name: str) -> str:
+    # sentence-transformers resolves bare names under its own organization
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+def export_onnx(model_name: str, out_dir: str, quantize: bool = True, opset: int = 14) -> str:
+    """
+    Export the transformer of `model_name` to out_dir/model.onnx (plus its
+    tokenizer.json) and, with `quantize`, an int8 copy model.int8.onnx.
+
+    Build-time step: needs torch, transformers and onnxruntime. Returns
+    out_dir.
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(_hub_id(model_name))
+    model = AutoModel.from_pretrained(_hub_id(model_name)).eval()
+    tokenizer.backend_tokenizer.save(os.path.join(out_dir, TOKENIZER_FILE))
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+    dynamic = {n: {0: "batch", 1: "tokens"} for n in names}
+    dynamic["last_hidden_state"] = {0: "batch", 1: "tokens"}
+    path = os.path.join(out_dir, ONNX_FILE)
+    with torch.no_grad():
+        torch.onnx.export(model, tuple(sample[n] for n in names), path,
+                          input_names=names, output_names=["last_hidden_state"],
+                          dynamic_axes=dynamic, opset_version=opset)
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        # Weights to int8 ahead of time, activations quantized per call
+        quantize_dynamic(path, os.path.join(out_dir, ONNX_INT8_FILE), weight_type=QuantType.QInt8)
+    logger.info(f"Exported {model_name} to {out_dir}")
+    return out_dir
+
+
+class OnnxSentenceEncoder:
+    """
+    Sentence encoder on onnxruntime with the sentence-transformers
+    all-MiniLM pipeline: transformer -> mean pooling over real tokens -> L2
+    normalization.
+
+    encode() takes the same arguments as SentenceTransformer.encode, so it
+    can stand in wherever the parsers use the model.
+    """
+
+    def __init__(self, model_dir: str, quantized: bool = True, intra_op_threads: Optional[int] = None,
+                 max_length: int = 256, warmup: bool = True):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.model_dir = model_dir
+        self.quantized = quantized and os.path.exists(os.path.join(model_dir, ONNX_INT8_FILE))
+        self.path = os.path.join(model_dir, ONNX_INT8_FILE if self.quantized else ONNX_FILE)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.inter_op_num_threads = 1  # one graph, no parallel branches to run
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(self.path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length)
+        self.tokenizer.enable_padding()
+
+        # The first run allocates buffers and picks kernels; pay for it here
+        # rather than on the user's first command
+        self.warmup_s = 0.0
+        if warmup:
+            start = time.perf_counter()
+            self.encode(["warm up the encoder"])
+            self.warmup_s = time.perf_counter() - start
+
+    def _run(self, texts: List[str]) -> "np.ndarray":
+        import numpy as np
+
+        batch = self.tokenizer.encode_batch(texts)
+        ids = np.array([e.ids for e in batch], dtype=np.int64)
+        mask = np.array([e.attention_mask for e in batch], dtype=np.int64)
+        feeds = {"input_ids": ids, "attention_mask": mask, "token_type_ids": np.zeros_like(ids)}
+        hidden = self.session.run(None, {n: feeds[n] for n in self.input_names})[0]
+        weights = mask[:, :, None].astype(np.float32)
+        pooled = (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        return pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+
+    def encode(self, sentences: Union[str, Sequence[str]], batch_size: int = 32,
+               **kwargs) -> "np.ndarray":
+        """(n, dim) float32 embeddings, or (dim,) for a single string."""
+        import numpy as np
+
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        # Similar lengths per batch keep padding (wasted work) small
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        out = None
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            vecs = self._run([texts[i] for i in chunk])
+            if out is None:
+                out = np.empty((len(texts), vecs.shape[1]), dtype=np.float32)
+            out[chunk] = vecs
+        return out[0] if single else out
+
+
+def load_onnx_encoder(model_name: str, model_dir: Optional[str] = None) -> OnnxSentenceEncoder:
+    """
+    OnnxSentenceEncoder for `model_name`, exporting it on first use.
+    Threads and quantization come from $VOXMIND_ONNX_THREADS and
+    $VOXMIND_ONNX_QUANTIZE.
+    """
+    model_dir = model_dir or default_onnx_dir(model_name)
+    quantize = os.environ.get("VOXMIND_ONNX_QUANTIZE", "1").strip().lower() not in ("0", "false", "no")
+    threads = int(os.environ.get("VOXMIND_ONNX_THREADS") or 0) or None
+    if not (os.path.exists(os.path.join(model_dir, ONNX_FILE))
+            and os.path.exists(os.path.join(model_dir, TOKENIZER_FILE))):
+        export_onnx(model_name, model_dir, quantize=quantize)
+    elif quantize and not os.path.exists(os.path.join(model_dir, ONNX_INT8_FILE)):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(os.path.join(model_dir, ONNX_FILE), os.path.join(model_dir, ONNX_INT8_FILE),
+                         weight_type=QuantType.QInt8)
+    return OnnxSentenceEncoder(model_dir, quantized=quantize, intra_op_threads=threads)
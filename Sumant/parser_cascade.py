@@ -0,0 +1,176 @@
+"""
+Cost-ordered parser cascade.
+
+A cascade runs a list of stages (regex, TF-IDF, embedding, ...) from the
+cheapest to the most expensive and stops at the first stage whose result is
+confident enough. Expensive stages therefore only see the utterances the
+cheap ones could not handle.
+
+- CascadeStage: one stage. Declares a name, a relative cost and a
+  confidence threshold, and wraps a function text -> result dict or None.
+  A result may carry a 'confidence' key (missing means 1.0).
+- ParserCascade: runs the stages, for one utterance (parse) or many
+  (parse_many, which hands each stage its unresolved utterances as a batch).
+- CascadeStats: how many utterances each stage saw and resolved, and the
+  time spent in it.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import threading
+import time
+
+StageFn = Callable[[str], Optional[Dict[str, Any]]]
+BatchStageFn = Callable[[List[str]], List[Optional[Dict[str, Any]]]]
+
+
+class CascadeStage:
+    """
+    One step of a ParserCascade.
+
+    fn(text) returns a result dict, or None when the stage has no answer.
+    The result is accepted when its 'confidence' (default 1.0) is strictly
+    above `threshold`, like the parser's original NLP check (> 0.65).
+    batch_fn(texts), if given, must return one result (or None) per text
+    and is used by ParserCascade.parse_many, e.g. to encode all utterances
+    in one model call.
+    """
+
+    def __init__(self, name: str, fn: StageFn, cost: float = 1.0, threshold: float = 0.0,
+                 batch_fn: Optional[BatchStageFn] = None):
+        self.name = name
+        self.fn = fn
+        self.cost = cost
+        self.threshold = threshold
+        self.batch_fn = batch_fn
+
+    def accepts(self, result: Optional[Dict[str, Any]]) -> bool:
+        return result is not None and result.get("confidence", 1.0) > self.threshold
+
+    def run_batch(self, texts: List[str]) -> List[Optional[Dict[str, Any]]]:
+        if self.batch_fn is not None:
+            return self.batch_fn(texts)
+        return [self.fn(t) for t in texts]
+
+    def __repr__(self):
+        return f"CascadeStage({self.name!r}, cost={self.cost}, threshold={self.threshold})"
+
+
+@dataclass
+class StageStats:
+    attempted: int = 0
+    resolved: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class CascadeStats:
+    """
+    Counters of a ParserCascade.
+
+    - utterances: inputs parsed.
+    - stages: per stage name, utterances attempted / resolved and seconds spent.
+    - unresolved: inputs no stage accepted (answered by the default).
+    """
+
+    utterances: int = 0
+    unresolved: int = 0
+    stages: Dict[str, StageStats] = field(default_factory=dict)
+
+    @property
+    def resolved_by(self) -> Dict[str, int]:
+        return {name: s.resolved for name, s in self.stages.items()}
+
+    @property
+    def skipped(self) -> Dict[str, int]:
+        """Per stage, how many utterances it never had to look at."""
+        return {name: self.utterances - s.attempted for name, s in self.stages.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "utterances": self.utterances,
+            "unresolved": self.unresolved,
+            "resolved_by": self.resolved_by,
+            "skipped": self.skipped,
+            "stages": {
+                name: {"attempted": s.attempted, "resolved": s.resolved, "seconds": s.seconds}
+                for name, s in self.stages.items()
+            },
+        }
+
+
+class ParserCascade:
+    """
+    Run stages cheapest-first and return the first accepted result.
+
+    The accepted result gets a 'source' key with the stage name (unless the
+    stage already set one). When no stage accepts, default(text) is returned.
+    """
+
+    def __init__(self, stages: Sequence[CascadeStage],
+                 default: Optional[Callable[[str], Dict[str, Any]]] = None):
+        self.stages = sorted(stages, key=lambda s: s.cost)
+        self.default = default or (lambda text: {"type": "unknown", "original_text": text})
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def stage(self, name: str) -> CascadeStage:
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(name)
+
+    def reset_stats(self):
+        with self._lock:
+            self.stats = CascadeStats(stages={s.name: StageStats() for s in self.stages})
+
+    def parse(self, text: str) -> Dict[str, Any]:
+        """Parse one utterance."""
+        for stage in self.stages:
+            start = time.perf_counter()
+            result = stage.fn(text)
+            accepted = stage.accepts(result)
+            self._record(stage.name, 1, int(accepted), time.perf_counter() - start)
+            if accepted:
+                self._finish(1, 0)
+                result.setdefault("source", stage.name)
+                return result
+        self._finish(1, 1)
+        return self.default(text)
+
+    def parse_many(self, texts: Sequence[str]) -> List[Dict[str, Any]]:
+        """
+        Parse many utterances. Each stage is called once (via its batch
+        function) with only the utterances no cheaper stage resolved.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        pending = list(range(len(texts)))
+        for stage in self.stages:
+            if not pending:
+                break
+            start = time.perf_counter()
+            batch = stage.run_batch([texts[i] for i in pending])
+            still = []
+            for i, result in zip(pending, batch):
+                if stage.accepts(result):
+                    result.setdefault("source", stage.name)
+                    results[i] = result
+                else:
+                    still.append(i)
+            self._record(stage.name, len(pending), len(pending) - len(still), time.perf_counter() - start)
+            pending = still
+        for i in pending:
+            results[i] = self.default(texts[i])
+        self._finish(len(texts), len(pending))
+        return results
+
+    def _record(self, name: str, attempted: int, resolved: int, seconds: float):
+        with self._lock:
+            s = self.stats.stages[name]
+            s.attempted += attempted
+            s.resolved += resolved
+            s.seconds += seconds
+
+    def _finish(self, utterances: int, unresolved: int):
+        with self._lock:
+            self.stats.utterances += utterances
+            self.stats.unresolved += unresolved
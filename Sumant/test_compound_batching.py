@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Sumant.embedding_cache import shared_embedding_cache
+
+
+@pytest.fixture
+def parser(make_parser, encoder):
+    p = make_parser(encoder)
+    # Lower the NLP threshold so the random embeddings are accepted
+    p.cascade.stage("nlp").threshold = -1.0
+    encoder.calls.clear()
+    return p, encoder
+
+
+def test_nlp_pieces_share_one_encode_call(parser):
+    p, encoder = parser
+    results = p.parse("open browser and tell me a joke then check battery status")
+    assert encoder.calls == [["tell me a joke", "check battery status"]]
+    assert [r["source"] for r in results] == ["regex", "nlp", "nlp"]
+
+
+def test_same_results_and_context_as_one_by_one(parser):
+    p, encoder = parser
+    text = "search for java then python and set volume to 30 and take a screenshot"
+    batched = p.parse(text)
+    context = dict(p.context)
+
+    shared_embedding_cache().clear()
+    p.context = {"last_intent": None, "last_entities": {}}
+    one_by_one = [p._parse_single_command(piece) for piece in
+                  ["search for java", "python", "set volume to 30", "take a screenshot"]]
+    assert [r["type"] for r in batched] == [r["type"] for r in one_by_one]
+    assert batched[0] == one_by_one[0] and batched[2] == one_by_one[2]
+    assert context["last_intent"] == batched[-1]["type"]
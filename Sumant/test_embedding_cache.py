@@ -0,0 +1,58 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Sumant.embedding_cache import EmbeddingCache
+
+
+def test_repeated_phrases_skip_the_model(encoder):
+    cache = EmbeddingCache()
+    model = encoder
+    first = cache.encode(model, ["Volume up"], "m")
+    again = cache.encode(model, ["  volume   UP "], "m")
+    assert model.calls == [["Volume up"]]
+    assert again.dtype == np.float32 and again.shape == (1, model.dim)
+    np.testing.assert_allclose(again, first, rtol=1e-3, atol=1e-3)
+    info = cache.info()
+    assert (info.hits, info.misses, info.entries) == (1, 1, 1)
+    assert info.bytes == model.dim * 2  # stored as float16
+    assert info.to_dict()["hit_rate"] == 0.5
+
+
+def test_batch_encodes_only_distinct_misses(encoder):
+    cache = EmbeddingCache()
+    model = encoder
+    cache.encode(model, ["next song"], "m")
+    out = cache.encode(model, ["next song", "pause", "Pause", "mute"], "m")
+    assert model.calls[1] == ["pause", "mute"]
+    np.testing.assert_array_equal(out[1], out[2])
+
+
+def test_models_do_not_share_entries(encoder):
+    cache = EmbeddingCache()
+    model = encoder
+    cache.encode(model, ["mute"], "a")
+    cache.encode(model, ["mute"], "b")
+    assert len(model.calls) == 2
+
+
+def test_byte_limit_evicts_least_recently_used(encoder):
+    model = encoder
+    cache = EmbeddingCache(max_bytes=3 * model.dim * 2)
+    for text in ["a", "bb", "ccc"]:
+        cache.encode(model, [text], "m")
+    cache.get("m", "a")  # a is now most recently used
+    cache.encode(model, ["dddd"], "m")
+    info = cache.info()
+    assert info.evictions == 1 and info.entries == 3 and info.bytes <= info.max_bytes
+    assert cache.get("m", "bb") is None
+    assert cache.get("m", "a") is not None
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        EmbeddingCache(max_bytes=0)
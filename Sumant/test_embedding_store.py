@@ -0,0 +1,106 @@
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Sumant.embedding_store import EmbeddingStore, ExampleUpdate, cache_key
+
+EXAMPLES = {"volume": ["volume up", "mute"], "search": ["search for", "look up", "what is"]}
+
+
+def test_miss_then_memory_mapped_hit(tmp_path, encoder):
+    store = EmbeddingStore(str(tmp_path))
+    enc = encoder.encode
+    built = store.get_or_build("m", EXAMPLES, enc)
+    assert len(encoder.calls) == 1 and not built.from_cache
+    np.testing.assert_allclose(built.centroids[0], enc(["volume up", "mute"]).mean(axis=0), rtol=1e-6)
+
+    loaded = store.get_or_build("m", EXAMPLES, enc)
+    assert len(encoder.calls) == 2  # only the explicit call above
+    assert loaded.from_cache
+    assert isinstance(loaded.examples.base, np.memmap) or isinstance(loaded.examples, np.memmap)
+    np.testing.assert_array_equal(loaded.examples_of("search"), built.examples_of("search"))
+    assert list(loaded.centroid_dict()) == ["volume", "search"]
+
+
+def test_key_changes_with_model_and_examples():
+    changed = dict(EXAMPLES, volume=["volume up", "mute", "louder"])
+    assert cache_key("m", EXAMPLES) != cache_key("m", changed)
+    assert cache_key("m", EXAMPLES) != cache_key("other", EXAMPLES)
+
+
+def test_corrupt_or_mismatched_files_are_rebuilt(tmp_path, encoder):
+    store = EmbeddingStore(str(tmp_path))
+    enc = encoder.encode
+    store.get_or_build("m", EXAMPLES, enc)
+    meta = store._meta_path(cache_key("m", EXAMPLES))
+    with open(meta) as f:
+        npy = os.path.join(str(tmp_path), json.load(f)["data"])
+
+    with open(npy, "wb") as f:
+        f.write(b"not an array")
+    assert store.load("m", EXAMPLES) is None
+    assert not store.get_or_build("m", EXAMPLES, enc).from_cache
+    assert store.load("m", EXAMPLES) is not None
+    assert not os.path.exists(npy)  # replaced by a new data file
+
+    with open(meta, "w") as f:
+        f.write('{"key": "something else"}')
+    assert store.load("m", EXAMPLES) is None
+
+
+def test_update_log_is_folded_into_the_snapshot(tmp_path, encoder):
+    store = EmbeddingStore(str(tmp_path))
+    store.get_or_build("m", EXAMPLES, encoder.encode)
+    store.append_update("m", EXAMPLES, ExampleUpdate("add", "volume", ["louder"], encoder.encode(["louder"])))
+    store.append_update("m", EXAMPLES, ExampleUpdate("remove", "search", ["what is"]))
+    store.append_update("m", EXAMPLES, ExampleUpdate("add", "weather", ["is it raining"]))  # taught offline
+    expected = {"volume": ["volume up", "mute", "louder"], "search": ["search for", "look up"],
+                "weather": ["is it raining"]}
+    assert store.current_examples("m", EXAMPLES) == expected
+
+    encoder.calls.clear()
+    folded = store.get_or_build("m", EXAMPLES, encoder.encode)
+    assert encoder.texts == ["is it raining"]
+    assert folded.example_lists() == expected
+    assert not os.path.exists(store._updates_path("m", EXAMPLES))
+
+    loaded = store.get_or_build("m", EXAMPLES, encoder.encode)
+    assert loaded.from_cache and loaded.example_lists() == expected
+    np.testing.assert_array_equal(loaded.examples_of("volume")[2], encoder.vector("louder"))
+    np.testing.assert_allclose(loaded.centroid_dict()["search"],
+                               encoder.encode(["search for", "look up"]).mean(axis=0), rtol=1e-6)
+    assert store.current_examples("m", EXAMPLES) == expected
+
+
+def test_superseded_files_are_deleted(tmp_path, encoder):
+    old = EmbeddingStore(str(tmp_path), namespace="p")
+    old.get_or_build("m", EXAMPLES, encoder.encode)
+    old.append_update("m", EXAMPLES, ExampleUpdate("remove", "volume", ["mute"]))
+    other_model = EmbeddingStore(str(tmp_path), namespace="p")
+    other_model.get_or_build("m2", EXAMPLES, encoder.encode)
+    other_namespace = EmbeddingStore(str(tmp_path), namespace="q")
+    other_namespace.get_or_build("m", {"help": ["help"]}, encoder.encode)
+    old_key = cache_key("m", EXAMPLES)
+    (tmp_path / "0ld.npy").write_bytes(b"")
+    (tmp_path / "0ld.json").write_text(json.dumps({"key": "0ld", "version": 1, "model": "m"}))
+    (tmp_path / "0ld.updates.jsonl").write_text("")
+
+    changed = dict(EXAMPLES, volume=["volume up"])
+    EmbeddingStore(str(tmp_path), namespace="p").get_or_build("m", changed, encoder.encode)
+    names = os.listdir(str(tmp_path))
+    assert not [n for n in names if n.startswith(old_key) or n.startswith("0ld.")]
+    keys = {n.split(".")[0] for n in names}
+    assert keys == {cache_key("m", changed), cache_key("m2", EXAMPLES), cache_key("m", {"help": ["help"]})}
+    assert len(names) == 6  # one sidecar and one data file each
+
+
+def test_unwritable_cache_dir_still_returns_embeddings(tmp_path, encoder):
+    blocker = tmp_path / "file"
+    blocker.write_text("x")
+    store = EmbeddingStore(str(blocker / "sub"))
+    result = store.get_or_build("m", EXAMPLES, encoder.encode)
+    assert result.centroids.shape == (2, encoder.dim)
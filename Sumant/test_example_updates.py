@@ -0,0 +1,110 @@
+import os
+import sys
+import zlib
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Sumant.advanced_command_parser as acp
+from Sumant.embedding_store import EmbeddingStore, ExampleUpdate, apply_updates, build_embeddings
+from Sumant.intent_scoring import CentroidScorer, ExemplarIndex
+
+
+def _vec(text, dim=16):
+    return np.random.default_rng(zlib.crc32(text.encode())).standard_normal(dim).astype(np.float32)
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_exemplar_index_add_remove_matches_rebuild(quantize):
+    phrases = {("a", f"a{i}"): _vec(f"a{i}") for i in range(5)}
+    phrases.update({("b", f"b{i}"): _vec(f"b{i}") for i in range(3)})
+    keys = list(phrases)
+    index = ExemplarIndex(np.stack([phrases[k] for k in keys[:2]]), [k[0] for k in keys[:2]],
+                          k=3, quantize=quantize, keys=keys[:2])
+    for key in keys[2:]:
+        index.add(key[0], phrases[key], keys=[key])
+    assert index.remove([("a", "a1"), ("b", "b0"), ("missing", "x")]) == 2
+
+    live = [k for k in keys if k not in (("a", "a1"), ("b", "b0"))]
+    rebuilt = ExemplarIndex(np.stack([phrases[k] for k in live]), [k[0] for k in live],
+                            k=3, quantize=quantize)
+    queries = np.stack([_vec(f"query {i}") for i in range(20)])
+    assert len(index.matrix) == len(live)
+    assert index.best_batch(queries) == rebuilt.best_batch(queries)
+
+
+def test_centroid_scorer_running_means():
+    examples = {"a": [f"a{i}" for i in range(4)], "b": ["b0", "b1"]}
+    scorer = CentroidScorer.from_intent_embeddings(build_embeddings(lambda ts: np.stack([_vec(t) for t in ts]), examples))
+    scorer.add("a", np.stack([_vec("a9")]))
+    scorer.remove("a", np.stack([_vec("a0"), _vec("a1")]))
+    scorer.add("c", _vec("c0"))
+    scorer.remove("b", np.stack([_vec("b0"), _vec("b1")]))
+
+    expected = CentroidScorer({"a": np.mean([_vec(t) for t in ("a2", "a3", "a9")], axis=0), "c": _vec("c0")})
+    assert scorer.labels == ["a", "c"]
+    np.testing.assert_allclose(scorer.matrix, expected.matrix, atol=1e-6)
+
+
+def test_update_log_round_trip(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    base = {"volume": ["volume up", "mute"]}
+    store.append_update("m", base, ExampleUpdate("add", "volume", ["crank it"], np.stack([_vec("crank it")])))
+    store.append_update("m", base, ExampleUpdate("remove", "volume", ["mute"]))
+    with open(store._updates_path("m", base), "a") as f:
+        f.write('{"op": "add", "intent": "vol')  # cut short by a crash
+
+    updates = store.load_updates("m", base)
+    assert [(u.op, u.phrases) for u in updates] == [("add", ["crank it"]), ("remove", ["mute"])]
+    np.testing.assert_array_equal(updates[0].embeddings[0], _vec("crank it"))
+    assert updates[1].embeddings is None
+    assert apply_updates(base, updates) == {"volume": ["volume up", "crank it"]}
+    assert base == {"volume": ["volume up", "mute"]}
+    assert store.load_updates("other-model", base) == []
+
+
+def test_add_examples_encodes_only_new_phrases_and_persists(make_parser, encoder):
+    parser = make_parser(encoder)
+    encoder.calls.clear()
+
+    assert parser.add_examples("weather", ["is it raining", "is it raining", "forecast please"]) == 2
+    assert encoder.texts == ["is it raining", "forecast please"]
+    assert parser.add_examples("weather", ["forecast please"]) == 0
+    assert parser._predict_intent("is it raining")["type"] == "weather"
+    assert parser.remove_examples("browser", ["open browser", "not an example"]) == 1
+    assert "open browser" not in parser.intent_examples["browser"]
+
+    # Next run: base embeddings from the cache, taught ones from the log
+    encoder.calls.clear()
+    again = make_parser(encoder)
+    assert encoder.texts == []
+    assert again.intent_examples["weather"] == ["is it raining", "forecast please"]
+    assert "open browser" not in again.intent_examples["browser"]
+    assert len(again.scorer.matrix) == len(parser.scorer.matrix)
+    assert again._predict_intent("forecast please")["type"] == "weather"
+
+
+def test_examples_taught_before_the_model_are_encoded_at_load(make_parser, encoder):
+    offline = make_parser()
+    assert offline.add_examples("weather", ["is it raining"]) == 1
+    assert offline.tfidf.predict("is it raining")["type"] == "weather"
+
+    parser = make_parser(encoder)
+    assert "is it raining" in encoder.texts
+    assert parser._predict_intent("is it raining")["type"] == "weather"
+    # Folded into the cached snapshot: the next start neither encodes nor replays it
+    store = parser.example_store
+    assert store.load_updates(parser.model_name, parser.base_examples) == []
+    assert store.load(parser.model_name, parser.base_examples).phrases_of("weather") == ["is it raining"]
+
+
+def test_examples_can_be_taught_without_numpy(make_parser, monkeypatch):
+    # Without numpy the store / TF-IDF classes are never imported
+    monkeypatch.setattr(acp, "TFIDF_AVAILABLE", False)
+    for name in ("EmbeddingStore", "ExampleUpdate", "TfidfIntentClassifier"):
+        monkeypatch.delattr(acp, name)
+    parser = make_parser()
+    assert parser.add_examples("weather", ["is it raining"]) == 1
+    assert parser.remove_examples("weather", ["is it raining"]) == 1
@@ -0,0 +1,179 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Sumant.advanced_command_parser as acp
+from Sumant.intent_scoring import CentroidScorer, ExemplarIndex
+
+
+def _loop_best(embedding, centroids):
+    # The per-intent loop the parsers used before CentroidScorer.
+    scores = {
+        intent: np.dot(embedding, c) / (np.linalg.norm(embedding) * np.linalg.norm(c))
+        for intent, c in centroids.items()
+    }
+    best = max(scores, key=scores.get)
+    return best, scores[best]
+
+
+def _centroids(rng, n=8, dim=384):
+    return {f"intent_{i}": rng.standard_normal(dim).astype(np.float32) for i in range(n)}
+
+
+def test_matches_per_intent_loop():
+    rng = np.random.default_rng(0)
+    centroids = _centroids(rng)
+    scorer = CentroidScorer(centroids)
+    assert scorer.matrix.flags["C_CONTIGUOUS"] and scorer.matrix.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(scorer.matrix, axis=1), 1.0, rtol=1e-5)
+    for _ in range(50):
+        emb = rng.standard_normal(384).astype(np.float32)
+        intent, score = scorer.best(emb)
+        expected_intent, expected_score = _loop_best(emb, centroids)
+        assert intent == expected_intent
+        assert abs(score - expected_score) < 1e-5
+
+
+def test_batch_matches_single():
+    rng = np.random.default_rng(1)
+    scorer = CentroidScorer(_centroids(rng))
+    embs = rng.standard_normal((20, 384)).astype(np.float32)
+    batch = scorer.best_batch(embs)
+    assert [b[0] for b in batch] == [scorer.best(e)[0] for e in embs]
+    np.testing.assert_allclose([b[1] for b in batch], [scorer.best(e)[1] for e in embs], atol=1e-6)
+    np.testing.assert_allclose(scorer.scores_batch(embs)[3], scorer.scores(embs[3]), atol=1e-6)
+    assert scorer.best_batch(np.zeros((0, 384), dtype=np.float32)) == []
+
+
+def test_zero_vectors_score_zero():
+    scorer = CentroidScorer({"a": np.zeros(4), "b": np.array([1.0, 0, 0, 0])})
+    assert scorer.best(np.array([0.0, 1, 0, 0]))[1] == 0.0
+    assert scorer.best(np.array([2.0, 0, 0, 0])) == ("b", 1.0)
+    assert not np.isnan(scorer.scores(np.zeros(4))).any()
+
+
+def _clusters(rng, dim=64):
+    """'browser' has two far-apart modes; 'search' sits between them."""
+    a, b = rng.standard_normal(dim), rng.standard_normal(dim)
+    mid = (a + b) / 2 + 0.3 * rng.standard_normal(dim)
+    emb = np.concatenate([
+        a + 0.1 * rng.standard_normal((5, dim)),
+        b + 0.1 * rng.standard_normal((5, dim)),
+        mid + 0.1 * rng.standard_normal((5, dim)),
+    ]).astype(np.float32)
+    labels = ["browser"] * 10 + ["search"] * 5
+    return emb, labels, a, b
+
+
+def test_exemplar_index_keeps_multimodal_intents_apart():
+    rng = np.random.default_rng(2)
+    emb, labels, a, b = _clusters(rng)
+    index = ExemplarIndex(emb, labels, k=3)
+    assert index.best(a)[0] == "browser"
+    assert index.best(b)[0] == "browser"
+    majority = ExemplarIndex(emb, labels, k=3, voting="majority")
+    assert majority.best(b)[0] == "browser"
+    label, score = index.best(emb[0])
+    assert label == "browser" and abs(score - 1.0) < 1e-5
+
+
+def test_exemplar_batch_and_int8_agree_with_float():
+    rng = np.random.default_rng(3)
+    emb = rng.standard_normal((2000, 384)).astype(np.float32)
+    labels = [f"intent_{i % 12}" for i in range(2000)]
+    exact = ExemplarIndex(emb, labels, k=5)
+    quant = ExemplarIndex(emb, labels, k=5, quantize=True)
+    assert quant.matrix.dtype == np.int8 and quant.nbytes < exact.nbytes / 3
+
+    queries = emb[:50] + 0.05 * rng.standard_normal((50, 384)).astype(np.float32)
+    batch = exact.best_batch(queries)
+    single = [exact.best(q) for q in queries]
+    assert [l for l, _ in batch] == [l for l, _ in single]
+    np.testing.assert_allclose([s for _, s in batch], [s for _, s in single], atol=1e-5)
+    np.testing.assert_allclose(quant.similarities(queries), exact.similarities(queries), atol=0.02)
+    assert [l for l, _ in quant.best_batch(queries)] == [l for l, _ in batch]
+
+
+def test_exemplar_index_from_intent_embeddings():
+    from Sumant.embedding_store import build_embeddings
+
+    examples = {"volume": ["up", "down"], "search": ["find", "look", "seek"]}
+    embeddings = build_embeddings(
+        lambda texts: np.stack([np.random.default_rng(sum(map(ord, t))).standard_normal(16) for t in texts]), examples)
+    index = ExemplarIndex.from_intent_embeddings(embeddings, k=1)
+    assert index.labels == ["volume", "search"]
+    assert index.best(embeddings.examples[3])[0] == "search"
+
+
+def test_exemplar_index_empty_batch_and_empty_index():
+    rng = np.random.default_rng(5)
+    emb, labels, _, _ = _clusters(rng)
+    index = ExemplarIndex(emb, labels, k=3, keys=list(range(len(labels))))
+    assert index.best_batch(np.zeros((0, emb.shape[1]), dtype=np.float32)) == []
+    assert index.best_batch([]) == []
+    index.remove(list(range(len(labels))))
+    assert index.best_batch(emb[:2]) == [("unknown", 0.0)] * 2
+
+
+def test_exemplar_index_only_top_k_intents_can_win():
+    # Every similarity is negative and "c" has no neighbour in the top 2: its
+    # zero vote must not beat the negative votes of "a" and "b".
+    emb = np.array([[1.0, 0, 0], [1, 0.1, 0], [0, 1, 0], [0, 0, 1]], dtype=np.float32)
+    query = np.array([-1.0, -1, -2])
+    for voting in ("score", "majority"):
+        label, score = ExemplarIndex(emb, ["a", "a", "b", "c"], k=2, voting=voting).best(query)
+        assert label in ("a", "b") and np.isfinite(score)
+
+
+def test_exemplar_index_len_counts_intents_with_examples():
+    emb = np.eye(3, dtype=np.float32)
+    index = ExemplarIndex(emb, ["a", "b", "b"], keys=["a1", "b1", "b2"])
+    assert len(index) == 2
+    index.remove(["a1"])
+    assert len(index) == 1
+    index.add("a", emb[:1], keys=["a1"])
+    assert len(index) == 2
+
+
+def test_exemplar_index_centroid_confidence():
+    rng = np.random.default_rng(6)
+    emb, labels, _, _ = _clusters(rng)
+    keys = list(range(len(labels)))
+    index = ExemplarIndex(emb, labels, k=3, keys=keys, confidence="centroid")
+    queries = rng.standard_normal((10, emb.shape[1])).astype(np.float32)
+
+    def expected(live):
+        rows = emb[live] / np.linalg.norm(emb[live], axis=1, keepdims=True)
+        centroids = {label: rows[[labels[i] == label for i in live]].mean(axis=0) for label in index.labels}
+        scorer = CentroidScorer(centroids)
+        return [float(scorer.scores(q)[scorer.labels.index(label)])
+                for q, (label, _) in zip(queries, index.best_batch(queries))]
+
+    np.testing.assert_allclose([s for _, s in index.best_batch(queries)], expected(keys), atol=1e-5)
+    # Removing rows keeps the centroids in step
+    index.remove(keys[::2])
+    np.testing.assert_allclose([s for _, s in index.best_batch(queries)], expected(keys[1::2]), atol=1e-5)
+
+
+@pytest.mark.parametrize("similarity,accepted", [(0.7, True), (0.6, False)])
+def test_nlp_threshold_applies_to_the_intent_centroid(make_parser, encoder, monkeypatch, similarity, accepted):
+    encoder.dim = 384  # random examples are then nearly orthogonal to each other
+    parser = make_parser(encoder)
+    rows = encoder.encode(parser.base_examples["utility"])
+    centroid = (rows / np.linalg.norm(rows, axis=1, keepdims=True)).mean(axis=0)
+    centroid /= np.linalg.norm(centroid)
+    other = encoder.vector("unrelated direction")
+    other -= other.dot(centroid) * centroid
+    query = similarity * centroid + np.sqrt(1 - similarity ** 2) * other / np.linalg.norm(other)
+    base = encoder.vector
+    monkeypatch.setattr(encoder, "vector", lambda text: query if text == "zork frobnicate" else base(text))
+
+    assert acp.NLP_THRESHOLD == parser.cascade.stage("nlp").threshold
+    label, score = parser.scorer.best(query)
+    assert label == "utility" and abs(score - similarity) < 1e-3
+    result = parser.parse("zork frobnicate")[0]
+    assert (result.get("source") == "nlp") == accepted
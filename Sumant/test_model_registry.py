@@ -0,0 +1,63 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Sumant.model_registry import ModelRegistry
+
+
+class _Loader:
+    def __init__(self):
+        self.loads = []
+
+    def __call__(self, name):
+        self.loads.append(name)
+        time.sleep(0.05)
+        return object()
+
+
+def test_one_instance_per_name_across_threads():
+    loader = _Loader()
+    registry = ModelRegistry(loader)
+    got = []
+    threads = [threading.Thread(target=lambda: got.append(registry.acquire("mini"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert loader.loads == ["mini"]
+    assert len({id(m) for m in got}) == 1
+    assert registry.refcount("mini") == 8
+    assert registry.acquire("other") is not got[0]
+    assert registry.status()["mini"]["loaded"] is True
+
+
+def test_release_and_explicit_unload():
+    loader = _Loader()
+    registry = ModelRegistry(loader)
+    first = registry.acquire("mini")
+    assert registry.unload("mini") is False  # still referenced
+    registry.release("mini")
+    assert registry.acquire("mini") is first  # release alone keeps it loaded
+    registry.release("mini")
+    assert registry.unload("mini") is True
+    assert registry.status() == {}
+    assert registry.acquire("mini") is not first
+    assert loader.loads == ["mini", "mini"]
+    with pytest.raises(ValueError):
+        registry.release("never")
+
+
+def test_failed_load_does_not_leak_a_reference():
+    def broken(name):
+        raise RuntimeError("no weights")
+
+    registry = ModelRegistry(broken)
+    with pytest.raises(RuntimeError):
+        registry.acquire("mini")
+    assert registry.refcount("mini") == 0
+    assert registry.unload("mini") is True
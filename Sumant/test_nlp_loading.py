@@ -0,0 +1,37 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_regex_answers_while_model_loads(make_parser, encoder):
+    encoder.gate = threading.Event()
+    parser = make_parser(encoder, backend="auto", wait=False)
+    assert parser.load_metrics["state"] == "loading"
+    assert parser.wait_ready(timeout=0.01) is False
+    assert parser.parse("set volume to 20")[0]["source"] == "regex"
+    assert parser.cascade.stage("nlp").fn("tell me a joke") is None  # NLP stage not in yet
+    assert parser.parse("tell me a joke")[0]["source"] == "tfidf"  # model-free meanwhile
+
+    encoder.gate.set()
+    assert parser.wait_ready(timeout=5) is True
+    assert parser.nlp_ready
+    metrics = parser.load_metrics
+    assert metrics["state"] == "ready" and metrics["embeddings_from_cache"] is False
+    assert metrics["total_s"] >= metrics["model_load_s"]
+    assert parser.cascade.stage("nlp").fn("tell me a joke")["type"] in parser.intent_examples
+    assert parser.cascade.stage("tfidf").fn("tell me a joke") is None  # transformer took over
+
+
+def test_failed_load_resolves_not_ready(make_parser):
+    parser = make_parser(RuntimeError("no weights"))
+    assert parser.wait_ready(timeout=5) is False
+    assert parser.load_metrics["state"] == "failed"
+    assert parser.parse("open browser")[0]["type"] == "browser"
+
+
+def test_without_nlp_dependencies_ready_is_false(make_parser):
+    parser = make_parser()
+    assert parser.ready.done() and parser.wait_ready(0) is False
+    assert parser.load_metrics == {"state": "unavailable"}
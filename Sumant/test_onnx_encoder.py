@@ -0,0 +1,81 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Sumant.advanced_command_parser as acp
+import Sumant.onnx_encoder as onnx_encoder
+from Sumant.model_registry import ModelRegistry, _load_encoder
+
+
+def test_runtime_selection(monkeypatch):
+    monkeypatch.delenv("VOXMIND_EMBEDDING_RUNTIME", raising=False)
+    assert onnx_encoder.selected_embedding_runtime() == "torch"
+    assert onnx_encoder.encoder_name("mini") == "mini"
+    monkeypatch.setenv("VOXMIND_EMBEDDING_RUNTIME", " ONNX ")
+    assert onnx_encoder.encoder_name("mini") == "mini@onnx"
+    assert onnx_encoder.split_encoder_name("mini@onnx") == ("mini", "onnx")
+    assert onnx_encoder.split_encoder_name("mini") == ("mini", "torch")
+    monkeypatch.setenv("VOXMIND_EMBEDDING_RUNTIME", "tensorflow")
+    assert onnx_encoder.selected_embedding_runtime() == "torch"
+
+
+def test_registry_loads_onnx_names_through_onnx_encoder(monkeypatch):
+    loaded = []
+    monkeypatch.setattr(onnx_encoder, "load_onnx_encoder", lambda name: loaded.append(name) or "onnx-model")
+    registry = ModelRegistry(_load_encoder)
+    assert registry.acquire("mini@onnx") == "onnx-model"
+    assert loaded == ["mini"]
+
+
+def test_parser_tags_model_name_with_runtime(monkeypatch, make_parser):
+    monkeypatch.setenv("VOXMIND_EMBEDDING_RUNTIME", "onnx")
+    assert make_parser().model_name == acp.MODEL_NAME + "@onnx"
+
+
+class _FakeTokenizer:
+    """Whitespace tokenizer, padded to the longest text of the batch."""
+
+    def encode_batch(self, texts):
+        ids = [[sum(map(ord, w)) for w in t.split()] for t in texts]
+        width = max(map(len, ids))
+        return [SimpleNamespace(ids=i + [0] * (width - len(i)), attention_mask=[1] * len(i) + [0] * (width - len(i)))
+                for i in ids]
+
+
+class _FakeSession:
+    """Token id -> fixed hidden state; padding (id 0) gets a huge one."""
+
+    def __init__(self):
+        self.feeds = []
+
+    @staticmethod
+    def hidden(token_id):
+        if token_id == 0:
+            return np.full(8, 1e3, dtype=np.float32)
+        return np.random.default_rng(token_id).standard_normal(8).astype(np.float32)
+
+    def run(self, outputs, feeds):
+        self.feeds.append(feeds)
+        return [np.array([[self.hidden(t) for t in row] for row in feeds["input_ids"]])]
+
+
+def test_onnx_encode_mean_pools_unpadded_tokens_and_normalizes():
+    encoder = onnx_encoder.OnnxSentenceEncoder.__new__(onnx_encoder.OnnxSentenceEncoder)
+    encoder.tokenizer, encoder.session = _FakeTokenizer(), _FakeSession()
+    encoder.input_names = ["input_ids", "attention_mask"]
+    texts = ["open the browser now", "mute", "what time is it"]
+
+    out = encoder.encode(texts, batch_size=2)
+    assert out.shape == (3, 8) and out.dtype == np.float32
+    for text, vec in zip(texts, out):
+        mean = np.mean([_FakeSession.hidden(sum(map(ord, w))) for w in text.split()], axis=0)
+        np.testing.assert_allclose(vec, mean / np.linalg.norm(mean), rtol=1e-5, atol=1e-6)
+    # Only the graph's inputs are fed; batches are grouped by length
+    assert all(set(feeds) == {"input_ids", "attention_mask"} for feeds in encoder.session.feeds)
+    assert [len(feeds["input_ids"]) for feeds in encoder.session.feeds] == [2, 1]
+    np.testing.assert_allclose(encoder.encode("mute"), out[1], rtol=1e-6)
+    assert encoder.encode([]).shape == (0, 0)
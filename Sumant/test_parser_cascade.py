@@ -0,0 +1,74 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Sumant.parser_cascade import CascadeStage, ParserCascade
+
+
+def _regex(text):
+    return {"type": "volume"} if "volume" in text else None
+
+
+class _Embedding:
+    """Stand-in for an expensive stage; records what it was asked to score."""
+
+    def __init__(self):
+        self.seen = []
+
+    def one(self, text):
+        self.seen.append(text)
+        return {"type": "search", "confidence": 0.9 if "weather" in text else 0.2}
+
+    def batch(self, texts):
+        self.seen.append(list(texts))
+        return [self.one(t) for t in texts]
+
+
+def test_stages_run_cheapest_first_and_stop_when_confident():
+    emb = _Embedding()
+    cascade = ParserCascade([
+        CascadeStage("embedding", emb.one, cost=100, threshold=0.65),
+        CascadeStage("regex", _regex, cost=1),
+    ])
+    assert [s.name for s in cascade.stages] == ["regex", "embedding"]
+
+    assert cascade.parse("volume up") == {"type": "volume", "source": "regex"}
+    assert emb.seen == []
+    assert cascade.parse("weather today")["source"] == "embedding"
+    assert cascade.parse("blah")["type"] == "unknown"
+
+    stats = cascade.stats.to_dict()
+    assert stats["utterances"] == 3
+    assert stats["resolved_by"] == {"regex": 1, "embedding": 1}
+    assert stats["unresolved"] == 1
+    assert stats["skipped"] == {"regex": 0, "embedding": 1}
+
+
+def test_threshold_is_exclusive():
+    stage = CascadeStage("nlp", _regex, threshold=0.65)
+    assert not stage.accepts({"type": "search", "confidence": 0.65})
+    assert stage.accepts({"type": "search", "confidence": 0.650001})
+    assert stage.accepts({"type": "volume"})  # no confidence: 1.0
+    assert not stage.accepts(None)
+
+
+def test_parse_many_batches_only_unresolved():
+    emb = _Embedding()
+    cascade = ParserCascade([
+        CascadeStage("regex", _regex, cost=1),
+        CascadeStage("embedding", emb.one, cost=100, threshold=0.65, batch_fn=emb.batch),
+    ])
+    texts = ["volume up", "weather today", "blah", "volume down"]
+    results = cascade.parse_many(texts)
+    assert [r["type"] for r in results] == ["volume", "search", "unknown", "volume"]
+    assert emb.seen[0] == ["weather today", "blah"]
+    assert results == [cascade.parse(t) for t in texts]
+
+
+def test_advanced_parser_uses_cascade(make_parser):
+    parser = make_parser()
+    assert parser.parse("set volume to 50") == [
+        {"type": "volume", "action": "set", "value": 50, "source": "regex"}
+    ]
+    assert parser.cascade.stats.resolved_by["regex"] == 1
@@ -0,0 +1,44 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Sumant.tfidf_classifier import TfidfIntentClassifier, load_training_file, tokenize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRAINING_DATA = os.path.join(ROOT, "Tejas", "VoxMIndCpp", "training_data.txt")
+
+
+def test_tokenize_matches_cpp_rules():
+    assert tokenize("  What's the TIME, now? ") == ["whats", "the", "time", "now"]
+
+
+def test_trained_on_cpp_training_data():
+    examples = load_training_file(TRAINING_DATA)
+    assert "browser_open" in examples and "open browser" in examples["browser_open"]
+    clf = TfidfIntentClassifier(examples)
+    assert clf.predict("open browser")["type"] == "browser_open"
+    assert clf.predict("turn the volume up")["type"] == "volume_up"
+    assert clf.predict("zzz qqq") == {"type": "unknown", "confidence": 0.0}
+
+
+def test_char_ngrams_absorb_asr_typos():
+    clf = TfidfIntentClassifier.from_training_file(TRAINING_DATA)
+    assert clf.predict("opn chrom")["type"] == "browser_open"
+    assert clf.predict("serch for pizza")["type"] == "search_web"
+    words_only = TfidfIntentClassifier.from_training_file(TRAINING_DATA, char_ngram=0)
+    assert words_only.predict("opn chrom")["type"] == "unknown"
+
+
+def test_advanced_parser_falls_back_to_tfidf(make_parser):
+    parser = make_parser(backend="auto")
+    result = parser.parse("check the battery")[0]
+    assert result["source"] == "tfidf" and result["type"] == "system"
+
+
+def test_tfidf_backend_never_touches_the_model(make_parser, encoder):
+    parser = make_parser(encoder, backend="tfidf", wait=False)
+    results = parser.parse("please open the chrome browser now and check the battery")
+    assert [r["source"] for r in results] == ["regex", "tfidf"]
+    assert parser.load_metrics == {"state": "unavailable"}
+    assert parser.model is None and encoder.calls == []
@@ -0,0 +1,138 @@
+"""
+Model-free TF-IDF intent classifier (Python/NumPy port of
+Tejas/VoxMIndCpp/include/TextClassifier.h).
+
+Needs no network and no model download, so it keeps the NLP parsers useful
+when the sentence-transformer is missing or still loading.
+
+Same scheme as the C++ classifier:
+- tokenize: lowercase, split on whitespace, strip punctuation,
+- each line is a document for IDF; each intent's phrases are pooled into
+  one TF (raw count) * IDF centroid,
+- a query scores by cosine similarity; below `threshold` it is 'unknown'.
+
+Differences:
+- besides words, features include character n-grams of every word
+  ("<chrome>" -> "<ch", "chr", ...), so ASR misspellings still
+  overlap with the right intent,
+- IDF is smoothed, log((1 + N) / (1 + df)) + 1, so frequent features stay
+  positive instead of going negative,
+- centroids are rows of a dense, L2-normalized (intents x features)
+  matrix. A query is sparse (only its own features), so scoring reads just
+  those columns.
+
+predict() has the same shape as AdvancedCommandParser._predict_intent:
+{'type': intent, 'confidence': score}.
+"""
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+import math
+import os
+import string
+
+import numpy as np
+
+_PUNCT = str.maketrans("", "", string.punctuation)
+
+NLP_BACKENDS = ("auto", "transformer", "tfidf")
+
+
+def selected_nlp_backend() -> str:
+    """
+    NLP backend chosen with $VOXMIND_NLP_BACKEND:
+    - auto (default): TF-IDF answers whenever the transformer isn't loaded,
+    - transformer: sentence-transformer only,
+    - tfidf: TF-IDF only; the transformer is never loaded.
+    """
+    backend = os.environ.get("VOXMIND_NLP_BACKEND", "auto").strip().lower()
+    return backend if backend in NLP_BACKENDS else "auto"
+
+
+def tokenize(text: str) -> List[str]:
+    return [w for w in (word.translate(_PUNCT) for word in text.lower().split()) if w]
+
+
+def load_training_file(path: str) -> Dict[str, List[str]]:
+    """Read 'label: phrase' lines (as in training_data.txt) into intent -> phrases."""
+    examples: Dict[str, List[str]] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            label, sep, phrase = line.partition(":")
+            label = label.strip()
+            if not sep or not label or label.startswith("#"):
+                continue
+            examples.setdefault(label, []).append(phrase.strip())
+    return examples
+
+
+class TfidfIntentClassifier:
+    """TF-IDF + char n-gram centroid classifier (see module docstring)."""
+
+    def __init__(self, intent_examples: Mapping[str, Sequence[str]], char_ngram: int = 3,
+                 threshold: float = 0.2):
+        self.char_ngram = char_ngram
+        self.threshold = threshold
+        self.labels: List[str] = list(intent_examples)
+
+        docs = [(label, Counter(self._features(phrase)))
+                for label in self.labels for phrase in intent_examples[label]]
+        df: Counter = Counter()
+        for _, feats in docs:
+            df.update(feats.keys())
+        self.vocab: Dict[str, int] = {f: i for i, f in enumerate(df)}
+        n_docs = len(docs)
+        self.idf = np.array([math.log((1 + n_docs) / (1 + df[f])) + 1.0 for f in self.vocab],
+                            dtype=np.float32)
+
+        label_index = {label: i for i, label in enumerate(self.labels)}
+        centroids = np.zeros((len(self.labels), len(self.vocab)), dtype=np.float32)
+        for label, feats in docs:
+            row = centroids[label_index[label]]
+            for f, count in feats.items():
+                row[self.vocab[f]] += count
+        centroids *= self.idf
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.centroids = np.ascontiguousarray(centroids / norms)
+
+    @classmethod
+    def from_training_file(cls, path: str, **kwargs) -> "TfidfIntentClassifier":
+        return cls(load_training_file(path), **kwargs)
+
+    def _features(self, text: str) -> Iterable[str]:
+        n = self.char_ngram
+        for word in tokenize(text):
+            yield word
+            if n:
+                padded = f"<{word}>"
+                for i in range(len(padded) - n + 1):
+                    yield "#" + padded[i:i + n]  # '#' keeps n-grams apart from words
+
+    def _query(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Sparse TF-IDF vector of `text`: (feature indices, unit-norm weights)."""
+        counts = Counter(i for i in map(self.vocab.get, self._features(text)) if i is not None)
+        if not counts:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.float32)
+        idx = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+        weights = np.fromiter(counts.values(), dtype=np.float32, count=len(counts)) * self.idf[idx]
+        return idx, weights / np.linalg.norm(weights)
+
+    def scores(self, text: str) -> np.ndarray:
+        """Cosine similarity of `text` with every intent (in `labels` order)."""
+        idx, weights = self._query(text)
+        if not len(idx):
+            return np.zeros(len(self.labels), dtype=np.float32)
+        return self.centroids[:, idx] @ weights
+
+    def best(self, text: str) -> Tuple[str, float]:
+        scores = self.scores(text)
+        i = int(np.argmax(scores))
+        return self.labels[i], float(scores[i])
+
+    def predict(self, text: str) -> Dict[str, object]:
+        """{'type': intent or 'unknown', 'confidence': cosine score}."""
+        label, score = self.best(text)
+        return {"type": label if score >= self.threshold else "unknown", "confidence": score}
+
+    def predict_many(self, texts: Sequence[str]) -> List[Dict[str, object]]:
+        return [self.predict(t) for t in texts]
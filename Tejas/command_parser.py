@@ -1,166 +1,181 @@
 """Enhanced command parser with improved patterns, synonyms, and logging."""
-from typing import Dict, Any, Optional
+from typing import TYPE_CHECKING, Dict, Any, List, NamedTuple, Optional, Pattern, Tuple
 import re
 import logging
+import time
+
+if TYPE_CHECKING:
+    from common.parse_metrics import ParseMetrics
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Counters shared with Priyapal.command_parser (common/parse_metrics.py),
+# imported on first use
+_METRICS: Optional["ParseMetrics"] = None
+
+
+def enable_metrics():
+    """Start recording parser metrics (from zero). Off by default."""
+    from common.parse_metrics import ParseMetrics
+
+    global _METRICS
+    _METRICS = ParseMetrics()
+
+
+def disable_metrics():
+    """Stop recording and drop the collected metrics."""
+    global _METRICS
+    _METRICS = None
+
+
+def reset_metrics():
+    """Zero the collected metrics, keeping them enabled if they were."""
+    if _METRICS is not None:
+        enable_metrics()
+
+
+def metrics_snapshot() -> Dict[str, Any]:
+    """
+    Return the collected metrics as a dict. Patterns are keyed like
+    'matched_pattern' ("<category>: <regex>"); latency and fallbacks are
+    keyed by result type.
+    """
+    from common.parse_metrics import snapshot
+
+    return snapshot(_METRICS)
+
+
+WAKE_WORDS = ["hey vox", "vox", "jarvis", "hey jarvis", "ok jarvis", "assistant"]
+
+# Command rules in priority order: (type, category, pattern, capture).
+# `capture` names the result key that receives group 1 of the match.
+RULE_TABLE = [
+    # Browser commands
+    ("open_browser", "browser", r"\b(?:open|launch|start|run)\s+(?:the\s+)?(?:browser|chrome|firefox|edge|safari|opera|brave)", None),
+    ("open_browser", "browser", r"\b(?:open|launch)\s+(?:google\s+)?chrome", None),
+    ("open_browser", "browser", r"\bstart\s+browsing", None),
+    ("open_browser", "browser", r"\bgo\s+online", None),
+    # Time queries
+    ("time", "time", r"\b(?:what(?:'s| is)?\s+(?:the\s+)?time|time\s+now|current\s+time)", None),
+    ("time", "time", r"\bwhat\s+time\s+is\s+it", None),
+    ("time", "time", r"\btell\s+me\s+the\s+time", None),
+    ("time", "time", r"\b(?:what(?:'s| is)?\s+(?:the\s+)?date|today(?:'s)?\s+date)", None),
+    ("time", "time", r"\bwhat\s+day\s+is\s+it", None),
+    # Search queries
+    ("search", "search", r"\b(?:search|google|look\s+up|find)\s+(?:for\s+)?(.+)", "query"),
+    ("search", "search", r"\b(?:lookup|find\s+me)\s+(.+)", "query"),
+    ("search", "search", r"\bwhat\s+is\s+(.+)", "query"),
+    ("search", "search", r"\btell\s+me\s+about\s+(.+)", "query"),
+    # Music/media commands
+    ("play_music", "music", r"\bplay\s+(?:some\s+)?music", None),
+    ("play_music", "music", r"\bstart\s+music", None),
+    ("play_music", "music", r"\bput\s+on\s+(?:some\s+)?music", None),
+    ("play_music", "music", r"\bplay\s+(?:a\s+)?song", None),
+    ("play_music", "music", r"\bplay\s+audio", None),
+    ("play_music", "music", r"\bpause\s+music", None),
+    ("play_music", "music", r"\bstop\s+music", None),
+    ("play_music", "music", r"\bnext\s+(?:song|track)", None),
+    ("play_music", "music", r"\bprevious\s+(?:song|track)", None),
+    ("play_music", "music", r"\bskip\s+(?:song|track)", None),
+    # System commands
+    ("shutdown", "system", r"\b(?:shutdown|shut\s+down|power\s+off|turn\s+off)", None),
+    ("shutdown", "system", r"\b(?:restart|reboot)", None),
+    ("shutdown", "system", r"\b(?:sleep|suspend|hibernate)", None),
+    ("shutdown", "system", r"\b(?:lock|lock\s+screen)", None),
+    ("shutdown", "system", r"\b(?:quit|exit|close)\s+(?:application|program|system)", None),
+    # Volume control
+    ("volume", "volume", r"\b(?:mute|unmute|silence)", None),
+    ("volume", "volume", r"\bvolume\s+(?:up|down|increase|decrease)", None),
+    ("volume", "volume", r"\b(?:turn\s+)?volume\s+(?:to\s+)?(\d+)", None),
+    ("volume", "volume", r"\b(?:louder|quieter|softer)", None),
+    # Application control
+    ("app_control", "app", r"\b(?:open|launch|start|run)\s+(\w+)", "app"),
+    ("app_control", "app", r"\b(?:close|quit|exit)\s+(\w+)", "app"),
+    # Help/assistant queries
+    ("help", "help", r"\b(?:help|what\s+can\s+you\s+do|capabilities)", None),
+    ("help", "help", r"\bwho\s+are\s+you", None),
+    ("help", "help", r"\bwhat\s+are\s+you", None),
+]
+
+
+class Rule(NamedTuple):
+    """A compiled RULE_TABLE entry."""
+    type: str
+    category: str
+    regex: Pattern[str]
+    capture: Optional[str]
+    matched_pattern: str
+
+
+def compile_rules(table: List[Tuple[str, str, str, Optional[str]]]) -> Tuple[Rule, ...]:
+    """Compile a rule table once; `matched_pattern` strings are built here too."""
+    return tuple(
+        Rule(cmd_type, category, re.compile(pattern), capture, f"{category}: {pattern}")
+        for cmd_type, category, pattern, capture in table
+    )
+
+
+RULES = compile_rules(RULE_TABLE)
+
+
 def parse_command(text: str, log_matches: bool = False) -> Dict[str, Any]:
     """Parse command with enhanced pattern matching and optional logging."""
+    metrics = _METRICS
+    if metrics is None:
+        return _parse_command(text, log_matches, None)
+    start = time.perf_counter()
+    result = _parse_command(text, log_matches, metrics)
+    metrics.observe(result["type"], time.perf_counter() - start)
+    return result
+
+
+def _parse_command(text: str, log_matches: bool, metrics: Optional["ParseMetrics"]) -> Dict[str, Any]:
     original_text = text
     t = (text or "").lower().strip()
-    
+
     if not t:
         return {"type": "unknown", "raw": original_text}
-    
+
     # Remove wake words
-    wake_words = ["hey vox", "vox", "jarvis", "hey jarvis", "ok jarvis", "assistant"]
-    for wake in wake_words:
+    for wake in WAKE_WORDS:
         if t.startswith(wake + " "):
             t = t[len(wake):].strip()
             break
-    
-    matched_pattern = None
-    
-    # Browser commands - expanded patterns
-    browser_patterns = [
-        r"\b(?:open|launch|start|run)\s+(?:the\s+)?(?:browser|chrome|firefox|edge|safari|opera|brave)",
-        r"\b(?:open|launch)\s+(?:google\s+)?chrome",
-        r"\bstart\s+browsing",
-        r"\bgo\s+online"
-    ]
-    
-    for pattern in browser_patterns:
-        if re.search(pattern, t):
-            matched_pattern = f"browser: {pattern}"
-            if log_matches:
-                logger.info(f"Matched browser pattern: {pattern} for input: '{original_text}'")
-            return {"type": "open_browser", "raw": original_text, "matched_pattern": matched_pattern}
-    
-    # Time queries - expanded patterns
-    time_patterns = [
-        r"\b(?:what(?:'s| is)?\s+(?:the\s+)?time|time\s+now|current\s+time)",
-        r"\bwhat\s+time\s+is\s+it",
-        r"\btell\s+me\s+the\s+time",
-        r"\b(?:what(?:'s| is)?\s+(?:the\s+)?date|today(?:'s)?\s+date)",
-        r"\bwhat\s+day\s+is\s+it"
-    ]
-    
-    for pattern in time_patterns:
-        if re.search(pattern, t):
-            matched_pattern = f"time: {pattern}"
-            if log_matches:
-                logger.info(f"Matched time pattern: {pattern} for input: '{original_text}'")
-            return {"type": "time", "raw": original_text, "matched_pattern": matched_pattern}
-    
-    # Search queries - enhanced patterns
-    search_patterns = [
-        r"\b(?:search|google|look\s+up|find)\s+(?:for\s+)?(.+)",
-        r"\b(?:lookup|find\s+me)\s+(.+)",
-        r"\bwhat\s+is\s+(.+)",
-        r"\btell\s+me\s+about\s+(.+)"
-    ]
-    
-    for pattern in search_patterns:
-        m = re.search(pattern, t)
-        if m:
-            query = m.group(1).strip()
-            matched_pattern = f"search: {pattern}"
-            if log_matches:
-                logger.info(f"Matched search pattern: {pattern} for input: '{original_text}', query: '{query}'")
-            return {"type": "search", "query": query, "raw": original_text, "matched_pattern": matched_pattern}
-    
-    # Music/media commands - expanded patterns
-    music_patterns = [
-        r"\bplay\s+(?:some\s+)?music",
-        r"\bstart\s+music",
-        r"\bput\s+on\s+(?:some\s+)?music",
-        r"\bplay\s+(?:a\s+)?song",
-        r"\bplay\s+audio",
-        r"\bpause\s+music",
-        r"\bstop\s+music",
-        r"\bnext\s+(?:song|track)",
-        r"\bprevious\s+(?:song|track)",
-        r"\bskip\s+(?:song|track)"
-    ]
-    
-    for pattern in music_patterns:
-        if re.search(pattern, t):
-            matched_pattern = f"music: {pattern}"
-            if log_matches:
-                logger.info(f"Matched music pattern: {pattern} for input: '{original_text}'")
-            return {"type": "play_music", "raw": original_text, "matched_pattern": matched_pattern}
-    
-    # System commands - expanded patterns
-    shutdown_patterns = [
-        r"\b(?:shutdown|shut\s+down|power\s+off|turn\s+off)",
-        r"\b(?:restart|reboot)",
-        r"\b(?:sleep|suspend|hibernate)",
-        r"\b(?:lock|lock\s+screen)",
-        r"\b(?:quit|exit|close)\s+(?:application|program|system)"
-    ]
-    
-    for pattern in shutdown_patterns:
-        if re.search(pattern, t):
-            matched_pattern = f"system: {pattern}"
-            if log_matches:
-                logger.info(f"Matched system pattern: {pattern} for input: '{original_text}'")
-            return {"type": "shutdown", "raw": original_text, "matched_pattern": matched_pattern}
-    
-    # Volume control - new patterns
-    volume_patterns = [
-        r"\b(?:mute|unmute|silence)",
-        r"\bvolume\s+(?:up|down|increase|decrease)",
-        r"\b(?:turn\s+)?volume\s+(?:to\s+)?(\d+)",
-        r"\b(?:louder|quieter|softer)"
-    ]
-    
-    for pattern in volume_patterns:
-        if re.search(pattern, t):
-            matched_pattern = f"volume: {pattern}"
-            if log_matches:
-                logger.info(f"Matched volume pattern: {pattern} for input: '{original_text}'")
-            return {"type": "volume", "raw": original_text, "matched_pattern": matched_pattern}
-    
-    # Application control - new patterns
-    app_patterns = [
-        r"\b(?:open|launch|start|run)\s+(\w+)",
-        r"\b(?:close|quit|exit)\s+(\w+)"
-    ]
-    
-    for pattern in app_patterns:
-        m = re.search(pattern, t)
-        if m:
-            app_name = m.group(1)
-            matched_pattern = f"app: {pattern}"
-            if log_matches:
-                logger.info(f"Matched app pattern: {pattern} for input: '{original_text}', app: '{app_name}'")
-            return {"type": "app_control", "app": app_name, "raw": original_text, "matched_pattern": matched_pattern}
-    
-    # Help/assistant queries - new patterns
-    help_patterns = [
-        r"\b(?:help|what\s+can\s+you\s+do|capabilities)",
-        r"\bwho\s+are\s+you",
-        r"\bwhat\s+are\s+you"
-    ]
-    
-    for pattern in help_patterns:
-        if re.search(pattern, t):
-            matched_pattern = f"help: {pattern}"
+
+    # First matching rule wins
+    for rule in RULES:
+        m = rule.regex.search(t)
+        if metrics is not None:
+            metrics.pattern(rule.matched_pattern, m is not None)
+        if not m:
+            continue
+        result = {"type": rule.type}
+        if rule.capture:
+            value = m.group(1).strip()
+            result[rule.capture] = value
             if log_matches:
-                logger.info(f"Matched help pattern: {pattern} for input: '{original_text}'")
-            return {"type": "help", "raw": original_text, "matched_pattern": matched_pattern}
-    
+                logger.info("Matched %s pattern: %s for input: '%s', %s: '%s'",
+                            rule.category, rule.regex.pattern, original_text, rule.capture, value)
+        elif log_matches:
+            logger.info("Matched %s pattern: %s for input: '%s'",
+                        rule.category, rule.regex.pattern, original_text)
+        result["raw"] = original_text
+        result["matched_pattern"] = rule.matched_pattern
+        return result
+
     # Fallback: treat as search if it contains meaningful words
     if len(t.split()) > 0 and not t in ["search", "help", "time"]:
-        matched_pattern = "fallback: search"
+        if metrics is not None:
+            metrics.fallback("search")
         if log_matches:
-            logger.info(f"Fallback to search for input: '{original_text}'")
-        return {"type": "search", "query": t, "raw": original_text, "matched_pattern": matched_pattern}
-    
+            logger.info("Fallback to search for input: '%s'", original_text)
+        return {"type": "search", "query": t, "raw": original_text, "matched_pattern": "fallback: search"}
+
+    if metrics is not None:
+        metrics.fallback("unknown")
     if log_matches:
-        logger.info(f"No pattern matched for input: '{original_text}'")
+        logger.info("No pattern matched for input: '%s'", original_text)
     return {"type": "unknown", "raw": original_text, "matched_pattern": None}
 
 
@@ -1,24 +1,63 @@
 """NLP-enhanced command parser using sentence transformers for better intent classification."""
 from typing import Dict, Any, List, Tuple
+import os
 import re
+import sys
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
-# Fallback to basic parser if sentence-transformers not available
+# Ensure project root is on sys.path so shared modules (Sumant.*) import correctly
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Standard library only: the runtime check and the model's registry/cache name
+from Sumant.onnx_encoder import encoder_name, runtime_available
+
+# Fallback to basic parser if the encoder runtime (sentence-transformers, or
+# onnxruntime with $VOXMIND_EMBEDDING_RUNTIME=onnx) is not available
 try:
-    from sentence_transformers import SentenceTransformer
-    import numpy as np
-    NLP_AVAILABLE = True
+    from Sumant.intent_scoring import CentroidScorer
+    from Sumant.model_registry import acquire_model, release_model
+    from Sumant.embedding_cache import shared_embedding_cache
+    NLP_AVAILABLE = runtime_available()
 except ImportError:
     NLP_AVAILABLE = False
-    logger.warning("sentence-transformers not available, using basic pattern matching only")
+if not NLP_AVAILABLE:
+    logger.warning("sentence encoder not available, using basic pattern matching only")
+
+# numpy-only pieces: the store that caches example embeddings and logs
+# examples taught at runtime, and the model-free TF-IDF backend, used when
+# the transformer isn't loaded
+try:
+    from Sumant.embedding_store import EmbeddingStore, ExampleUpdate
+    STORE_AVAILABLE = True
+except ImportError:
+    STORE_AVAILABLE = False
+try:
+    from Sumant.tfidf_classifier import TfidfIntentClassifier, selected_nlp_backend
+    TFIDF_AVAILABLE = True
+except ImportError:
+    TFIDF_AVAILABLE = False
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+TFIDF_THRESHOLD = 0.2
 
 class NLPCommandParser:
     def __init__(self):
         self.model = None
         self.intent_embeddings = None
-        self.intent_examples = {
+        self.example_embeddings = None
+        # (intent, phrase) -> the float32 row added to the scorer's running sum
+        self.example_rows = {}
+        self.scorer = None
+        self.embedding_cache = None
+        # MODEL_NAME, tagged with the runtime serving it ($VOXMIND_EMBEDDING_RUNTIME);
+        # the same whether or not that runtime is installed, so it keys one store
+        self.model_name = encoder_name(MODEL_NAME)
+        self.base_examples = {
             "open_browser": [
                 "open browser", "launch chrome", "start firefox", "go online",
                 "open web browser", "start browsing", "launch web browser"
@@ -53,45 +92,128 @@ class NLPCommandParser:
             ]
         }
         
-        if NLP_AVAILABLE:
+        # Built-in examples key the embedding cache; examples taught with
+        # add_examples / remove_examples are kept by the store (see
+        # Sumant.embedding_store). Without numpy they only live in memory.
+        self.example_store = EmbeddingStore(namespace="tejas") if STORE_AVAILABLE else None
+        self._examples_lock = threading.Lock()
+        self.intent_examples = {intent: list(phrases) for intent, phrases in self.base_examples.items()}
+        if self.example_store is not None:
+            self.intent_examples = self.example_store.current_examples(self.model_name, self.base_examples)
+
+        self.nlp_backend = selected_nlp_backend() if TFIDF_AVAILABLE else "transformer"
+        self.tfidf = None
+        if TFIDF_AVAILABLE and self.nlp_backend != "transformer":
+            self.tfidf = TfidfIntentClassifier(self.intent_examples, threshold=TFIDF_THRESHOLD)
+        if NLP_AVAILABLE and self.nlp_backend != "tfidf":
             self._initialize_nlp()
     
     def _initialize_nlp(self):
         """Initialize the sentence transformer model and compute intent embeddings."""
         try:
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
-            
-            # Compute embeddings for all intent examples
-            self.intent_embeddings = {}
-            for intent, examples in self.intent_examples.items():
-                embeddings = self.model.encode(examples)
-                self.intent_embeddings[intent] = np.mean(embeddings, axis=0)
+            # One model instance per process, shared with other parsers
+            model = acquire_model(self.model_name)
+        except Exception as e:
+            logger.error(f"Failed to initialize NLP model: {e}")
+            return
+        
+        try:
+            # Embeddings for all intent examples, including ones taught in
+            # earlier runs (reused from disk; only ones taught without a model get encoded)
+            store = self.example_store or EmbeddingStore(namespace="tejas")
+            self.example_embeddings = store.get_or_build(self.model_name, self.base_examples, model.encode)
+            self.intent_examples = self.example_embeddings.example_lists()
+            self.intent_embeddings = self.example_embeddings.centroid_dict()
+            # Keeps per-intent running sums, so taught examples update the means in place
+            self.scorer = CentroidScorer.from_intent_embeddings(self.example_embeddings)
+            # Shared with the other NLP parsers; repeated phrases skip the model
+            self.embedding_cache = shared_embedding_cache()
+
+            for intent, phrases in self.intent_examples.items():
+                rows = self.example_embeddings.examples_of(intent)
+                self.example_rows.update(((intent, p), row) for p, row in zip(phrases, rows))
+            self.model = model
             
             logger.info("NLP model initialized successfully")
         except Exception as e:
             logger.error(f"Failed to initialize NLP model: {e}")
+            release_model(self.model_name)
+    
+    def close(self):
+        """Release this parser's reference to the shared model."""
+        if self.model is not None:
             self.model = None
+            release_model(self.model_name)
+    
+    def add_examples(self, intent: str, phrases: List[str]) -> int:
+        """
+        Teach `intent` new example phrases. Only these phrases are encoded;
+        the intent's centroid is updated from its running sum and the change
+        is logged so later runs start with it. Returns how many were new.
+        """
+        with self._examples_lock:
+            known = self.intent_examples.setdefault(intent, [])
+            new = [p for p in dict.fromkeys(p.strip() for p in phrases) if p and p not in known]
+            if not new:
+                return 0
+            known.extend(new)
+            embeddings = None
+            if self.model is not None:
+                embeddings = self.embedding_cache.encode(self.model, new, self.model_name)
+                self._add_rows(intent, new, embeddings)
+            self._log_update("add", intent, new, embeddings)
+        return len(new)
+
+    def remove_examples(self, intent: str, phrases: List[str]) -> int:
+        """Forget example phrases of `intent` (built-in or taught). Returns how many were known."""
+        with self._examples_lock:
+            known = self.intent_examples.get(intent, [])
+            gone = [p for p in dict.fromkeys(p.strip() for p in phrases) if p in known]
+            if not gone:
+                return 0
+            self.intent_examples[intent] = [p for p in known if p not in gone]
+            if self.model is not None:
+                self._remove_rows(intent, gone)
+            self._log_update("remove", intent, gone)
+        return len(gone)
+
+    def _add_rows(self, intent, phrases, embeddings):
+        self.scorer.add(intent, embeddings)
+        self.example_rows.update(((intent, p), row) for p, row in zip(phrases, embeddings))
+
+    def _remove_rows(self, intent, phrases):
+        # Subtract exactly the rows that were added: re-encoding would drift the sum
+        rows = [self.example_rows.pop((intent, p)) for p in phrases if (intent, p) in self.example_rows]
+        if rows:
+            self.scorer.remove(intent, rows)
+
+    def _log_update(self, op, intent, phrases, embeddings=None):
+        # The store and TF-IDF need numpy; without it both are None
+        if self.example_store is not None:
+            self.example_store.append_update(self.model_name, self.base_examples,
+                                             ExampleUpdate(op, intent, phrases, embeddings))
+        if self.tfidf is not None:
+            # IDF is corpus-wide, so TF-IDF is rebuilt (a few ms for these example sets)
+            self.tfidf = TfidfIntentClassifier(self.intent_examples, threshold=TFIDF_THRESHOLD)
+
+    def classify(self, text: str) -> Tuple[str, float, str]:
+        """(intent, confidence, method): the transformer if loaded, else TF-IDF."""
+        if self.model is not None:
+            return (*self._classify_with_nlp(text), "nlp")
+        if self.tfidf is not None:
+            result = self.tfidf.predict(text)
+            return result["type"], result["confidence"], "tfidf"
+        return "unknown", 0.0, "pattern"
     
     def _classify_with_nlp(self, text: str, threshold: float = 0.6) -> Tuple[str, float]:
         """Classify intent using sentence transformers."""
-        if not self.model or not self.intent_embeddings:
+        if not self.model or not self.scorer:
             return "unknown", 0.0
         
         try:
-            # Get embedding for input text
-            text_embedding = self.model.encode([text])[0]
-            
-            # Calculate similarities with all intents
-            similarities = {}
-            for intent, intent_embedding in self.intent_embeddings.items():
-                similarity = np.dot(text_embedding, intent_embedding) / (
-                    np.linalg.norm(text_embedding) * np.linalg.norm(intent_embedding)
-                )
-                similarities[intent] = similarity
-            
-            # Get best match
-            best_intent = max(similarities, key=similarities.get)
-            best_score = similarities[best_intent]
+            # Get embedding for input text and score it against all intents at once
+            text_embedding = self.embedding_cache.encode(self.model, [text], self.model_name)[0]
+            best_intent, best_score = self.scorer.best(text_embedding)
             
             if best_score >= threshold:
                 return best_intent, best_score
@@ -102,6 +224,32 @@ class NLPCommandParser:
             logger.error(f"NLP classification failed: {e}")
             return "unknown", 0.0
 
+    def _classify_batch(self, texts: List[str], threshold: float = 0.6) -> List[Tuple[str, float]]:
+        """_classify_with_nlp for many texts: one encode call, one matrix product."""
+        if not self.model or not self.scorer:
+            return [("unknown", 0.0)] * len(texts)
+        
+        try:
+            embeddings = self.embedding_cache.encode(self.model, texts, self.model_name)
+            return [(intent if score >= threshold else "unknown", score)
+                    for intent, score in self.scorer.best_batch(embeddings)]
+        except Exception as e:
+            logger.error(f"NLP classification failed: {e}")
+            return [("unknown", 0.0)] * len(texts)
+
+_default_parser = None
+_default_parser_lock = threading.Lock()
+
+
+def get_default_parser() -> NLPCommandParser:
+    """The NLPCommandParser shared by parse_command_nlp and get_nlp_status (built once)."""
+    global _default_parser
+    with _default_parser_lock:
+        if _default_parser is None:
+            _default_parser = NLPCommandParser()
+        return _default_parser
+
+
 def parse_command_nlp(text: str, use_nlp: bool = True, log_matches: bool = False) -> Dict[str, Any]:
     """Parse command using NLP enhancement when available, fallback to pattern matching."""
     from command_parser import parse_command as basic_parse
@@ -120,16 +268,16 @@ def parse_command_nlp(text: str, use_nlp: bool = True, log_matches: bool = False
             break
     
     # Try NLP classification first if available and enabled
-    if use_nlp and NLP_AVAILABLE:
-        parser = NLPCommandParser()
-        intent, confidence = parser._classify_with_nlp(t)
+    if use_nlp and (NLP_AVAILABLE or TFIDF_AVAILABLE):
+        parser = get_default_parser()
+        intent, confidence, method = parser.classify(t)
         
         if intent != "unknown":
             if log_matches:
-                logger.info(f"NLP classified '{original_text}' as '{intent}' with confidence {confidence:.3f}")
+                logger.info(f"NLP ({method}) classified '{original_text}' as '{intent}' with confidence {confidence:.3f}")
             
             # Extract parameters based on intent
-            result = {"type": intent, "raw": original_text, "confidence": confidence, "method": "nlp"}
+            result = {"type": intent, "raw": original_text, "confidence": confidence, "method": method}
             
             # Add specific parameter extraction
             if intent == "search":
@@ -165,5 +313,7 @@ def get_nlp_status() -> Dict[str, Any]:
     """Get status of NLP capabilities."""
     return {
         "nlp_available": NLP_AVAILABLE,
-        "model_loaded": NLP_AVAILABLE and hasattr(NLPCommandParser(), 'model') and NLPCommandParser().model is not None
+        "tfidf_available": TFIDF_AVAILABLE,
+        "encoder": get_default_parser().model_name,
+        "model_loaded": NLP_AVAILABLE and get_default_parser().model is not None
     }
\ No newline at end of file
@@ -0,0 +1,72 @@
+"""Test runtime example updates of the NLP parser (centroid running sums)."""
+import sys
+import os
+import zlib
+
+import numpy as np
+
+# Add the Tejas directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+import nlp_command_parser as ncp
+from Sumant.embedding_cache import shared_embedding_cache
+
+
+class _Encoder:
+    """Deterministic stand-in for the transformer; records encoded texts."""
+
+    def __init__(self):
+        self.texts = []
+
+    def encode(self, texts):
+        self.texts.extend(texts)
+        return np.stack([np.random.default_rng(zlib.crc32(t.encode())).standard_normal(16) for t in texts])
+
+
+def test_remove_examples_subtracts_stored_rows(monkeypatch, tmp_path):
+    """Removal reuses the rows that built the centroid: no forward pass, no drift."""
+    monkeypatch.setenv("VOXMIND_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("VOXMIND_NLP_BACKEND", "transformer")
+    monkeypatch.setattr(ncp, "NLP_AVAILABLE", True)
+    encoder = _Encoder()
+    monkeypatch.setattr(ncp, "acquire_model", lambda name: encoder)
+    monkeypatch.setattr(ncp, "release_model", lambda name: None)
+    shared_embedding_cache().clear()
+    try:
+        parser = ncp.NLPCommandParser()
+        assert parser.add_examples("volume", ["crank it up"]) == 1
+        encoder.texts.clear()
+        assert parser.remove_examples("volume", ["mute", "crank it up"]) == 2
+        assert encoder.texts == []
+
+        for _ in range(50):
+            parser.add_examples("volume", ["mute", "crank it up"])
+            assert parser.remove_examples("volume", ["mute", "crank it up"]) == 2
+
+        i = parser.scorer.labels.index("volume")
+        phrases = parser.intent_examples["volume"]
+        rows = np.stack([parser.example_rows[("volume", p)] for p in phrases])
+        assert int(parser.scorer.counts[i]) == len(phrases)
+        np.testing.assert_allclose(parser.scorer.sums[i], rows.sum(axis=0), atol=1e-5)
+    finally:
+        shared_embedding_cache().clear()
+
+
+def test_store_key_does_not_depend_on_the_runtime_being_installed(monkeypatch, tmp_path):
+    monkeypatch.setenv("VOXMIND_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("VOXMIND_EMBEDDING_RUNTIME", "onnx")
+    monkeypatch.setattr(ncp, "NLP_AVAILABLE", False)
+    parser = ncp.NLPCommandParser()
+    assert parser.model_name == ncp.encoder_name(ncp.MODEL_NAME) == "all-MiniLM-L6-v2@onnx"
+
+
+def test_examples_can_be_taught_without_numpy(monkeypatch, tmp_path):
+    monkeypatch.setenv("VOXMIND_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(ncp, "NLP_AVAILABLE", False)
+    monkeypatch.setattr(ncp, "STORE_AVAILABLE", False)
+    monkeypatch.setattr(ncp, "TFIDF_AVAILABLE", False)
+    for name in ("EmbeddingStore", "ExampleUpdate", "TfidfIntentClassifier"):
+        monkeypatch.delattr(ncp, name)
+    parser = ncp.NLPCommandParser()
+    assert parser.add_examples("volume", ["crank it up"]) == 1
+    assert parser.remove_examples("volume", ["crank it up"]) == 1
@@ -0,0 +1,45 @@
+"""Test script for command parser metrics (pattern hits, fallbacks, latency)."""
+import sys
+import os
+
+# Add the Tejas directory to path, and the project root for common.parse_metrics
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from command_parser import (
+    parse_command, enable_metrics, disable_metrics, reset_metrics, metrics_snapshot,
+)
+
+
+def test_parser_metrics():
+    """Pattern attempts/hits, fallbacks and latency are recorded while enabled."""
+    assert metrics_snapshot()["enabled"] is False
+
+    enable_metrics()
+    try:
+        parse_command("open browser")
+        parse_command("what time is it")
+        parse_command("banana bread")
+        snap = metrics_snapshot()
+
+        assert snap["calls"] == 3
+        browser = [k for k in snap["patterns"] if k.startswith("browser: ")]
+        assert snap["patterns"][browser[0]] == {"attempts": 3, "hits": 1}
+        assert sum(p["hits"] for p in snap["patterns"].values()) == 2
+        assert snap["fallbacks"] == {"search": 1}
+        assert set(snap["latency"]) == {"open_browser", "time", "search"}
+        hist = snap["latency"]["time"]["histogram"]
+        assert len(hist) == len(snap["latency_buckets_us"]) + 1 and sum(hist) == 1
+
+        reset_metrics()
+        assert metrics_snapshot()["calls"] == 0
+    finally:
+        disable_metrics()
+
+    parse_command("open browser")
+    assert metrics_snapshot()["calls"] == 0
+
+
+if __name__ == "__main__":
+    test_parser_metrics()
+    print("Parser metrics test passed.")
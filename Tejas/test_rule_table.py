@@ -0,0 +1,38 @@
+"""Test script for the precompiled command rule table."""
+import logging
+import sys
+import os
+
+# Add the Tejas directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from command_parser import parse_command, RULES, RULE_TABLE
+
+
+def test_rule_table():
+    """Rules are compiled once, in table order, and the first match wins."""
+    assert len(RULES) == len(RULE_TABLE)
+    assert [r.regex.pattern for r in RULES] == [p for _, _, p, _ in RULE_TABLE]
+
+    # "open chrome" matches both a browser rule and an app rule; browser comes first.
+    assert parse_command("open chrome")["type"] == "open_browser"
+    assert parse_command("hey vox open notepad") == {
+        "type": "app_control", "app": "notepad", "raw": "hey vox open notepad",
+        "matched_pattern": RULES[-5].matched_pattern,
+    }
+    result = parse_command("search for python programming")
+    assert result["query"] == "python programming"
+    assert result["matched_pattern"].startswith("search: ")
+    assert parse_command("banana bread")["matched_pattern"] == "fallback: search"
+    assert parse_command("")["type"] == "unknown"
+
+
+def test_log_matches(caplog):
+    with caplog.at_level(logging.INFO, logger="command_parser"):
+        parse_command("google weather", log_matches=True)
+    assert "Matched search pattern" in caplog.text and "query: 'weather'" in caplog.text
+
+
+if __name__ == "__main__":
+    test_rule_table()
+    print("Rule table test passed.")
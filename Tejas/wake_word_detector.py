@@ -1,7 +1,60 @@
 """Simple wake-word detector with microphone and keyboard fallback (moved to `Tejas`)."""
-from typing import Optional
+from typing import Any, Dict, Optional
+import os
+import sys
+import time
 import speech_recognition as sr
 
+# Ensure project root is on sys.path so shared modules (Priyapal.*) import correctly
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from Priyapal.wake_word_enhancement import WakeWordDetector
+
+
+# Detector built from the template directory, and that directory's mtime
+_audio_cache: Dict[str, Any] = {"mtime": None, "detector": None}
+
+
+def _audio_detector() -> Optional[WakeWordDetector]:
+    """Offline keyword spotter over the enrolled wake-phrase WAVs, or None if there are none.
+
+    Only a detector with templates is cached, and it is rebuilt when a
+    recording is added to or removed from the template directory.
+    """
+    try:
+        from Priyapal.keyword_spotter import default_template_dir
+        mtime = os.stat(default_template_dir()).st_mtime
+    except ImportError as e:
+        print(f"Offline wake word spotting unavailable: {e}")
+        return None
+    except OSError:
+        return None  # nothing enrolled yet
+    if _audio_cache["detector"] is not None and _audio_cache["mtime"] == mtime:
+        return _audio_cache["detector"]
+    try:
+        detector = WakeWordDetector()
+        if not detector.load_wake_templates():
+            return None
+    except (OSError, ValueError) as e:
+        print(f"Offline wake word spotting unavailable: {e}")
+        return None
+    _audio_cache.update(mtime=mtime, detector=detector)
+    return detector
+
+
+def _listen_offline(detector: WakeWordDetector, seconds: float) -> bool:
+    """Stream 16 kHz microphone audio into the spotter for up to `seconds`."""
+    # Each listen is a new stream: drop audio left over from the last one
+    detector.spotter.reset()
+    with sr.Microphone(sample_rate=16000) as source:
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            if detector.detect_in_audio_chunk(source.stream.read(source.CHUNK)):
+                return True
+    return False
+
 
 def listen_for_wake_word(wake_word: str = "hey vox",
                          timeout: float = 3.0,
@@ -9,8 +62,17 @@ def listen_for_wake_word(wake_word: str = "hey vox",
                          use_keyboard_fallback: bool = True) -> bool:
     """Listen briefly and return True if the wake_word is detected.
 
+    With enrolled wake-phrase recordings (see Priyapal/keyword_spotter.py)
+    the audio is matched offline and nothing is sent to recognize_google.
     Falls back to a keyboard prompt when microphone access fails.
     """
+    detector = _audio_detector()
+    if detector is not None:
+        try:
+            return _listen_offline(detector, timeout + phrase_time_limit)
+        except OSError as e:
+            return _keyboard_fallback(e, use_keyboard_fallback)
+
     recognizer = sr.Recognizer()
     recognizer.energy_threshold = 4000
     recognizer.dynamic_energy_threshold = True
@@ -23,11 +85,7 @@ def listen_for_wake_word(wake_word: str = "hey vox",
             except sr.WaitTimeoutError:
                 return False
     except OSError as e:
-        if use_keyboard_fallback:
-            print(f"Microphone error: {e}")
-            input("Press Enter to simulate wake word 'hey vox'...")
-            return True
-        return False
+        return _keyboard_fallback(e, use_keyboard_fallback)
 
     try:
         text = recognizer.recognize_google(audio).lower()
@@ -43,3 +101,11 @@ def listen_for_wake_word(wake_word: str = "hey vox",
         return False
 
     return False
+
+
+def _keyboard_fallback(error: OSError, use_keyboard_fallback: bool) -> bool:
+    if use_keyboard_fallback:
+        print(f"Microphone error: {error}")
+        input("Press Enter to simulate wake word 'hey vox'...")
+        return True
+    return False
@@ -0,0 +1,220 @@
+"""
+command_parser_benchmark.py
+
+Micro-benchmark for Priyapal.command_parser.parse_command.
+
+Builds a synthetic corpus of utterances (default 12k) from the intents the
+parser supports plus some noise, then times the current parser against the
+previous implementation that scanned every KEYWORD_INDEX entry with a
+substring test.
+
+Usage
+-----
+    python benchmarks/command_parser_benchmark.py
+    python benchmarks/command_parser_benchmark.py --size 50000 --repeat 5
+    python benchmarks/command_parser_benchmark.py --cache 256
+    python benchmarks/command_parser_benchmark.py --size 200000 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from Priyapal import command_parser
+from Priyapal.command_parser import KEYWORD_INDEX, PATTERNS, normalize_text, parse_command
+
+
+# -------------------- Corpus --------------------
+
+
+_TEMPLATES: List[str] = [
+    "open the browser",
+    "launch {browser}",
+    "start {browser}",
+    "search for {topic}",
+    "google {topic}",
+    "look up {topic}",
+    "find me {topic}",
+    "what time is it",
+    "what's the time",
+    "what is the date",
+    "today's date",
+    "shut down the computer",
+    "restart",
+    "lock screen",
+    "put the computer to sleep",
+    "mute the volume",
+    "unmute",
+    "volume up",
+    "volume down",
+    "set volume to {level} percent",
+    "open {app}",
+    "close {app}",
+    "quit {app}",
+    "open downloads folder",
+    "show file {file}",
+    "what can you do",
+    "who are you",
+    "go back",
+    "go home",
+    "show notifications",
+    "show recent apps",
+    "play",
+    "pause",
+    "next song",
+    "previous track",
+    "stop the music",
+    "scroll down",
+    "scroll up",
+    "scroll to the top",
+    "scroll to bottom",
+    "please update my calendar",
+    "truncate the log file",
+    "tell me a joke",
+    "how is the weather",
+]
+
+_FILLS: Dict[str, List[str]] = {
+    "browser": ["chrome", "firefox", "edge", "brave", "opera", "safari"],
+    "topic": ["quantum tunneling", "python tutorials", "nearest cafe",
+              "weather tomorrow", "machine learning", "cheap flights"],
+    "level": ["0", "20", "50", "75", "100"],
+    "app": ["vscode", "spotify", "notepad", "calculator", "terminal", "slack"],
+    "file": ["report.docx", "notes.txt", "budget.xlsx"],
+}
+
+_PREFIXES = ["", "", "", "jarvis ", "hey jarvis ", "ok jarvis "]
+_SUFFIXES = ["", "", "", " please", "."]
+
+
+def build_corpus(size: int = 12000, seed: int = 1234) -> List[str]:
+    """Return `size` pseudo-random utterances (deterministic for a seed)."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        text = rng.choice(_TEMPLATES)
+        for key, values in _FILLS.items():
+            slot = "{" + key + "}"
+            if slot in text:
+                text = text.replace(slot, rng.choice(values))
+        text = rng.choice(_PREFIXES) + text + rng.choice(_SUFFIXES)
+        if rng.random() < 0.3:
+            text = text.capitalize()
+        corpus.append(text)
+    return corpus
+
+
+# -------------------- Baseline implementation --------------------
+
+
+def legacy_parse_command(text: str) -> Dict[str, Any]:
+    """
+    parse_command as it was before the keyword automaton: every keyword is
+    tested with a substring scan on every call. Kept only for comparison.
+    """
+    text = normalize_text(text or "")
+    if not text:
+        return {"command": "unknown", "params": {}}
+
+    for wake in ("jarvis ", "hey jarvis ", "ok jarvis "):
+        if text.startswith(wake):
+            text = text[len(wake):].lstrip()
+            break
+
+    candidate_cmds = set()
+    for kw, cmds in KEYWORD_INDEX.items():
+        if kw in text:
+            candidate_cmds.update(cmds)
+
+    for pattern, cmd_id, params_fn in PATTERNS:
+        if candidate_cmds and cmd_id not in candidate_cmds:
+            continue
+        m = pattern.search(text)
+        if m:
+            try:
+                params = params_fn(m)
+            except Exception:
+                params = {}
+            return {"command": cmd_id, "params": params}
+
+    if any(kw in text for kw in ("open ", "launch ", "start ", "run ")) and "browser" in text:
+        return {"command": "open_browser", "params": {"browser": None}}
+    if "time" in text or "date" in text:
+        return {"command": "get_time", "params": {}}
+    return {"command": "search", "params": {"query": text}}
+
+
+# -------------------- Timing --------------------
+
+
+def time_parser(fn: Callable[[str], Any], corpus: List[str], repeat: int = 3) -> float:
+    """Return the best-of-`repeat` throughput of `fn` in utterances/second."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return len(corpus) / best if best > 0 else float("inf")
+
+
+def time_batch(corpus: List[str], workers: int, chunksize: int = 512) -> float:
+    """Return parse_commands throughput in utterances/second."""
+    stats = command_parser.BatchParseStats()
+    for _ in command_parser.parse_commands(corpus, workers=workers, chunksize=chunksize, stats=stats):
+        pass
+    return stats.utterances_per_second
+
+
+def run(size: int = 12000, repeat: int = 3, cache_size: int = 0, workers: int = 0) -> Dict[str, float]:
+    corpus = build_corpus(size)
+    before = time_parser(legacy_parse_command, corpus, repeat)
+    after = time_parser(parse_command, corpus, repeat)
+    res = {"utterances": float(len(corpus)), "before_ops": before, "after_ops": after}
+    if cache_size > 0:
+        command_parser.enable_cache(cache_size)
+        try:
+            res["cached_ops"] = time_parser(parse_command, corpus, repeat)
+            res["cache_hit_rate"] = command_parser.cache_info().hit_rate
+        finally:
+            command_parser.disable_cache()
+    if workers > 0:
+        res["batch_workers"] = float(workers)
+        res["batch_ops"] = time_batch(corpus, workers)
+    return res
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark command_parser.parse_command")
+    ap.add_argument("--size", type=int, default=12000, help="corpus size (>= 10000 recommended)")
+    ap.add_argument("--repeat", type=int, default=3, help="timed runs per parser (best is kept)")
+    ap.add_argument("--cache", type=int, default=0, metavar="N",
+                    help="also time parse_command with an N-entry result cache")
+    ap.add_argument("--workers", type=int, default=0, metavar="N",
+                    help="also time parse_commands with N worker processes")
+    args = ap.parse_args()
+
+    res = run(args.size, args.repeat, args.cache, args.workers)
+    print(f"corpus: {int(res['utterances'])} utterances ({command_parser.__file__})")
+    print(f"before: {res['before_ops']:>10.0f} utterances/s")
+    print(f"after:  {res['after_ops']:>10.0f} utterances/s")
+    print(f"speedup: {res['after_ops'] / res['before_ops']:.2f}x")
+    if "cached_ops" in res:
+        print(f"cached: {res['cached_ops']:>10.0f} utterances/s "
+              f"(hit rate {res['cache_hit_rate']:.1%})")
+    if "batch_ops" in res:
+        print(f"batch:  {res['batch_ops']:>10.0f} utterances/s "
+              f"(parse_commands, {int(res['batch_workers'])} workers)")
+
+
+if __name__ == "__main__":
+    main()
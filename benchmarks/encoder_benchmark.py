@@ -0,0 +1,217 @@
+"""
+encoder_benchmark.py
+
+PyTorch vs ONNX Runtime for the sentence encoder behind the NLP parsers
+(all-MiniLM-L6-v2).
+
+Variants:
+- torch       sentence-transformers on PyTorch (the reference)
+- onnx        ONNX Runtime, float32 graph
+- onnx_int8   ONNX Runtime, dynamically quantized int8 graph
+
+Each variant is loaded the way the parsers load it (model registry loader
+with the runtime-tagged name) in its own `python` process, so load time and
+resident memory are not skewed by another variant's imports. For each it
+reports:
+
+- load_s / warmup_s: model load (the ONNX one includes its warm-up call),
+- rss_mb: resident memory after loading and encoding the corpus,
+- single-utterance latency p50/p95 and batch throughput over the parser
+  benchmark corpus,
+- agreement with torch: mean / min cosine between the two embeddings of
+  each utterance, and how often both pick the same intent (nearest intent
+  centroid of AdvancedCommandParser's examples).
+
+Usage
+-----
+    python benchmarks/encoder_benchmark.py
+    python benchmarks/encoder_benchmark.py --threads 1 --variants torch,onnx_int8 --out enc.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# variant -> environment of its child process
+VARIANTS: Dict[str, Dict[str, str]] = {
+    "torch": {"VOXMIND_EMBEDDING_RUNTIME": "torch"},
+    "onnx": {"VOXMIND_EMBEDDING_RUNTIME": "onnx", "VOXMIND_ONNX_QUANTIZE": "0"},
+    "onnx_int8": {"VOXMIND_EMBEDDING_RUNTIME": "onnx", "VOXMIND_ONNX_QUANTIZE": "1"},
+}
+
+# Runs inside the child process: loads one variant, times it, saves the
+# corpus embeddings to {out}.npy and prints the measurements as JSON.
+_CHILD = """
+import json, logging, sys, time
+logging.disable(logging.CRITICAL)
+sys.path.insert(0, {root!r})
+import numpy as np
+from Sumant.advanced_command_parser import MODEL_NAME
+from Sumant.model_registry import _load_encoder
+from Sumant.onnx_encoder import encoder_name
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+texts = json.load(open({texts!r}))
+t0 = time.perf_counter()
+model = _load_encoder(encoder_name(MODEL_NAME))
+load_s = time.perf_counter() - t0
+model.encode(texts[:1])  # torch has no built-in warm-up; don't time its first call
+lat = []
+for t in texts:
+    s = time.perf_counter()
+    model.encode([t])
+    lat.append(time.perf_counter() - s)
+s = time.perf_counter()
+emb = np.asarray(model.encode(texts), dtype=np.float32)
+batch_s = time.perf_counter() - s
+np.save({out!r}, emb)
+lat.sort()
+print(json.dumps({{
+    "load_s": load_s,
+    "warmup_s": getattr(model, "warmup_s", None),
+    "rss_mb": rss_mb(),
+    "p50_ms": lat[len(lat) // 2] * 1e3,
+    "p95_ms": lat[min(len(lat) - 1, int(len(lat) * 0.95))] * 1e3,
+    "batch_per_sec": len(texts) / batch_s,
+}}))
+"""
+
+
+def corpus_texts(paraphrases: int = 1) -> List[str]:
+    from benchmarks.parser_benchmark import build_corpus
+
+    return [s.text for s in build_corpus(paraphrases=paraphrases)]
+
+
+def run_variant(name: str, texts_path: str, out_path: str, threads: Optional[int]) -> Dict[str, Any]:
+    env = dict(os.environ, **VARIANTS[name])
+    if threads:
+        env["VOXMIND_ONNX_THREADS"] = str(threads)
+        env["OMP_NUM_THREADS"] = str(threads)  # PyTorch's intra-op pool
+    code = _CHILD.format(root=ROOT, texts=texts_path, out=out_path)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                         check=True, cwd=ROOT, env=env)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def agreement(reference, candidate, intent_centroids) -> Dict[str, float]:
+    """Per-utterance cosine between two embedding sets, and top-1 intent agreement."""
+    import numpy as np
+
+    def unit(m):
+        return m / np.maximum(np.linalg.norm(m, axis=1, keepdims=True), 1e-12)
+
+    ref, cand = unit(reference), unit(candidate)
+    cosine = (ref * cand).sum(axis=1)
+    ref_c, cand_c = intent_centroids
+    same = (ref @ ref_c.T).argmax(axis=1) == (cand @ cand_c.T).argmax(axis=1)
+    return {"cosine_mean": float(cosine.mean()), "cosine_min": float(cosine.min()),
+            "intent_agreement": float(same.mean())}
+
+
+def _centroids(embeddings, texts: List[str], examples: Dict[str, List[str]]):
+    """Intent centroid matrix from the embeddings of the example phrases (at the end of texts)."""
+    import numpy as np
+
+    rows, i = [], len(texts) - sum(len(v) for v in examples.values())
+    for phrases in examples.values():
+        rows.append(embeddings[i:i + len(phrases)].mean(axis=0))
+        i += len(phrases)
+    return np.stack(rows)
+
+
+def run_benchmark(names: List[str], threads: Optional[int] = None, paraphrases: int = 1) -> Dict[str, Any]:
+    import numpy as np
+    from Sumant.advanced_command_parser import AdvancedCommandParser
+
+    examples = AdvancedCommandParser._get_intent_examples(None)
+    corpus = corpus_texts(paraphrases)
+    # Intent examples go last so their embeddings give each variant its own centroids
+    texts = corpus + [p for phrases in examples.values() for p in phrases]
+    report: Dict[str, Any] = {"threads": threads, "corpus_size": len(corpus), "variants": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        texts_path = os.path.join(tmp, "texts.json")
+        with open(texts_path, "w", encoding="utf-8") as f:
+            json.dump(texts, f)
+        embeddings = {}
+        for name in names:
+            out_path = os.path.join(tmp, f"{name}.npy")
+            try:
+                report["variants"][name] = run_variant(name, texts_path, out_path, threads)
+            except subprocess.CalledProcessError as e:
+                report["variants"][name] = {"error": (e.stderr or "").strip().splitlines()[-1:]}
+                continue
+            embeddings[name] = np.load(out_path)
+
+    if "torch" in embeddings:
+        ref = embeddings["torch"]
+        ref_c = _centroids(ref, texts, examples)
+        n = len(corpus)
+        for name, emb in embeddings.items():
+            if name != "torch":
+                report["variants"][name]["vs_torch"] = agreement(
+                    ref[:n], emb[:n], (ref_c, _centroids(emb, texts, examples)))
+    return report
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"corpus: {report['corpus_size']} utterances, threads: {report['threads'] or 'default'}")
+    header = (f"{'variant':<10} {'load s':>7} {'rss MB':>8} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'batch/s':>8} {'cos mean':>9} {'cos min':>8} {'intent':>7}")
+    print(header)
+    print("-" * len(header))
+    for name, r in report["variants"].items():
+        if "error" in r:
+            print(f"{name:<10} error: {r['error']}")
+            continue
+        vs = r.get("vs_torch", {})
+        agree = (f"{vs['cosine_mean']:>9.4f} {vs['cosine_min']:>8.4f} {vs['intent_agreement']:>7.3f}"
+                 if vs else f"{'-':>9} {'-':>8} {'-':>7}")
+        print(f"{name:<10} {r['load_s']:>7.2f} {r['rss_mb']:>8.0f} {r['p50_ms']:>8.2f} "
+              f"{r['p95_ms']:>8.2f} {r['batch_per_sec']:>8.0f} {agree}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="PyTorch vs ONNX Runtime sentence-encoder benchmark")
+    ap.add_argument("--variants", default=",".join(VARIANTS),
+                    help="comma-separated subset of: " + ", ".join(VARIANTS))
+    ap.add_argument("--threads", type=int, default=None, help="intra-op threads for every variant")
+    ap.add_argument("--paraphrases", type=int, default=1, help="synthetic rewrites per seed phrase")
+    ap.add_argument("--out", help="write results JSON here")
+    args = ap.parse_args(argv)
+
+    names = [n.strip() for n in args.variants.split(",") if n.strip()]
+    unknown = [n for n in names if n not in VARIANTS]
+    if unknown:
+        ap.error(f"unknown variant(s): {', '.join(unknown)}")
+
+    report = run_benchmark(names, args.threads, args.paraphrases)
+    _print_report(report)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
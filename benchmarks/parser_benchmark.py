@@ -0,0 +1,446 @@
+"""
+parser_benchmark.py
+
+Repeatable latency / throughput / accuracy benchmark for every command
+parser in the repo:
+
+- priyapal      Priyapal.command_parser.parse_command
+- tejas         Tejas.command_parser.parse_command
+- tejas_nlp     Tejas.nlp_command_parser.parse_command_nlp
+- sumant        Sumant.advanced_command_parser.AdvancedCommandParser.parse
+
+The parsers use different intent names, so each one gets a mapping onto a
+small canonical label set (the keys of Tejas' get_supported_commands()).
+The labeled corpus is built from:
+
+- Tejas.command_parser.get_supported_commands()
+- Tejas/VoxMIndCpp/training_data.txt (intents with a canonical equivalent)
+- deterministic synthetic paraphrases of both ("please ...", "hey jarvis ...")
+
+For each parser it reports p50/p95/p99 latency, ops/sec, accuracy and,
+per call, tracemalloc's view of its allocations: the peak bytes allocated
+while it runs and the number of memory blocks it allocated that are still
+live when it returns. It writes the results as JSON and, given a baseline
+file, flags regressions.
+
+Usage
+-----
+    python benchmarks/parser_benchmark.py --out bench.json
+    python benchmarks/parser_benchmark.py --save-baseline benchmarks/parser_baseline.json
+    python benchmarks/parser_benchmark.py --baseline benchmarks/parser_baseline.json
+
+Exit status is 1 when a regression against the baseline is found.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+TRAINING_DATA = os.path.join(ROOT, "Tejas", "VoxMIndCpp", "training_data.txt")
+
+# Canonical label set shared by all parsers (Tejas' supported command types).
+CANONICAL_LABELS = (
+    "open_browser", "time", "search", "play_music",
+    "shutdown", "volume", "app_control", "help",
+)
+
+# training_data.txt intent -> canonical label. Intents not listed here
+# (mouse, keyboard, window management) have no counterpart in the Python
+# parsers and are left out of the corpus.
+TRAINING_LABELS = {
+    "browser_open": "open_browser",
+    "search_web": "search",
+    "time_check": "time",
+    "date_check": "time",
+    "shutdown_system": "shutdown",
+    "volume_up": "volume",
+    "volume_down": "volume",
+    "volume_mute": "volume",
+    "notepad_open": "app_control",
+    "calculator_open": "app_control",
+}
+
+PRIYAPAL_LABELS = {
+    "open_browser": "open_browser",
+    "search": "search",
+    "get_time": "time",
+    "system_power": "shutdown",
+    "control_volume": "volume",
+    "control_app": "app_control",
+    "open_path": "app_control",
+    "assistant_help": "help",
+    "media_control": "play_music",
+}
+
+SUMANT_LABELS = {
+    "browser": "open_browser",
+    "search": "search",
+    "system": "shutdown",
+    "volume": "volume",
+    "media": "play_music",
+    "app_control": "app_control",
+    "utility": "time",
+}
+
+_PARAPHRASE_PREFIXES = ("please ", "can you ", "hey jarvis ", "could you ")
+_PARAPHRASE_SUFFIXES = ("", " please", " now")
+
+
+# -------------------- Corpus --------------------
+
+
+@dataclass
+class Sample:
+    text: str
+    label: str
+    source: str
+
+
+def load_training_data(path: str = TRAINING_DATA) -> List[Sample]:
+    """Labeled phrases from the C++ classifier's training file."""
+    samples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            intent, sep, phrase = line.partition(":")
+            label = TRAINING_LABELS.get(intent.strip())
+            phrase = phrase.strip()
+            if sep and label and phrase:
+                samples.append(Sample(phrase, label, "training_data"))
+    return samples
+
+
+def build_corpus(seed: int = 42, paraphrases: int = 1) -> List[Sample]:
+    """
+    Labeled corpus: supported-command examples, training data and
+    `paraphrases` synthetic rewrites of each. Deterministic for a seed.
+    """
+    from Tejas.command_parser import get_supported_commands
+
+    base = [
+        Sample(text, label, "supported_commands")
+        for label, examples in get_supported_commands().items()
+        for text in examples
+    ]
+    base += load_training_data()
+
+    rng = random.Random(seed)
+    synthetic = []
+    for sample in base:
+        for _ in range(paraphrases):
+            text = rng.choice(_PARAPHRASE_PREFIXES) + sample.text + rng.choice(_PARAPHRASE_SUFFIXES)
+            synthetic.append(Sample(text, sample.label, "paraphrase"))
+    return base + synthetic
+
+
+def corpus_digest(corpus: List[Sample]) -> str:
+    h = hashlib.sha256()
+    for s in corpus:
+        h.update(f"{s.label}\t{s.text}\n".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+# -------------------- Parser adapters --------------------
+
+
+# Each adapter returns a callable text -> canonical label (or the parser's
+# own label when it has no canonical equivalent, which counts as a miss).
+ParserFn = Callable[[str], str]
+
+
+def _priyapal() -> ParserFn:
+    from Priyapal.command_parser import parse_command
+
+    def run(text: str) -> str:
+        cmd = parse_command(text)["command"]
+        return PRIYAPAL_LABELS.get(cmd, cmd)
+    return run
+
+
+def _tejas() -> ParserFn:
+    from Tejas.command_parser import parse_command
+
+    def run(text: str) -> str:
+        return parse_command(text)["type"]
+    return run
+
+
+def _tejas_nlp() -> ParserFn:
+    # parse_command_nlp imports its fallback as top-level `command_parser`.
+    tejas_dir = os.path.join(ROOT, "Tejas")
+    if tejas_dir not in sys.path:
+        sys.path.insert(0, tejas_dir)
+    from Tejas.nlp_command_parser import parse_command_nlp
+
+    def run(text: str) -> str:
+        return parse_command_nlp(text)["type"]
+    return run
+
+
+def _sumant() -> ParserFn:
+    from Sumant.advanced_command_parser import AdvancedCommandParser
+
+    parser = AdvancedCommandParser()
+
+    def run(text: str) -> str:
+        # Fresh context per utterance so results don't depend on order.
+        parser.context = {"last_intent": None, "last_entities": {}}
+        results = parser.parse(text)
+        kind = results[0]["type"] if results else "unknown"
+        return SUMANT_LABELS.get(kind, kind)
+    return run
+
+
+PARSERS: Dict[str, Callable[[], ParserFn]] = {
+    "priyapal": _priyapal,
+    "tejas": _tejas,
+    "tejas_nlp": _tejas_nlp,
+    "sumant": _sumant,
+}
+
+
+# -------------------- Measurement --------------------
+
+
+@dataclass
+class ParserResult:
+    samples: int
+    accuracy: float
+    ops_per_sec: float
+    p50_us: float
+    p95_us: float
+    p99_us: float
+    alloc_peak_bytes: float
+    alloc_blocks: float
+    setup_ms: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def measure(fn: ParserFn, corpus: List[Sample], repeat: int = 5, budget: Optional[float] = None) -> Tuple[
+        List[float], List[str]]:
+    """
+    Time `fn` on every sample `repeat` times (after one warm-up pass) and
+    keep the fastest run per sample. Returns (latencies_seconds, labels).
+    Stops early, on a whole pass boundary, once `budget` seconds are spent.
+    """
+    labels = [fn(s.text) for s in corpus]
+    best = [float("inf")] * len(corpus)
+    clock = time.perf_counter
+    started = clock()
+    for _ in range(repeat):
+        for i, s in enumerate(corpus):
+            t0 = clock()
+            fn(s.text)
+            dt = clock() - t0
+            if dt < best[i]:
+                best[i] = dt
+        if budget is not None and clock() - started > budget:
+            break
+    return best, labels
+
+
+def measure_alloc(fn: ParserFn, corpus: List[Sample]) -> Tuple[float, float]:
+    """
+    Means over single calls of (peak bytes allocated while the call runs,
+    blocks allocated by the call and still live when it returns). Blocks
+    are counted from tracemalloc snapshots (Statistic.count), so
+    temporaries freed before the call returns are not among them.
+    """
+    # The snapshots' own objects are allocated in tracemalloc.py
+    own = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    peaks, blocks = [], []
+    tracemalloc.start()
+    try:
+        for s in corpus:
+            before = tracemalloc.take_snapshot().filter_traces(own)
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            fn(s.text)
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot().filter_traces(own)
+            peaks.append(peak - base)
+            blocks.append(sum(stat.count_diff for stat in after.compare_to(before, "filename")))
+    finally:
+        tracemalloc.stop()
+    if not peaks:
+        return 0.0, 0.0
+    return statistics.fmean(peaks), statistics.fmean(blocks)
+
+
+def bench_parser(name: str, corpus: List[Sample], repeat: int = 5, budget: Optional[float] = None) -> ParserResult:
+    t0 = time.perf_counter()
+    fn = PARSERS[name]()
+    setup = time.perf_counter() - t0
+
+    latencies, labels = measure(fn, corpus, repeat, budget)
+    correct = sum(1 for s, got in zip(corpus, labels) if got == s.label)
+    ordered = sorted(latencies)
+    total = sum(latencies)
+    alloc_peak_bytes, alloc_blocks = measure_alloc(fn, corpus)
+    return ParserResult(
+        samples=len(corpus),
+        accuracy=correct / len(corpus) if corpus else 0.0,
+        ops_per_sec=len(corpus) / total if total > 0 else 0.0,
+        p50_us=_percentile(ordered, 50) * 1e6,
+        p95_us=_percentile(ordered, 95) * 1e6,
+        p99_us=_percentile(ordered, 99) * 1e6,
+        alloc_peak_bytes=alloc_peak_bytes,
+        alloc_blocks=alloc_blocks,
+        setup_ms=setup * 1e3,
+    )
+
+
+def run_benchmark(names: List[str], repeat: int = 5, budget: Optional[float] = None,
+                  paraphrases: int = 1) -> Dict[str, Any]:
+    corpus = build_corpus(paraphrases=paraphrases)
+    report: Dict[str, Any] = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "corpus_size": len(corpus),
+            "corpus_digest": corpus_digest(corpus),
+            "repeat": repeat,
+        },
+        "parsers": {},
+    }
+    for name in names:
+        try:
+            report["parsers"][name] = bench_parser(name, corpus, repeat, budget).to_dict()
+        except Exception as e:  # a parser with missing deps shouldn't sink the run
+            report["parsers"][name] = {"error": f"{type(e).__name__}: {e}"}
+    return report
+
+
+# -------------------- Baseline comparison --------------------
+
+
+# metric -> (direction, kind): "lower"/"higher" is better; "rel" compares
+# by ratio against the tolerance, "abs" by absolute difference.
+# alloc_blocks is only reported: a few blocks per call is too small for a ratio.
+REGRESSION_METRICS = {
+    "p50_us": ("lower", "rel"),
+    "p95_us": ("lower", "rel"),
+    "p99_us": ("lower", "rel"),
+    "ops_per_sec": ("higher", "rel"),
+    "alloc_peak_bytes": ("lower", "rel"),
+    "accuracy": ("higher", "abs"),
+}
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25,
+            accuracy_tolerance: float = 0.01) -> List[str]:
+    """
+    Return a human-readable line per regression: a latency/alloc metric
+    more than `tolerance` (relative) worse than the baseline, or accuracy
+    more than `accuracy_tolerance` (absolute) lower.
+    """
+    problems = []
+    if report["meta"].get("corpus_digest") != baseline.get("meta", {}).get("corpus_digest"):
+        problems.append("corpus differs from baseline; accuracy numbers are not comparable")
+
+    for name, cur in report["parsers"].items():
+        old = baseline.get("parsers", {}).get(name)
+        if not old or "error" in old or "error" in cur:
+            continue
+        for metric, (better, kind) in REGRESSION_METRICS.items():
+            a, b = old.get(metric), cur.get(metric)
+            if a is None or b is None:
+                continue
+            if kind == "abs":
+                worse = (a - b) if better == "higher" else (b - a)
+                if worse > accuracy_tolerance:
+                    problems.append(f"{name}.{metric}: {a:.4f} -> {b:.4f}")
+            elif a > 0:
+                ratio = (a / b if b else float("inf")) if better == "higher" else b / a
+                if ratio > 1.0 + tolerance:
+                    problems.append(f"{name}.{metric}: {a:.1f} -> {b:.1f} ({ratio:.2f}x worse)")
+    return problems
+
+
+# -------------------- CLI --------------------
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    meta = report["meta"]
+    print(f"corpus: {meta['corpus_size']} samples (digest {meta['corpus_digest']}), "
+          f"python {meta['python']}")
+    header = f"{'parser':<10} {'acc':>6} {'ops/s':>10} {'p50us':>9} {'p95us':>9} {'p99us':>9} {'allocB':>9} {'blocks':>7}"
+    print(header)
+    print("-" * len(header))
+    for name, r in report["parsers"].items():
+        if "error" in r:
+            print(f"{name:<10} error: {r['error']}")
+            continue
+        print(f"{name:<10} {r['accuracy']:>6.3f} {r['ops_per_sec']:>10.0f} {r['p50_us']:>9.1f} "
+              f"{r['p95_us']:>9.1f} {r['p99_us']:>9.1f} {r['alloc_peak_bytes']:>9.0f} {r.get('alloc_blocks', 0.0):>7.1f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark VoxMind command parsers")
+    ap.add_argument("--parsers", default=",".join(PARSERS),
+                    help="comma-separated subset of: " + ", ".join(PARSERS))
+    ap.add_argument("--repeat", type=int, default=5, help="timed passes over the corpus")
+    ap.add_argument("--budget", type=float, default=None,
+                    help="stop timing a parser after this many seconds (whole passes)")
+    ap.add_argument("--paraphrases", type=int, default=1, help="synthetic rewrites per seed phrase")
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--save-baseline", metavar="PATH", help="write results JSON as the new baseline")
+    ap.add_argument("--baseline", metavar="PATH", help="compare against this baseline JSON")
+    ap.add_argument("--tolerance", type=float, default=0.25,
+                    help="allowed relative slowdown before a metric counts as regressed")
+    args = ap.parse_args(argv)
+
+    names = [n.strip() for n in args.parsers.split(",") if n.strip()]
+    unknown = [n for n in names if n not in PARSERS]
+    if unknown:
+        ap.error(f"unknown parser(s): {', '.join(unknown)}")
+
+    report = run_benchmark(names, args.repeat, args.budget, args.paraphrases)
+    _print_report(report)
+
+    for path in (args.out, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        problems = compare(report, baseline, args.tolerance)
+        if problems:
+            print("\nRegressions vs baseline:")
+            for line in problems:
+                print("  " + line)
+            return 1
+        print("\nNo regressions vs baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
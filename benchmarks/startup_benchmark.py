@@ -0,0 +1,134 @@
+"""
+startup_benchmark.py
+
+Cold-start benchmark for the command parsers: how long a fresh interpreter
+takes to import each parser module and to answer its first command.
+
+Every run happens in a new `python` process, so nothing is shared between
+runs (no warm module cache, no already-loaded model). The median of
+`--runs` processes is reported, next to a bare-interpreter baseline.
+
+Usage
+-----
+    python benchmarks/startup_benchmark.py
+    python benchmarks/startup_benchmark.py --runs 20 --out startup.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (import statement, first-parse statement)
+TARGETS: Dict[str, tuple] = {
+    "priyapal": (
+        "from Priyapal.command_parser import parse_command",
+        "parse_command('what time is it')",
+    ),
+    "tejas": (
+        "from Tejas.command_parser import parse_command",
+        "parse_command('what time is it')",
+    ),
+    "tejas_nlp": (
+        "from Tejas.nlp_command_parser import parse_command_nlp",
+        "parse_command_nlp('what time is it')",
+    ),
+    "sumant": (
+        "from Sumant.advanced_command_parser import AdvancedCommandParser",
+        "AdvancedCommandParser().parse('what time is it')",
+    ),
+}
+
+# Runs inside the child process; prints {"import_ms": .., "first_parse_ms": ..}.
+_CHILD = """
+import json, sys, time, logging
+logging.disable(logging.CRITICAL)
+sys.path[:0] = [{root!r}, {tejas!r}]
+t0 = time.perf_counter()
+{imp}
+t1 = time.perf_counter()
+{first}
+t2 = time.perf_counter()
+print(json.dumps({{"import_ms": (t1 - t0) * 1e3, "first_parse_ms": (t2 - t1) * 1e3}}))
+"""
+
+
+def run_once(name: str) -> Dict[str, float]:
+    imp, first = TARGETS[name]
+    code = _CHILD.format(root=ROOT, tejas=os.path.join(ROOT, "Tejas"), imp=imp, first=first)
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True, text=True, check=True, cwd=ROOT,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def interpreter_ms() -> float:
+    """Wall time of a bare `python -c pass`, for reference."""
+    import time
+
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return (time.perf_counter() - t0) * 1e3
+
+
+def run_benchmark(names: List[str], runs: int = 10) -> Dict[str, Any]:
+    report: Dict[str, Any] = {
+        "runs": runs,
+        # Without cached .pyc files every import also compiles source.
+        "bytecode_cache": not (sys.flags.dont_write_bytecode or os.environ.get("PYTHONDONTWRITEBYTECODE")),
+        "interpreter_ms": statistics.median(interpreter_ms() for _ in range(runs)),
+        "targets": {},
+    }
+    for name in names:
+        try:
+            samples = [run_once(name) for _ in range(runs)]
+        except subprocess.CalledProcessError as e:
+            report["targets"][name] = {"error": (e.stderr or "").strip().splitlines()[-1:]}
+            continue
+        report["targets"][name] = {
+            "import_ms": statistics.median(s["import_ms"] for s in samples),
+            "first_parse_ms": statistics.median(s["first_parse_ms"] for s in samples),
+            "import_ms_max": max(s["import_ms"] for s in samples),
+        }
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Cold-start benchmark for VoxMind parsers")
+    ap.add_argument("--targets", default=",".join(TARGETS),
+                    help="comma-separated subset of: " + ", ".join(TARGETS))
+    ap.add_argument("--runs", type=int, default=10, help="fresh processes per target")
+    ap.add_argument("--out", help="write results JSON here")
+    args = ap.parse_args(argv)
+
+    names = [n.strip() for n in args.targets.split(",") if n.strip()]
+    unknown = [n for n in names if n not in TARGETS]
+    if unknown:
+        ap.error(f"unknown target(s): {', '.join(unknown)}")
+
+    report = run_benchmark(names, args.runs)
+    print(f"bare interpreter: {report['interpreter_ms']:.1f} ms (median of {args.runs}), "
+          f"bytecode cache {'on' if report['bytecode_cache'] else 'OFF'}")
+    print(f"{'target':<10} {'import ms':>10} {'max ms':>8} {'1st parse ms':>13}")
+    for name, r in report["targets"].items():
+        if "error" in r:
+            print(f"{name:<10} error: {r['error']}")
+            continue
+        print(f"{name:<10} {r['import_ms']:>10.1f} {r['import_ms_max']:>8.1f} {r['first_parse_ms']:>13.2f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
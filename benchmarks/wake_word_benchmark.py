@@ -0,0 +1,194 @@
+"""
+wake_word_benchmark.py
+
+Micro-benchmark for the fuzzy path of Priyapal's WakeWordDetector (sensitivity >= 0.8).
+
+Times the phonetic index plus bit-parallel edit-distance matcher against
+the previous SequenceMatcher sliding window. The old version built a new SequenceMatcher
+at every offset of the transcript, for every phrase. Transcripts are
+synthetic: filler words, some near-miss wake phrases ("hey box", "okay
+fox"), and some true ones. Results are per transcript length, since the
+old matcher's cost grows with it. The report also gives how often both
+implementations agree.
+
+--phrase-counts times one call as the number of configured wake phrases
+grows (custom wake words: a greeting plus a made-up name), through the
+PhraseTrie and through the per-phrase loops.
+
+Usage
+-----
+    python benchmarks/wake_word_benchmark.py
+    python benchmarks/wake_word_benchmark.py --lengths 40,400,4000 --count 500
+    python benchmarks/wake_word_benchmark.py --phrase-counts 4,100,1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from difflib import SequenceMatcher
+from typing import Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from Priyapal import wake_word_enhancement
+from Priyapal.wake_word_enhancement import PhoneticIndex, WakeConfig, WakeWordDetector
+
+
+_FILLER: List[str] = [
+    "open", "chrome", "what", "is", "the", "time", "box", "fox", "folks", "on",
+    "table", "please", "play", "some", "music", "check", "email", "hey", "okay", "vocs",
+]
+
+_WAKE_VARIANTS: List[str] = [
+    "hey vox", "hey box", "hay vox", "ok vox", "okay fox", "hey voxmind", "hey vox mind", "vox",
+]
+
+
+def build_corpus(length: int, count: int, seed: int = 1234) -> List[str]:
+    """`count` transcripts of about `length` characters; half contain a wake variant."""
+    rng = random.Random(seed + length)
+    corpus = []
+    for _ in range(count):
+        words: List[str] = []
+        while sum(len(w) + 1 for w in words) < length:
+            words.append(rng.choice(_FILLER))
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(_WAKE_VARIANTS))
+        corpus.append(" ".join(words))
+    return corpus
+
+
+# -------------------- Baseline implementation --------------------
+
+
+class LegacyWakeWordDetector(WakeWordDetector):
+    """WakeWordDetector with the SequenceMatcher fuzzy matching it used to have."""
+
+    def _build_phonetic_indexes(self) -> None:
+        self._phonetic = {True: PhoneticIndex(), False: PhoneticIndex()}
+
+    def _fuzzy_contains(self, text: str, phrase: str, threshold: float) -> bool:
+        if phrase in text:
+            return True
+        n = len(phrase)
+        for i in range(max(1, len(text) - n + 1)):
+            window = text[i:i + n + 2]
+            if SequenceMatcher(None, window, phrase).ratio() >= threshold:
+                return True
+        return False
+
+    def _fuzzy_prefix_end(self, text: str, phrase: str, threshold: float):
+        n = len(phrase)
+        ratio = SequenceMatcher(None, text[: n + 2], phrase).ratio()
+        return n if ratio >= threshold else None
+
+
+# -------------------- Timing --------------------
+
+
+def make_detector(cls=WakeWordDetector) -> WakeWordDetector:
+    return cls(WakeConfig(
+        primary_phrases=["hey vox", "ok vox", "hey voxmind"],
+        secondary_phrases=["vox"],
+        sensitivity=0.9,
+        debounce_seconds=0.0,
+    ))
+
+
+def time_detector(fn: Callable[[str], object], corpus: List[str], repeat: int = 3) -> float:
+    """Best-of-`repeat` throughput of `fn` in transcripts/second."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            fn(text)
+        best = min(best, time.perf_counter() - start)
+    return len(corpus) / best if best > 0 else float("inf")
+
+
+def run(lengths: List[int], count: int = 300, repeat: int = 3) -> Dict[int, Dict[str, float]]:
+    new, old = make_detector(), make_detector(LegacyWakeWordDetector)
+    results = {}
+    for length in lengths:
+        corpus = build_corpus(length, count)
+        res: Dict[str, float] = {}
+        for name, detector in (("before", old), ("after", new)):
+            res[f"{name}_text_ops"] = time_detector(detector.detect_in_text, corpus, repeat)
+            res[f"{name}_strip_ops"] = time_detector(detector.detect_and_strip_wake, corpus, repeat)
+        res["agreement"] = sum(old.detect_in_text(t) == new.detect_in_text(t) for t in corpus) / len(corpus)
+        results[length] = res
+    return results
+
+
+def custom_phrases(count: int, seed: int = 99) -> List[str]:
+    """The default wake phrases plus made-up custom ones, `count` in all."""
+    rng = random.Random(seed)
+    phrases = ["hey vox", "ok vox", "hey voxmind", "hey there vox"]
+    seen = set(phrases)
+    while len(phrases) < count:
+        name = "".join(rng.choice("bcdfghjklmnprstvz") + rng.choice("aeiou") for _ in range(rng.randint(1, 3)))
+        phrase = f"{rng.choice(['hey', 'ok', 'hello', 'hi', 'okay', 'good morning'])} {name}"
+        if phrase not in seen:
+            seen.add(phrase)
+            phrases.append(phrase)
+    return phrases[:count]
+
+
+def run_scaling(counts: List[int], corpus_size: int = 200, repeat: int = 3) -> Dict[int, Dict[str, float]]:
+    """Microseconds per call, with the trie and with per-phrase loops, per phrase count."""
+    corpus = build_corpus(40, corpus_size)
+    default_min = wake_word_enhancement.TRIE_MIN_PHRASES
+    results = {}
+    try:
+        for count in counts:
+            detector = WakeWordDetector(WakeConfig(
+                primary_phrases=custom_phrases(count), secondary_phrases=["vox"],
+                sensitivity=0.9, debounce_seconds=0.0,
+            ))
+            res: Dict[str, float] = {}
+            for name, minimum in (("trie", 0), ("loop", 1 << 30)):
+                wake_word_enhancement.TRIE_MIN_PHRASES = minimum
+                res[f"{name}_strip_us"] = 1e6 / time_detector(detector.detect_and_strip_wake, corpus, repeat)
+                res[f"{name}_text_us"] = 1e6 / time_detector(detector.detect_in_text, corpus, repeat)
+            results[count] = res
+    finally:
+        wake_word_enhancement.TRIE_MIN_PHRASES = default_min
+    return results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark WakeWordDetector fuzzy matching")
+    ap.add_argument("--lengths", default="40,200,1000,5000",
+                    help="comma-separated transcript lengths in characters")
+    ap.add_argument("--count", type=int, default=300, help="transcripts per length")
+    ap.add_argument("--repeat", type=int, default=3, help="timed runs per detector (best is kept)")
+    ap.add_argument("--phrase-counts", default="",
+                    help="comma-separated wake phrase counts: time the trie against per-phrase loops")
+    args = ap.parse_args()
+
+    if args.phrase_counts:
+        counts = [int(x) for x in args.phrase_counts.split(",") if x.strip()]
+        print(f"{'phrases':>7} {'strip trie us':>14} {'strip loop us':>14} {'text trie us':>13} {'text loop us':>13}")
+        for count, r in run_scaling(counts, repeat=args.repeat).items():
+            print(f"{count:>7} {r['trie_strip_us']:>14.1f} {r['loop_strip_us']:>14.1f} "
+                  f"{r['trie_text_us']:>13.1f} {r['loop_text_us']:>13.1f}")
+        return
+
+    lengths = [int(x) for x in args.lengths.split(",") if x.strip()]
+    results = run(lengths, args.count, args.repeat)
+    print(f"{'chars':>6} {'before/s':>10} {'after/s':>10} {'speedup':>8} "
+          f"{'strip before/s':>15} {'strip after/s':>14} {'agree':>6}")
+    for length, r in results.items():
+        print(f"{length:>6} {r['before_text_ops']:>10.0f} {r['after_text_ops']:>10.0f} "
+              f"{r['after_text_ops'] / r['before_text_ops']:>7.1f}x "
+              f"{r['before_strip_ops']:>15.0f} {r['after_strip_ops']:>14.0f} {r['agreement']:>6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+parse_metrics.py
+
+Counters behind the enable_metrics() / metrics_snapshot() surface of the
+rule-based command parsers (Priyapal.command_parser and
+Tejas.command_parser). Each parser keeps its own ParseMetrics instance,
+or None while metrics are disabled, and decides how patterns are keyed.
+
+Lives outside both parsers' directories so neither depends on the other.
+The parsers import it when metrics are first used, as common.parse_metrics
+(the project root on sys.path, as main.py sets it up).
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+# Upper bounds, in microseconds, of the latency histogram buckets. A last,
+# open-ended bucket counts everything slower.
+LATENCY_BUCKETS_US: Tuple[int, ...] = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class ParseMetrics:
+    """
+    Thread-safe parse counters:
+    - per pattern key: how often it was tried and matched,
+    - per result type: how often a fallback produced it (no pattern matched),
+    - per result type: a latency histogram over LATENCY_BUCKETS_US.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.attempts: Dict[str, int] = {}
+        self.hits: Dict[str, int] = {}
+        self.fallbacks: Dict[str, int] = {}
+        self.latency: Dict[str, List[int]] = {}
+        self.latency_total_us: Dict[str, float] = {}
+
+    def pattern(self, key: str, hit: bool) -> None:
+        with self._lock:
+            self.attempts[key] = self.attempts.get(key, 0) + 1
+            if hit:
+                self.hits[key] = self.hits.get(key, 0) + 1
+
+    def fallback(self, result_type: str) -> None:
+        with self._lock:
+            self.fallbacks[result_type] = self.fallbacks.get(result_type, 0) + 1
+
+    def observe(self, result_type: str, seconds: float) -> None:
+        us = seconds * 1e6
+        with self._lock:
+            self.calls += 1
+            hist = self.latency.get(result_type)
+            if hist is None:
+                hist = self.latency[result_type] = [0] * (len(LATENCY_BUCKETS_US) + 1)
+            hist[bisect_left(LATENCY_BUCKETS_US, us)] += 1
+            self.latency_total_us[result_type] = self.latency_total_us.get(result_type, 0.0) + us
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": True,
+                "calls": self.calls,
+                "patterns": {
+                    key: {"attempts": n, "hits": self.hits.get(key, 0)}
+                    for key, n in self.attempts.items()
+                },
+                "fallbacks": dict(self.fallbacks),
+                "latency_buckets_us": list(LATENCY_BUCKETS_US),
+                "latency": {
+                    result_type: {
+                        "count": sum(hist),
+                        "mean_us": self.latency_total_us[result_type] / sum(hist),
+                        "histogram": list(hist),
+                    }
+                    for result_type, hist in self.latency.items()
+                },
+            }
+
+
+def snapshot(metrics: Optional[ParseMetrics]) -> Dict[str, Any]:
+    """metrics.snapshot(), or the empty, disabled snapshot for None."""
+    if metrics is None:
+        return {
+            "enabled": False, "calls": 0, "patterns": {}, "fallbacks": {},
+            "latency_buckets_us": list(LATENCY_BUCKETS_US), "latency": {},
+        }
+    return metrics.snapshot()
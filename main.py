@@ -13,7 +13,7 @@ sys.path.insert(0, ROOT)
 # Import components
 from Jalaj.speech_recognition_service import listen_for_command
 from Tejas.wake_word_detector import listen_for_wake_word
-from Priyapal.command_parser import parse_command
+from Priyapal.command_parser import parse_command, enable_cache, disable_cache
 
 try:
     from minakshi.text_to_speech import speak_text
@@ -216,8 +216,15 @@ def main():
     parser = argparse.ArgumentParser(description='VoxMind Voice Assistant')
     parser.add_argument('--simulate', action='store_true', help='Keyboard mode')
     parser.add_argument('--no-tts', action='store_true', help='Disable TTS')
+    parser.add_argument('--no-parse-cache', action='store_true', help='Disable command parse cache')
+    parser.add_argument('--parse-cache-size', type=int, default=256, help='Max cached parse results')
     args = parser.parse_args()
     
+    if args.no_parse_cache:
+        disable_cache()
+    else:
+        enable_cache(maxsize=args.parse_cache_size)
+    
     run_loop(simulate=args.simulate, no_tts=args.no_tts)
 
 if __name__ == '__main__':